@@ -1,59 +1,67 @@
 import os
+import sqlite3
+import asyncio
+import random
 import tui
 import fileIO
-from openai import AzureOpenAI
+import aicache
+import backends
 
-# Module-level variable to hold the single, shared Azure OpenAI client instance.
+# Module-level variables holding the active expansion backend and, for chat backends, the
+# single, shared client instance. The openai SDK (and its httpx/pydantic stack) is imported only
+# when a chat client is first created, so launching the tool without AI does not pay for loading it.
+_backend = None
 _client = None
+# Cache of brainstorming responses shared across sessions; None disables caching.
+_response_cache = aicache.ResponseCache()
 
-def initialize_client(endpoint: str, key: str) -> tuple[bool, str]:
-    """Initializes or re-initializes the global Azure OpenAI client."""
-    global _client
-    if not endpoint or not key:
-        _client = None
-        return False, "Endpoint and Key are required."
+def set_response_cache(response_cache):
+    """Replaces the cache used for brainstorming responses. Pass None to always call the API."""
+    global _response_cache
+    _response_cache = response_cache
+
+def initialize_backend(backend) -> tuple[bool, str]:
+    """Makes `backend` the active expansion backend, creating its client or loading its data."""
+    global _backend, _client
+    _backend = None
+    _client = None
+    print(f"Initializing {backend.describe()}...")
     try:
-        print("Initializing Azure OpenAI client...")
-        _client = AzureOpenAI(
-            azure_endpoint=endpoint,
-            api_version="2024-02-01",
-            api_key=key
-        )
-        print("Client initialized successfully.")
-        return True, "Azure OpenAI client initialized successfully."
+        if backend.is_chat:
+            _client = backend.create_client()
+        else:
+            backend.load()
+    except ImportError:
+        error_message = "The 'openai' package is required for AI brainstorming. Install it with: pip install openai"
+        print(f"\n[Error] {error_message}")
+        return False, error_message
     except Exception as e:
         _client = None # Ensure client is None on failure
-        error_message = f"Failed to create Azure OpenAI client: {e}"
+        error_message = f"Failed to initialize {backend.describe()}: {e}"
         print(f"\n[Error] {error_message}")
         return False, error_message
+    _backend = backend
+    print("Backend initialized successfully.")
+    return True, f"{backend.describe()} initialized successfully."
 
 def get_ai_suggestions(system_prompt_content: str, user_prompt_content: str, model_name: str) -> list[str] | None:
-    """Sends the prompts to the Azure OpenAI API and processes the response."""
+    """Sends the prompts to the chat backend's API and processes the response."""
     if not _client:
-        print("\n[Error] Azure OpenAI client is not initialized.\n")
+        print("\n[Error] AI client is not initialized.\n")
         return None
 
     if not system_prompt_content or not user_prompt_content:
         print("\n[Error] System or User prompt content is missing.\n")
         return None
 
-    # Structure the conversation for the chat model
-    messages = [
-        {"role": "system", "content": system_prompt_content.strip()},
-        {"role": "user", "content": user_prompt_content.strip()}
-    ]
-
     print(f"Sending request to AI model '{model_name}'...")
     try:
         completion = _client.chat.completions.create(
             model=model_name,
-            messages=messages
+            messages=_build_messages(system_prompt_content, user_prompt_content)
         )
-        response_content = completion.choices[0].message.content
         print("AI response received.")
-
-        # Process the raw text response into a clean list of words, one per line.
-        suggested_words = [word.strip() for word in response_content.splitlines() if word.strip()]
+        suggested_words = _parse_suggestions(completion)
 
         if not suggested_words:
              print("[Warning] AI returned an empty list of suggestions.")
@@ -64,10 +72,224 @@ def get_ai_suggestions(system_prompt_content: str, user_prompt_content: str, mod
         print(f"\n[Error] Failed to get response from AI: {e}")
         return None
 
+def get_ai_suggestions_streamed(system_prompt_content: str, user_prompt_content: str, model_name: str,
+                                on_word) -> list[str] | None:
+    """
+    Like get_ai_suggestions, but streams the completion and calls `on_word` with each suggestion
+    as soon as its line is complete, instead of waiting for the whole response.
+    """
+    if not _client:
+        print("\n[Error] AI client is not initialized.\n")
+        return None
+
+    if not system_prompt_content or not user_prompt_content:
+        print("\n[Error] System or User prompt content is missing.\n")
+        return None
+
+    print(f"Streaming response from AI model '{model_name}'...")
+    suggested_words = []
+    try:
+        stream = _client.chat.completions.create(
+            model=model_name,
+            messages=_build_messages(system_prompt_content, user_prompt_content),
+            stream=True
+        )
+        pending = ""
+        for chunk in stream:
+            # Azure sends content-filter chunks without choices; skip those and empty deltas.
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            pending += chunk.choices[0].delta.content
+            *lines, pending = pending.split("\n")
+            for line in lines:
+                if line.strip():
+                    suggested_words.append(line.strip())
+                    on_word(line.strip())
+        if pending.strip():
+            suggested_words.append(pending.strip())
+            on_word(pending.strip())
+        print("AI response received.")
+
+        if not suggested_words:
+             print("[Warning] AI returned an empty list of suggestions.")
+        return suggested_words
+    except Exception as e:
+        print(f"\n[Error] Failed to get response from AI: {e}")
+        return None
+
+def _build_messages(system_prompt_content, user_prompt_content):
+    """Structures the conversation for the chat model."""
+    return [
+        {"role": "system", "content": system_prompt_content.strip()},
+        {"role": "user", "content": user_prompt_content.strip()}
+    ]
+
+def _parse_suggestions(completion):
+    """Processes the raw text response into a clean list of words, one per line."""
+    response_content = completion.choices[0].message.content or ""
+    return [word.strip() for word in response_content.splitlines() if word.strip()]
+
+def _seed_prompt(seed_words):
+    """Formats seed words into a single string for the AI prompt."""
+    return f"Expand these seed words: {', '.join(seed_words)}"
+
+# --- Batched Async Expansion ---
+# Large seed sets are split into batches that are sent concurrently, so no single request
+# is slow enough to time out or long enough to be truncated.
+
+AI_BATCH_SIZE = 20        # Seed words per request
+AI_MAX_CONCURRENCY = 4    # Requests in flight at once
+AI_MAX_RETRIES = 5        # Retries of a rate-limited (HTTP 429) request
+_RETRY_BASE_DELAY = 1.0   # Seconds before the first retry, doubled for each further retry
+
+def _retry_delay(error, attempt):
+    """Seconds to wait before retrying a rate-limited request: the server's Retry-After, or exponential backoff."""
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    try:
+        return max(0.0, float(retry_after))
+    except (TypeError, ValueError):
+        return _RETRY_BASE_DELAY * 2 ** attempt * (0.5 + random.random())
+
+async def _expand_batch(client, semaphore, system_prompt_content, batch, model_name):
+    """Sends one batch of seeds, retrying with backoff while the API answers 429."""
+    for attempt in range(AI_MAX_RETRIES + 1):
+        async with semaphore:
+            try:
+                completion = await client.chat.completions.create(
+                    model=model_name,
+                    messages=_build_messages(system_prompt_content, _seed_prompt(batch))
+                )
+                return _parse_suggestions(completion)
+            except Exception as e:
+                if getattr(e, "status_code", None) != 429 or attempt == AI_MAX_RETRIES:
+                    raise
+                delay = _retry_delay(e, attempt)
+        # Sleep outside the semaphore so other batches can use the slot meanwhile.
+        await asyncio.sleep(delay)
+
+async def _expand_batches(system_prompt_content, batches, model_name, concurrency):
+    # Retries are handled here, with backoff shared across the batches, instead of by the SDK.
+    client = _backend.create_async_client(max_retries=0)
+    semaphore = asyncio.Semaphore(concurrency)
+    try:
+        return await asyncio.gather(
+            *(_expand_batch(client, semaphore, system_prompt_content, batch, model_name) for batch in batches),
+            return_exceptions=True)
+    finally:
+        await client.close()
+
+def get_ai_suggestions_batched(system_prompt_content: str, seed_words: list[str], model_name: str,
+                               batch_size: int = AI_BATCH_SIZE,
+                               concurrency: int = AI_MAX_CONCURRENCY) -> tuple[list[str] | None, int]:
+    """
+    Expands seed words in batches of `batch_size`, with up to `concurrency` requests in flight.
+    Returns the suggestions, in batch order, and the number of batches that failed. Batches that
+    still fail after retrying are skipped with a warning; the suggestions are None only if every
+    batch failed.
+    """
+    if not _client:
+        print("\n[Error] AI client is not initialized.\n")
+        return None, 0
+
+    batch_size = max(1, batch_size)
+    batches = [seed_words[start:start + batch_size] for start in range(0, len(seed_words), batch_size)]
+    print(f"Sending {len(batches)} request(s) of up to {batch_size} seed words to AI model '{model_name}' "
+          f"({concurrency} at a time)...")
+    results = asyncio.run(_expand_batches(system_prompt_content, batches, model_name, max(1, concurrency)))
+
+    suggested_words = []
+    failed = 0
+    for batch_number, result in enumerate(results, start=1):
+        if isinstance(result, BaseException):
+            failed += 1
+            print(f"[Warning] AI request {batch_number}/{len(batches)} failed: {result}")
+        else:
+            suggested_words.extend(result)
+    if failed == len(batches):
+        print("\n[Error] Failed to get response from AI.")
+        return None, failed
+    print(f"AI responses received ({len(batches) - failed}/{len(batches)} requests succeeded).")
+    if not suggested_words:
+        print("[Warning] AI returned an empty list of suggestions.")
+    return suggested_words, failed
+
 # --- UI Interaction Functions ---
 # These functions are called directly from the TUI menu options.
 # They act as a bridge between the user interface and the core AI logic.
 
+def brainstorm_words(seed_words, system_prompt_path, model_name,
+                     batch_size=AI_BATCH_SIZE, concurrency=AI_MAX_CONCURRENCY, on_word=None):
+    """
+    Expands seed words with the AI model. Returns the seeds followed by the new suggestions,
+    without duplicates and in order, or None if the prompt could not be read or the request failed.
+    More than `batch_size` seeds are sent as concurrent batched requests. If `on_word` is given,
+    it is called with each new word as soon as it is known, and a single request is streamed.
+    """
+    # Combine original seeds with AI suggestions, removing duplicates while preserving order
+    expanded_words = list(dict.fromkeys(seed_words))
+    known_words = set(expanded_words)
+    def add_word(word):
+        if word not in known_words:
+            known_words.add(word)
+            expanded_words.append(word)
+            if on_word is not None:
+                on_word(word)
+
+    if _backend is not None and not _backend.is_chat:
+        # Offline expansion is a local lookup, so it needs neither the system prompt nor the cache.
+        print(f"Expanding seed words with the {_backend.describe()}...")
+        for word in _backend.suggest(seed_words):
+            add_word(word)
+        return expanded_words
+
+    # Read the system prompt from the specified file
+    system_prompt_content = fileIO.read_prompt_file(system_prompt_path)
+    if system_prompt_content is None: return None # Error is handled in read function
+
+    # Reuse an earlier response for the same model, prompt and seeds if one is cached.
+    suggestions = None
+    if _response_cache is not None:
+        cache_model = _backend.cache_name(model_name) if _backend is not None else model_name
+        key = aicache.cache_key(cache_model, system_prompt_content, seed_words)
+        try:
+            suggestions = _response_cache.get(key)
+        except (sqlite3.Error, OSError) as e:
+            print(f"[Warning] Could not read the AI cache: {e}")
+        if suggestions is not None:
+            print(f"Using cached AI response for model '{model_name}'.")
+        print(_response_cache.stats_message())
+
+    if suggestions is None:
+        failed_batches = 0
+        # Call the core AI function to get suggestions, fanning large seed sets out in batches
+        if len(seed_words) > batch_size:
+            suggestions, failed_batches = get_ai_suggestions_batched(
+                system_prompt_content, seed_words, model_name, batch_size, concurrency)
+        elif on_word is not None:
+            suggestions = get_ai_suggestions_streamed(
+                system_prompt_content, _seed_prompt(seed_words), model_name, add_word)
+        else:
+            suggestions = get_ai_suggestions(
+                system_prompt_content=system_prompt_content,
+                user_prompt_content=_seed_prompt(seed_words),
+                model_name=model_name
+            )
+        if suggestions is None:
+            return None
+        if _response_cache is not None and failed_batches:
+            # The failed seeds were never expanded; caching the rest would hide them on later runs.
+            print("[Warning] Not caching the AI response, as some of its requests failed.")
+        elif _response_cache is not None:
+            try:
+                _response_cache.put(key, cache_model, suggestions)
+            except (sqlite3.Error, OSError) as e:
+                print(f"[Warning] Could not update the AI cache: {e}")
+    # Words already streamed are known, so only cached or batched suggestions are new here.
+    for word in suggestions:
+        add_word(word)
+    return expanded_words
+
 def run_ai_brainstorming(state):
     """Orchestrates the AI brainstorming process based on the current application state."""
     tui.clear_screen()
@@ -75,35 +297,32 @@ def run_ai_brainstorming(state):
 
     # Prerequisite checks to ensure the tool is ready for an AI call
     if not state['client_ready']:
-        print("[Error] Azure client not ready. Please set endpoint/key first (Option 1)."); tui.pause(); return
-    if not state['system_prompt_path'] or not os.path.exists(state['system_prompt_path']):
+        print("[Error] AI backend not ready. Please set it up first (Option 1)."); tui.pause(); return
+    if state['ai_backend'] not in ("offline", "index") and (
+            not state['system_prompt_path'] or not os.path.exists(state['system_prompt_path'])):
         print("[Error] System prompt file not set or not found. Please set it first (Option 2)."); tui.pause(); return
     if not state['seed_words']:
         print("[Error] No seed words entered. Please enter seed words first (Option 4)."); tui.pause(); return
 
-    # Read the system prompt from the specified file
-    system_prompt_content = fileIO.read_prompt_file(state['system_prompt_path'])
-    if system_prompt_content is None: tui.pause(); return # Error is handled in read function
-
-    # Format the user's seed words into a single string for the AI prompt
-    user_prompt_content = f"Expand these seed words: {', '.join(state['seed_words'])}"
-
-    # Call the core AI function to get suggestions
-    suggestions = get_ai_suggestions(
-        system_prompt_content=system_prompt_content,
-        user_prompt_content=user_prompt_content,
-        model_name=state['model_name']
-    )
-
-    if suggestions is not None: # Check for success (None indicates an error)
-        # Combine original seeds with AI suggestions, removing duplicates while preserving order
-        state['ai_suggestions'] = list(dict.fromkeys(state['seed_words'] + suggestions))
+    # Words are added to the engine's list as they arrive; the old list is restored on failure.
+    previous_words = state['words_for_engine']
+    state['words_for_engine'] = list(dict.fromkeys(state['seed_words']))
+    def add_word(word):
+        state['words_for_engine'].append(word)
+        print(f"  + {word}")
+
+    expanded_words = brainstorm_words(state['seed_words'], state['system_prompt_path'], state['model_name'],
+                                      on_word=add_word)
+
+    if expanded_words is not None: # Check for success (None indicates an error)
+        state['ai_suggestions'] = expanded_words
         # Update the main list of words to be used by the generation engine
         state['words_for_engine'] = list(state['ai_suggestions'])
         print(f"\nBrainstorming complete.")
         print(f"Words for engine updated to {len(state['words_for_engine'])} unique terms (Seeds + AI Suggestions).")
         print("Use Option 6 (Review/Filter) to refine this list if needed.")
     else:
+        state['words_for_engine'] = previous_words
         print("\nAI Brainstorming failed or returned no results. Words for engine remain unchanged.")
     tui.pause()
 
@@ -111,7 +330,7 @@ def set_model_name(state):
     """Prompts the user to set the AI model (deployment name) and updates the state."""
     tui.clear_screen()
     print("--- Set AI Model Name ---\n")
-    print("Enter the deployment name of your Azure OpenAI model.")
+    print("Enter the deployment name of your Azure OpenAI model, or the model name on your local server.")
     current_model = state.get('model_name', 'Not Set')
     new_model = input(f"Model name [Current: {current_model}]: ").strip()
     if new_model:
@@ -122,25 +341,57 @@ def set_model_name(state):
     tui.pause()    
 
 
-def get_azure_details(state):
-    """Prompts the user for Azure credentials and initializes the AI client."""
+def set_ai_backend(state):
+    """Prompts the user to choose and configure the AI backend, then initializes it."""
     tui.clear_screen()
-    print("--- Set Azure OpenAI Credentials ---\n")
-    endpoint = input(f"Enter Azure Endpoint [Current: {state.get('endpoint', 'Not Set')}]: ")
-    key = input(f"Enter Azure API Key [Current: {'******' if state.get('key') else 'Not Set'}]: ")
-
-    # Update state with any new values provided
-    if endpoint:
-        state['endpoint'] = endpoint.strip()
-    if key:
-        state['key'] = key.strip()
-
-    # Attempt to initialize the client only if both endpoint and key are present
-    if state.get('endpoint') and state.get('key'):
-        success, message = initialize_client(state['endpoint'], state['key'])
+    print("--- Set AI Backend ---\n")
+    print("  1. Azure OpenAI (endpoint & key)")
+    print("  2. Local OpenAI-compatible server (e.g. llama.cpp, vLLM, Ollama)")
+    print("  3. Offline word-association file (no network)")
+    print("  4. Offline association index built with associndex.py (no network)")
+    choice = input(f"Backend [Current: {state['ai_backend']}]: ").strip()
+    if choice:
+        if choice not in ("1", "2", "3", "4"):
+            print("\n[Error] Invalid choice. No changes made."); tui.pause(); return
+        state['ai_backend'] = backends.BACKEND_NAMES[int(choice) - 1]
+    print()
+
+    # Ask for the chosen backend's settings, keeping the current value when nothing is entered.
+    backend = None
+    if state['ai_backend'] == "azure":
+        endpoint = input(f"Enter Azure Endpoint [Current: {state.get('endpoint', 'Not Set')}]: ")
+        key = input(f"Enter Azure API Key [Current: {'******' if state.get('key') else 'Not Set'}]: ")
+        if endpoint:
+            state['endpoint'] = endpoint.strip()
+        if key:
+            state['key'] = key.strip()
+        if state.get('endpoint') and state.get('key'):
+            backend = backends.AzureBackend(state['endpoint'], state['key'])
+    elif state['ai_backend'] == "local":
+        url = input(f"Enter server base URL, e.g. http://localhost:8000/v1 [Current: {state.get('local_url') or 'Not Set'}]: ")
+        if url:
+            state['local_url'] = url.strip()
+        if state.get('local_url'):
+            backend = backends.LocalBackend(state['local_url'], state.get('key'))
+    elif state['ai_backend'] == "offline":
+        path = input(f"Enter association file path [Current: {state.get('association_file') or 'Not Set'}]: ")
+        if path:
+            state['association_file'] = path.strip()
+        if state.get('association_file'):
+            backend = backends.OfflineBackend(state['association_file'])
+    else:
+        path = input(f"Enter association index path [Current: {state.get('association_index') or 'Not Set'}]: ")
+        if path:
+            state['association_index'] = path.strip()
+        if state.get('association_index'):
+            backend = backends.IndexBackend(state['association_index'])
+
+    # Attempt to initialize the backend only if its settings are complete
+    if backend is not None:
+        success, message = initialize_backend(backend)
         state['client_ready'] = success # Update the 'client_ready' flag for other functions
         print(f"\n{message}")
     else:
         state['client_ready'] = False
-        print("\n[Warning] Endpoint or Key not fully provided. AI Client not initialized.")
-    tui.pause()
\ No newline at end of file
+        print("\n[Warning] Backend settings not fully provided. AI backend not initialized.")
+    tui.pause()
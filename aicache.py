@@ -0,0 +1,96 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+# --- Persistent AI Response Cache ---
+# Brainstorming results are stored in a local SQLite file, keyed on the model, a hash of the
+# system prompt and the normalised seed list, so re-running a campaign (e.g. with different
+# mutations) reuses the earlier expansion instead of calling the API again.
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "seedspinner", "ai_cache.sqlite3")
+DEFAULT_TTL_DAYS = 30
+DEFAULT_MAX_MB = 16
+
+
+def normalise_seed_words(seed_words):
+    """Returns the seed words stripped, lowercased, without repeats and sorted, for use in a cache key."""
+    return sorted({word.strip().lower() for word in seed_words if word.strip()})
+
+def cache_key(model_name, system_prompt_content, seed_words):
+    """Returns the content-addressed key for one brainstorming request."""
+    prompt_hash = hashlib.sha256(system_prompt_content.strip().encode("utf-8")).hexdigest()
+    key_material = json.dumps([model_name, prompt_hash, normalise_seed_words(seed_words)])
+    return hashlib.sha256(key_material.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    An on-disk cache of AI suggestion lists. Entries older than the TTL are treated as misses
+    and removed; when the stored responses grow past the size limit, the least recently used
+    ones are evicted. The database is opened on first use. Hits and misses are counted for
+    the current session.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl_days=DEFAULT_TTL_DAYS, max_mb=DEFAULT_MAX_MB):
+        self.path = path
+        self.ttl_seconds = ttl_days * 86400
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self._db = None
+
+    def _connect(self):
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.path)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, model TEXT NOT NULL, suggestions TEXT NOT NULL, "
+                "size INTEGER NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL)")
+        return self._db
+
+    def get(self, key):
+        """Returns the cached suggestion list for a key, or None on a miss."""
+        db = self._connect()
+        now = time.time()
+        with db:
+            db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,))
+            row = db.execute("SELECT suggestions FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key, model_name, suggestions):
+        """Stores a suggestion list, then evicts least recently used entries beyond the size limit."""
+        db = self._connect()
+        payload = json.dumps(suggestions)
+        now = time.time()
+        with db:
+            db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                       (key, model_name, payload, len(payload), now, now))
+            total_size = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total_size > self.max_bytes:
+                for old_key, size in db.execute(
+                        "SELECT key, size FROM responses ORDER BY last_used ASC").fetchall():
+                    if total_size <= self.max_bytes:
+                        break
+                    db.execute("DELETE FROM responses WHERE key = ?", (old_key,))
+                    total_size -= size
+
+    def stats_message(self):
+        """Returns a one-line summary of this session's hits and misses."""
+        return f"AI cache: {self.hits} hit(s), {self.misses} miss(es) this session ({self.path})."
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
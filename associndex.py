@@ -0,0 +1,216 @@
+import array
+import collections
+import heapq
+import mmap
+import os
+import re
+import sys
+import fileIO
+
+# --- Offline Association Index ---
+# A compact, memory-mapped index of related words, built from local text corpora (words that
+# appear near each other) and password frequency lists (words used together in one password).
+# Lookups binary-search a sorted vocabulary in place, so answering a query reads only the few
+# pages it touches and takes well under a millisecond, however large the index is.
+#
+# File layout: a header (magic, byte order, word count, neighbour count), then four arrays of
+# unsigned 32-bit integers -- word offsets into the text blob, word frequencies, neighbour list
+# offsets, neighbour word ids -- followed by the blob of byte-sorted UTF-8 words.
+
+INDEX_MAGIC = b"SSASSOC1"
+_HEADER_SIZE = 24
+_ITEM_SIZE = 4
+
+DEFAULT_WINDOW = 4          # Corpus words this far apart count as co-occurring
+DEFAULT_MAX_NEIGHBOURS = 32 # Related words kept per word
+DEFAULT_MIN_COUNT = 2       # Words seen fewer times than this are left out of the index
+_MIN_WORD_LENGTH = 3
+_MAX_PREFIX_SCAN = 5000     # Vocabulary entries examined when completing a seed as a prefix
+# A relation's weight is divided by the related word's frequency to this power, so that words
+# which occur next to everything ('the', 'and') do not crowd out specific ones.
+_FREQUENCY_DAMPING = 0.75
+
+# Runs of letters; digits, symbols and underscores split words.
+_WORD_PATTERN = re.compile(r"[^\W\d_]+")
+
+
+def _words_in(text):
+    return [word for word in _WORD_PATTERN.findall(text.lower()) if len(word) >= _MIN_WORD_LENGTH]
+
+def _parse_password_line(line):
+    """Reads 'password' or 'count password' (as written by `uniq -c`) into (password, count)."""
+    fields = line.strip().split(None, 1)
+    if len(fields) == 2 and fields[0].isdigit():
+        return fields[1], int(fields[0])
+    return line.strip(), 1
+
+
+def build_index(output_path, corpus_paths=(), password_paths=(), window=DEFAULT_WINDOW,
+                max_neighbours=DEFAULT_MAX_NEIGHBOURS, min_count=DEFAULT_MIN_COUNT):
+    """
+    Builds an association index from text corpora and password frequency lists.
+    Two words are related when they occur within `window` words of each other in a corpus, or
+    in the same password (weighted by the password's count). Each word keeps its
+    `max_neighbours` strongest relations seen at least `min_count` times, scored so that very
+    common words rank lower.
+    Returns the number of words in the index.
+    """
+    frequency = collections.Counter()
+    pair_weights = collections.defaultdict(collections.Counter)
+
+    def relate(first, second, weight):
+        if first != second:
+            pair_weights[first][second] += weight
+            pair_weights[second][first] += weight
+
+    for path in corpus_paths:
+        recent = collections.deque(maxlen=window)
+        with open(path, "r", encoding="utf-8", errors="replace") as corpus_f:
+            for line in corpus_f:
+                for word in _words_in(line):
+                    frequency[word] += 1
+                    for earlier in recent:
+                        relate(earlier, word, 1)
+                    recent.append(word)
+
+    for path in password_paths:
+        with open(path, "r", encoding="utf-8", errors="replace") as passwords_f:
+            for line in passwords_f:
+                password, count = _parse_password_line(line)
+                words = _words_in(password)
+                for position, word in enumerate(words):
+                    frequency[word] += count
+                    for other in words[position + 1:]:
+                        relate(word, other, count)
+
+    vocabulary = sorted((word.encode("utf-8") for word, count in frequency.items() if count >= min_count))
+    word_ids = {word.decode("utf-8"): word_id for word_id, word in enumerate(vocabulary)}
+
+    word_offsets = array.array("I", [0])
+    for word in vocabulary:
+        word_offsets.append(word_offsets[-1] + len(word))
+    frequencies = array.array("I", (min(frequency[word.decode("utf-8")], 0xFFFFFFFF) for word in vocabulary))
+    neighbour_offsets = array.array("I", [0])
+    neighbours = array.array("I")
+    for word in vocabulary:
+        related = pair_weights.get(word.decode("utf-8"), {})
+        scored = ((weight / frequency[other] ** _FREQUENCY_DAMPING, other) for other, weight in related.items()
+                  if weight >= min_count and other in word_ids)
+        for _, other in heapq.nlargest(max_neighbours, scored):
+            neighbours.append(word_ids[other])
+        neighbour_offsets.append(len(neighbours))
+
+    with fileIO.atomic_output(output_path) as index_f:
+        index_f.write(INDEX_MAGIC)
+        index_f.write(sys.byteorder[:1].encode("ascii").ljust(8, b"\0"))
+        index_f.write(array.array("I", [len(vocabulary), len(neighbours)]).tobytes())
+        for table in (word_offsets, frequencies, neighbour_offsets, neighbours):
+            table.tofile(index_f)
+        index_f.write(b"".join(vocabulary))
+    return len(vocabulary)
+
+
+class AssociationIndex:
+    """A read-only, memory-mapped association index produced by build_index()."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as index_f:
+            self._map = mmap.mmap(index_f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        if len(view) < _HEADER_SIZE or view[:8] != INDEX_MAGIC:
+            view.release()
+            self._map.close()
+            raise ValueError(f"Not a SeedSpinner association index: {path}")
+        if view[8:9] != sys.byteorder[:1].encode("ascii"):
+            view.release()
+            self._map.close()
+            raise ValueError(f"Association index was built on a machine with a different byte order: {path}")
+        self.word_count, neighbour_count = view[16:_HEADER_SIZE].cast("I")
+
+        tables = []
+        position = _HEADER_SIZE
+        for length in (self.word_count + 1, self.word_count, self.word_count + 1, neighbour_count):
+            tables.append(view[position:position + length * _ITEM_SIZE].cast("I"))
+            position += length * _ITEM_SIZE
+        self._word_offsets, self._frequencies, self._neighbour_offsets, self._neighbours = tables
+        self._blob = view[position:]
+
+    def _word(self, word_id):
+        return bytes(self._blob[self._word_offsets[word_id]:self._word_offsets[word_id + 1]])
+
+    def _lower_bound(self, key):
+        """Returns the first word id whose word is not less than `key` (bytes)."""
+        low, high = 0, self.word_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._word(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def related(self, seed, limit=DEFAULT_MAX_NEIGHBOURS):
+        """
+        Returns up to `limit` words related to `seed`: its strongest associations first, then
+        the most frequent longer words it is a prefix of (e.g. 'sun' -> 'sunshine'). A quarter
+        of the slots is kept for those completions when there are enough of them.
+        """
+        key = seed.strip().lower().encode("utf-8")
+        if not key:
+            return []
+        associations = []
+        word_id = self._lower_bound(key)
+        if word_id < self.word_count and self._word(word_id) == key:
+            start, end = self._neighbour_offsets[word_id], self._neighbour_offsets[word_id + 1]
+            associations = [self._word(other).decode("utf-8") for other in self._neighbours[start:end]]
+            word_id += 1
+
+        completions = []
+        scan_end = min(self.word_count, word_id + _MAX_PREFIX_SCAN)
+        while word_id < scan_end:
+            word = self._word(word_id)
+            if not word.startswith(key):
+                break
+            completions.append((self._frequencies[word_id], word.decode("utf-8")))
+            word_id += 1
+        results = associations[:limit - limit // 4]
+        results.extend(word for _, word in heapq.nlargest(limit, completions) if word not in results)
+        results.extend(word for word in associations[len(results):] if word not in results)
+        return results[:limit]
+
+    def close(self):
+        self._neighbours = self._neighbour_offsets = self._frequencies = self._word_offsets = self._blob = None
+        self._map.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Build an offline association index for SeedSpinner's "
+                                                 "'index' expansion backend.")
+    parser.add_argument("-o", "--output", required=True, help="index file to write")
+    parser.add_argument("--corpus", action="append", default=[], help="plain-text corpus file (repeatable)")
+    parser.add_argument("--passwords", action="append", default=[],
+                        help="password list, one 'password' or 'count password' per line (repeatable)")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW,
+                        help=f"corpus co-occurrence window in words (default: {DEFAULT_WINDOW})")
+    parser.add_argument("--max-neighbours", type=int, default=DEFAULT_MAX_NEIGHBOURS,
+                        help=f"related words kept per word (default: {DEFAULT_MAX_NEIGHBOURS})")
+    parser.add_argument("--min-count", type=int, default=DEFAULT_MIN_COUNT,
+                        help=f"leave out words seen fewer times (default: {DEFAULT_MIN_COUNT})")
+    parser.add_argument("--query", help="comma-separated words to look up in the finished index")
+    args = parser.parse_args()
+    if not args.corpus and not args.passwords:
+        parser.error("give at least one --corpus or --passwords file")
+
+    start_time = time.perf_counter()
+    word_count = build_index(args.output, args.corpus, args.passwords, args.window,
+                             args.max_neighbours, args.min_count)
+    print(f"Indexed {word_count:,} words into {args.output} "
+          f"({os.path.getsize(args.output) / (1024 * 1024):.1f} MB) in {time.perf_counter() - start_time:.1f}s.")
+    if args.query:
+        index = AssociationIndex(args.output)
+        for seed in args.query.split(","):
+            print(f"{seed}: {', '.join(index.related(seed))}")
+        index.close()
@@ -0,0 +1,138 @@
+import os
+import associndex
+
+# --- AI Expansion Backends ---
+# Where brainstorming suggestions come from. Chat backends talk to an OpenAI-style chat
+# completions API (Azure OpenAI, or a local server such as llama.cpp, vLLM or Ollama);
+# the offline backends look words up in a local association file or a prebuilt association
+# index (see associndex.py) and need no network.
+# The openai SDK is imported only when a chat backend creates its clients.
+
+BACKEND_NAMES = ("azure", "local", "offline", "index")
+AZURE_API_VERSION = "2024-02-01"
+
+
+class AzureBackend:
+    """Azure OpenAI chat completions, addressed by endpoint, key and deployment name."""
+    name = "azure"
+    is_chat = True
+
+    def __init__(self, endpoint, key, api_version=AZURE_API_VERSION):
+        self.endpoint = endpoint
+        self.key = key
+        self.api_version = api_version
+
+    def describe(self):
+        return f"Azure OpenAI ({self.endpoint})"
+
+    def cache_name(self, model_name):
+        """Returns the model identity used in AI cache keys."""
+        return model_name
+
+    def create_client(self, **options):
+        from openai import AzureOpenAI
+        return AzureOpenAI(azure_endpoint=self.endpoint, api_version=self.api_version, api_key=self.key, **options)
+
+    def create_async_client(self, **options):
+        from openai import AsyncAzureOpenAI
+        return AsyncAzureOpenAI(azure_endpoint=self.endpoint, api_version=self.api_version, api_key=self.key,
+                                **options)
+
+
+class LocalBackend:
+    """An OpenAI-compatible chat completions server, e.g. http://localhost:8000/v1."""
+    name = "local"
+    is_chat = True
+
+    def __init__(self, base_url, key=None):
+        self.base_url = base_url
+        # Local servers usually ignore the key, but the SDK requires one.
+        self.key = key or "not-needed"
+
+    def describe(self):
+        return f"local OpenAI-compatible server ({self.base_url})"
+
+    def cache_name(self, model_name):
+        return f"local:{self.base_url}:{model_name}"
+
+    def create_client(self, **options):
+        from openai import OpenAI
+        return OpenAI(base_url=self.base_url, api_key=self.key, **options)
+
+    def create_async_client(self, **options):
+        from openai import AsyncOpenAI
+        return AsyncOpenAI(base_url=self.base_url, api_key=self.key, **options)
+
+
+class OfflineBackend:
+    """
+    Expands seeds from a local word-association file, without any model or network. Each line
+    is `word: association, association, ...`; lookups ignore case, and blank lines and lines
+    starting with '#' are skipped.
+    """
+    name = "offline"
+    is_chat = False
+
+    def __init__(self, association_path):
+        self.association_path = association_path
+        self._associations = None
+
+    def describe(self):
+        return f"offline association file ({self.association_path})"
+
+    def load(self):
+        """Reads the association file. Raises OSError or ValueError if it cannot be used."""
+        if not os.path.isfile(self.association_path):
+            raise OSError(f"Association file not found: {self.association_path}")
+        associations = {}
+        with open(self.association_path, "r", encoding="utf-8") as assoc_f:
+            for line_number, line in enumerate(assoc_f, start=1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                word, separator, related = line.partition(":")
+                if not separator or not word.strip():
+                    raise ValueError(f"{self.association_path}:{line_number}: expected 'word: association, ...'")
+                entry = associations.setdefault(word.strip().lower(), [])
+                entry.extend(term.strip() for term in related.split(",") if term.strip())
+        self._associations = associations
+        return len(associations)
+
+    def suggest(self, seed_words):
+        """Returns the associations of each seed word, in seed order."""
+        if self._associations is None:
+            self.load()
+        suggestions = []
+        for word in seed_words:
+            suggestions.extend(self._associations.get(word.strip().lower(), ()))
+        return suggestions
+
+
+class IndexBackend:
+    """Expands seeds from a memory-mapped association index built by associndex.py, without any network."""
+    name = "index"
+    is_chat = False
+
+    def __init__(self, index_path, words_per_seed=None):
+        self.index_path = index_path
+        self.words_per_seed = words_per_seed or associndex.DEFAULT_MAX_NEIGHBOURS
+        self._index = None
+
+    def describe(self):
+        return f"offline association index ({self.index_path})"
+
+    def load(self):
+        """Opens the index. Raises OSError or ValueError if it cannot be used."""
+        if self._index is not None:
+            self._index.close()
+        self._index = associndex.AssociationIndex(self.index_path)
+        return self._index.word_count
+
+    def suggest(self, seed_words):
+        """Returns the related words of each seed word, in seed order."""
+        if self._index is None:
+            self.load()
+        suggestions = []
+        for word in seed_words:
+            suggestions.extend(self._index.related(word, self.words_per_seed))
+        return suggestions
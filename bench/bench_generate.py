@@ -0,0 +1,149 @@
+import argparse
+import contextlib
+import hashlib
+import itertools
+import os
+import sys
+import tempfile
+import time
+
+# SeedSpinner's modules live at the repository root rather than in a package.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fileIO
+import generate
+
+# --- Generation Benchmarks ---
+# Reproduces the measurements quoted in the engine's performance changes:
+#   affixes     expanding core forms through the affix table: rebuilt for every form (as the
+#               engine once did) against one table shared by the whole run
+#   writer      writing one stream of candidates line by line (as the engine once did) against
+#               the block-batching CandidateWriter, with and without os.writev
+#   end-to-end  whole generation runs, with the output's line count and md5 so that runs of
+#               different versions can be checked for identical output
+# Each measurement is the best of --repeat runs. Run from anywhere:
+#   python bench/bench_generate.py [benchmark ...] [--repeat N] [--dir DIR]
+
+MUTATIONS = {"capitalisation": True, "leet_speak": True, "concatenation": True, "affixes": True}
+END_TO_END_RUNS = [
+    # (name, seed words, mutation config, engine config)
+    ("3 words, caps+leet+concat+affixes, sort", ["sun", "flower", "cat"], MUTATIONS, {}),
+    ("3 words, caps+leet+concat+affixes, construct", ["sun", "flower", "cat"], MUTATIONS, {"dedup": "construct"}),
+]
+NO_AFFIXES = dict(MUTATIONS, affixes=False)
+END_TO_END_RUNS += [
+    ("6 words, caps+leet+concat+affixes, construct", ["sun", "flower", "sunflower", "Sun", "cat", "dog"], MUTATIONS,
+     {"dedup": "construct"}),
+    ("5 words, caps+leet+concat, construct", ["password", "statistics", "sunflower", "tiger", "cat"], NO_AFFIXES,
+     {"dedup": "construct"}),
+]
+AFFIX_SEEDS = ["sunflower", "password", "statistics"]
+AFFIX_FORMS = 2000
+WRITER_SEEDS = ["password", "statistics", "sunflower"]
+WRITER_LINES = 3_000_000
+# Candidates per block handed to the CandidateWriter, as the engine's writers batch them.
+WRITER_BLOCK_LINES = 4096
+
+
+def best_time(function, repeat):
+    """Returns the shortest wall time of `repeat` calls and the last call's result."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def file_digest(filename):
+    """Returns the line count and md5 of a file."""
+    digest = hashlib.md5()
+    line_count = 0
+    with open(filename, "rb") as bench_f:
+        for block in iter(lambda: bench_f.read(1 << 20), b""):
+            digest.update(block)
+            line_count += block.count(b"\n")
+    return line_count, digest.hexdigest()
+
+
+def bench_affixes(args):
+    forms = list(itertools.islice(itertools.chain.from_iterable(
+        generate._expand_option_blocks(generate._compile_core_option_blocks(word, MUTATIONS)) for word in AFFIX_SEEDS),
+        AFFIX_FORMS))
+
+    def rebuilt_per_form():
+        # One table build and one set of candidates per form, as before the table was shared.
+        line_count = 0
+        for form in forms:
+            line_count += len({form + suffix for suffix in generate.build_affix_table()})
+        return line_count
+
+    def shared_table():
+        line_join_table = generate._build_line_join_table(generate.build_affix_table())
+        return sum(block.count("\n") for block in generate._apply_affix_blocks(forms, line_join_table))
+
+    print(f"affixes: {len(forms):,} core forms of {', '.join(AFFIX_SEEDS)}")
+    before, before_lines = best_time(rebuilt_per_form, args.repeat)
+    after, after_lines = best_time(shared_table, args.repeat)
+    print(f"  table rebuilt per form: {before:8.3f}s  {before_lines / before:>14,.0f} lines/s")
+    print(f"  shared table:           {after:8.3f}s  {after_lines / after:>14,.0f} lines/s  ({before / after:.1f}x)")
+
+def bench_writer(args):
+    forms = list(itertools.chain.from_iterable(
+        generate._expand_option_blocks(generate._compile_core_option_blocks(word, NO_AFFIXES)) for word in WRITER_SEEDS))
+    lines = list(itertools.islice((left + right for left in forms for right in forms), WRITER_LINES))
+    blocks = ["\n".join(lines[i:i + WRITER_BLOCK_LINES]) + "\n" for i in range(0, len(lines), WRITER_BLOCK_LINES)]
+    output_filename = os.path.join(args.dir, "bench_output.txt")
+
+    def per_line():
+        with open(output_filename, "w", encoding="utf-8") as temp_f:
+            for line in lines:
+                temp_f.write(line + "\n")
+
+    def candidate_writer(use_writev):
+        with fileIO.CandidateWriter(output_filename, use_writev=use_writev) as out_f:
+            for block in blocks:
+                out_f.write(block)
+
+    print(f"writer: {len(lines):,} concatenated candidates of {', '.join(WRITER_SEEDS)}")
+    baseline = None
+    for name, run in (("line by line:", per_line),
+                      ("CandidateWriter:", lambda: candidate_writer(False)),
+                      ("CandidateWriter, writev:", lambda: candidate_writer(True))):
+        elapsed, _ = best_time(run, args.repeat)
+        baseline = baseline or elapsed
+        print(f"  {name:<25}{elapsed:8.3f}s  {len(lines) / elapsed:>14,.0f} lines/s  ({baseline / elapsed:.1f}x)")
+    os.remove(output_filename)
+
+def bench_end_to_end(args):
+    print("end-to-end:")
+    for name, base_words, mutation_config, engine_config in END_TO_END_RUNS:
+        output_filename = os.path.join(args.dir, "bench_output.txt")
+
+        def run():
+            with contextlib.redirect_stdout(open(os.devnull, "w")) as devnull_f, devnull_f:
+                return generate.generate_wordlist_logic(base_words, mutation_config, output_filename, engine_config)
+
+        elapsed, (count, message) = best_time(run, args.repeat)
+        if not message.startswith("Successfully"):
+            print(f"  {name}: {message}")
+            continue
+        line_count, md5 = file_digest(output_filename)
+        os.remove(output_filename)
+        print(f"  {name}: {elapsed:.2f}s, {line_count:,} lines ({line_count / elapsed:,.0f} lines/s), md5 {md5}")
+
+
+BENCHMARKS = {"affixes": bench_affixes, "writer": bench_writer, "end-to-end": bench_end_to_end}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark SeedSpinner's generation engine.")
+    parser.add_argument("benchmarks", nargs="*", metavar="benchmark",
+                        help=f"benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement; the best is reported (default: 3)")
+    parser.add_argument("--dir", default=tempfile.gettempdir(),
+                        help="directory for the benchmark's output files (default: the system temp directory)")
+    args = parser.parse_args()
+    unknown = [benchmark for benchmark in args.benchmarks if benchmark not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+    for benchmark in args.benchmarks or BENCHMARKS:
+        BENCHMARKS[benchmark](args)
@@ -0,0 +1,272 @@
+import argparse
+import contextlib
+import json
+import os
+import sys
+import aicache
+import fileIO
+import generate
+
+# --- Headless Command-Line Entry Point ---
+# Runs a whole generation job from flags or a JSON config file, without the interactive TUI,
+# so it can be driven by schedulers and scripts. The AI backend is only loaded with --ai.
+
+def parse_count(text):
+    """Parses a candidate count such as 50000000, 50M or 2.5G (K, M and G are powers of 1000)."""
+    multipliers = {"K": 10**3, "M": 10**6, "G": 10**9}
+    text = text.strip().upper().replace(",", "").replace("_", "")
+    try:
+        if text and text[-1] in multipliers:
+            count = int(float(text[:-1]) * multipliers[text[-1]])
+        else:
+            count = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid count: '{text}'")
+    if count <= 0:
+        raise argparse.ArgumentTypeError("the count must be positive")
+    return count
+
+def add_engine_arguments(parser):
+    """Adds the generation engine's tuning options to an argument parser (shared with the TUI)."""
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of worker processes used for wordlist generation (default: 1)")
+    parser.add_argument("--memory-mb", type=float, default=256,
+                        help="memory budget in MB for sorting and deduplicating candidates (default: 256)")
+    parser.add_argument("--prefilter", choices=["exact", "approximate"],
+                        help="drop repeated candidates before sorting; 'approximate' also uses a Bloom filter "
+                             "and may drop a small fraction of new forms, each with all of its suffixes")
+    parser.add_argument("--prefilter-mb", type=float, default=64,
+                        help="memory budget in MB for the pre-dedup filter (default: 64)")
+    parser.add_argument("--dedup", choices=["sort", "construct"], default="sort",
+                        help="'sort' writes a sorted, deduplicated wordlist; 'construct' writes each candidate "
+                             "once, straight to the output, without sorting (default: sort)")
+    parser.add_argument("--write-block-kb", type=float, default=1024,
+                        help="block size in KB for buffered candidate output (default: 1024)")
+    parser.add_argument("--writev", action="store_true",
+                        help="write candidate output blocks with os.writev where available")
+    parser.add_argument("--compression-threads", type=int, default=0,
+                        help="threads used to compress .gz/.zst output (default: all CPUs)")
+    parser.add_argument("--order", choices=["default", "probability"], default="default",
+                        help="'probability' writes the likeliest candidates first, scored from per-rule weights, "
+                             "without sorting (default: byte order, or generation order with --dedup construct)")
+    parser.add_argument("--budget", type=parse_count,
+                        help="write only this many candidates, the likeliest ones (e.g. 50M); the rest of the "
+                             "mutation space is never generated. Implies --order probability")
+    parser.add_argument("--rank-weights",
+                        help="JSON file overriding the rule weights used by --order probability, e.g. "
+                             "{\"caps\": {\"upper\": 0.2}, \"leet_substitution\": 0.1}")
+    parser.add_argument("--exclude", action="append", metavar="LIST",
+                        help="leave out every candidate of this already-tried wordlist (repeatable); the lists "
+                             "are compiled once into an index that later runs reuse and extend as lists grow")
+    parser.add_argument("--exclusion-index", metavar="FILE",
+                        help="exclusion index file to build or reuse (default: one per set of lists in "
+                             "~/.cache/seedspinner)")
+    parser.add_argument("--export-hashcat", metavar="DIR",
+                        help="instead of a wordlist, write the core word forms, a suffix .rule file and the "
+                             "hashcat commands to DIR, so hashcat expands them on the GPU")
+    parser.add_argument("--incremental", metavar="DIR",
+                        help="keep the sorted wordlist as per-word and per-pair pieces in DIR, so rerunning with "
+                             "added or removed words only generates what changed")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="write per-stage metrics (wall and CPU time, candidates in and out, bytes written) and the "
+                             "peak memory of the run to FILE as JSON; '-' writes them to stderr")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="profile the run (including worker processes) with cProfile, save the statistics "
+                             "to FILE and print the functions that took the most time")
+    parser.add_argument("--fast-estimate", action="store_true",
+                        help="estimate the maximum number of passwords, repeats included, instead of counting "
+                             "the unique ones exactly; for word lists too large for the exact count")
+    parser.add_argument("--job-dir",
+                        help="run generation as a resumable job, checkpointing progress to this directory; "
+                             "rerun with the same directory to resume an interrupted job")
+
+def engine_config_from_args(args):
+    """Builds the engine config dictionary from parsed engine arguments."""
+    return {
+        "workers": max(1, args.workers), "memory_budget_mb": args.memory_mb,
+        "prefilter": args.prefilter, "prefilter_memory_mb": args.prefilter_mb,
+        "dedup": args.dedup, "write_block_kb": args.write_block_kb, "use_writev": args.writev,
+        "compression_threads": args.compression_threads, "job_dir": args.job_dir,
+        "order": args.order, "rank_weights_file": args.rank_weights, "candidate_budget": args.budget,
+        "hashcat_export_dir": args.export_hashcat,
+        "exclusion_lists": args.exclude, "exclusion_index": args.exclusion_index,
+        "incremental_dir": args.incremental, "metrics_file": args.metrics, "profile_file": args.profile,
+        "fast_estimate": args.fast_estimate
+    }
+
+def build_parser():
+    """Builds the argument parser for the headless entry point."""
+    parser = argparse.ArgumentParser(
+        description="SeedSpinner - generate a password wordlist without the interactive menu.",
+        epilog="Options can also be given in a JSON file passed with --config, using the option names "
+               "with underscores as keys (e.g. {\"seeds\": [\"sun\"], \"leet\": true, \"memory_mb\": 512}). "
+               "Flags on the command line override the file.")
+    parser.add_argument("--config", help="JSON file with default values for any of the options below")
+
+    words = parser.add_argument_group("seed words")
+    words.add_argument("--seeds", help="comma-separated seed words")
+    words.add_argument("--seeds-file", help="file with one seed word per line")
+
+    mutation = parser.add_argument_group("mutations")
+    mutation.add_argument("--caps", action=argparse.BooleanOptionalAction, default=True,
+                          help="capitalisation variants (default: on)")
+    mutation.add_argument("--leet", action=argparse.BooleanOptionalAction, default=False,
+                          help="leet speak substitutions (default: off)")
+    mutation.add_argument("--concat", action=argparse.BooleanOptionalAction, default=True,
+                          help="concatenate pairs of words (default: on)")
+    mutation.add_argument("--affixes", action=argparse.BooleanOptionalAction, default=True,
+                          help="number/symbol suffixes (default: on)")
+
+    output = parser.add_argument_group("output")
+    output.add_argument("-o", "--output", default="wordlist.txt",
+                        help="output file; end it in .gz, .zst or .lz4 to compress. '-' or a named pipe streams the "
+                             "candidates into another program as they are generated (default: wordlist.txt)")
+    output.add_argument("--estimate-only", action="store_true",
+                        help="print the exact number of passwords and file size (the maximum with --fast-estimate), "
+                             "then exit without generating")
+
+    ai = parser.add_argument_group("AI brainstorming (optional)")
+    ai.add_argument("--ai", action="store_true", help="expand the seed words with the AI model before generating")
+    ai.add_argument("--backend", choices=["azure", "local", "offline", "index"], default="azure",
+                    help="where suggestions come from: Azure OpenAI, a local OpenAI-compatible server, "
+                         "an offline word-association file, or an association index built with "
+                         "associndex.py (default: azure)")
+    ai.add_argument("--local-url", help="base URL of the local server, e.g. http://localhost:8000/v1")
+    ai.add_argument("--associations", help="word-association file for the offline backend "
+                                           "(lines of 'word: association, association, ...')")
+    ai.add_argument("--index", help="association index file for the index backend")
+    ai.add_argument("--index-words", type=int, help="related words taken per seed from the index (default: 32)")
+    ai.add_argument("--endpoint", default=os.environ.get("AZURE_OPENAI_ENDPOINT"),
+                    help="Azure OpenAI endpoint (default: $AZURE_OPENAI_ENDPOINT)")
+    ai.add_argument("--key", default=os.environ.get("AZURE_OPENAI_API_KEY"),
+                    help="Azure OpenAI API key, also sent to a local server if given (default: $AZURE_OPENAI_API_KEY)")
+    ai.add_argument("--model", default="gpt-4o-mini", help="model deployment name (default: gpt-4o-mini)")
+    ai.add_argument("--system-prompt", default="CreativePrompt.txt",
+                    help="system prompt file for the AI (default: CreativePrompt.txt)")
+    ai.add_argument("--ai-batch-size", type=int,
+                    help="seed words per AI request; larger seed sets are sent as concurrent batches (default: 20)")
+    ai.add_argument("--ai-concurrency", type=int,
+                    help="AI requests in flight at once when batching (default: 4)")
+    ai.add_argument("--ai-cache", action=argparse.BooleanOptionalAction, default=True,
+                    help="reuse cached AI responses for the same model, prompt and seeds (default: on)")
+    ai.add_argument("--ai-cache-file", default=aicache.DEFAULT_CACHE_PATH,
+                    help=f"AI response cache database (default: {aicache.DEFAULT_CACHE_PATH})")
+    ai.add_argument("--ai-cache-ttl-days", type=float, default=aicache.DEFAULT_TTL_DAYS,
+                    help=f"days before a cached AI response expires (default: {aicache.DEFAULT_TTL_DAYS})")
+    ai.add_argument("--ai-cache-mb", type=float, default=aicache.DEFAULT_MAX_MB,
+                    help=f"size limit in MB of the AI response cache (default: {aicache.DEFAULT_MAX_MB})")
+
+    add_engine_arguments(parser.add_argument_group("engine"))
+    return parser
+
+def parse_args(argv=None):
+    """Parses the command line, using values from a --config file as defaults."""
+    parser = build_parser()
+    pre_args, _ = parser.parse_known_args(argv)
+    if pre_args.config:
+        try:
+            with open(pre_args.config, "r", encoding="utf-8") as config_f:
+                config = json.load(config_f)
+        except (OSError, ValueError) as e:
+            parser.error(f"could not read config file '{pre_args.config}': {e}")
+        if not isinstance(config, dict):
+            parser.error(f"config file '{pre_args.config}' must contain a JSON object")
+        known = {action.dest for action in parser._actions}
+        unknown = sorted(set(config) - known)
+        if unknown:
+            parser.error(f"unknown option(s) in config file: {', '.join(unknown)}")
+        # A list of seeds is accepted as well as a comma-separated string.
+        if isinstance(config.get("seeds"), list):
+            config["seeds"] = ",".join(config["seeds"])
+        parser.set_defaults(**config)
+    return parser.parse_args(argv)
+
+def read_seed_words(args):
+    """Collects the seed words from --seeds and --seeds-file, in order and without repeats."""
+    seed_words = []
+    if args.seeds:
+        seed_words += [word.strip() for word in args.seeds.split(",") if word.strip()]
+    if args.seeds_file:
+        with open(args.seeds_file, "r", encoding="utf-8") as seeds_f:
+            seed_words += [line.strip() for line in seeds_f if line.strip()]
+    return list(dict.fromkeys(seed_words))
+
+def main(argv=None):
+    """Runs one headless generation job and returns the process exit code."""
+    args = parse_args(argv)
+    # With the candidates on stdout, every message goes to stderr.
+    with contextlib.redirect_stdout(sys.stderr) if args.output == fileIO.STDOUT_FILENAME else contextlib.nullcontext():
+        return run_job(args)
+
+def run_job(args):
+    """Runs the generation job described by parsed arguments and returns the exit code."""
+    try:
+        seed_words = read_seed_words(args)
+    except OSError as e:
+        print(f"[Error] Could not read seed words: {e}", file=sys.stderr)
+        return 1
+    if not seed_words:
+        print("[Error] No seed words given. Use --seeds, --seeds-file or a config file.", file=sys.stderr)
+        return 1
+
+    words_for_engine = seed_words
+    if args.ai:
+        # Only AI runs pay for loading the AI backend and its SDK.
+        import agent
+        agent.set_response_cache(aicache.ResponseCache(args.ai_cache_file, args.ai_cache_ttl_days, args.ai_cache_mb)
+                                 if args.ai_cache else None)
+        import backends
+        if args.backend == "local":
+            if not args.local_url:
+                print("[Error] --backend local needs --local-url.", file=sys.stderr)
+                return 1
+            backend = backends.LocalBackend(args.local_url, args.key)
+        elif args.backend == "offline":
+            if not args.associations:
+                print("[Error] --backend offline needs --associations.", file=sys.stderr)
+                return 1
+            backend = backends.OfflineBackend(args.associations)
+        elif args.backend == "index":
+            if not args.index:
+                print("[Error] --backend index needs --index.", file=sys.stderr)
+                return 1
+            backend = backends.IndexBackend(args.index, args.index_words)
+        else:
+            if not args.endpoint or not args.key:
+                print("[Error] --ai needs an endpoint and key (--endpoint/--key or the AZURE_OPENAI_* variables).",
+                      file=sys.stderr)
+                return 1
+            backend = backends.AzureBackend(args.endpoint, args.key)
+        success, _ = agent.initialize_backend(backend)
+        if not success:
+            return 1
+        words_for_engine = agent.brainstorm_words(
+            seed_words, args.system_prompt, args.model,
+            batch_size=args.ai_batch_size or agent.AI_BATCH_SIZE,
+            concurrency=args.ai_concurrency or agent.AI_MAX_CONCURRENCY)
+        if words_for_engine is None:
+            return 1
+        print(f"Words for engine: {len(words_for_engine)} unique terms (seeds + AI suggestions).")
+
+    mutation_config = {
+        "capitalisation": args.caps, "leet_speak": args.leet,
+        "concatenation": args.concat, "affixes": args.affixes
+    }
+    if args.estimate_only:
+        if args.fast_estimate:
+            lines, size_bytes = generate.estimate_candidate_count(words_for_engine, mutation_config)
+            print(f"Passwords (at most, repeats included): {lines:,}")
+            print(f"File Size (at most): {size_bytes:,} bytes")
+        else:
+            lines, size_bytes = generate.count_unique_candidates(words_for_engine, mutation_config)
+            print(f"Unique Passwords (exact): {lines:,}")
+            print(f"File Size (exact): {size_bytes:,} bytes")
+        return 0
+
+    unique_count, message = generate.generate_wordlist_logic(
+        words_for_engine, mutation_config, args.output, engine_config_from_args(args))
+    print(message)
+    return 0 if message.startswith("Successfully") else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
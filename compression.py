@@ -0,0 +1,125 @@
+import concurrent.futures
+import collections
+import gzip
+import os
+
+# Output codecs, chosen by the file extension. zstd and lz4 need optional packages.
+CODEC_EXTENSIONS = {".gz": "gzip", ".zst": "zstd", ".lz4": "lz4"}
+_CODEC_PACKAGES = {"zstd": "zstandard", "lz4": "lz4"}
+
+# Compression levels for the final output and for temporary spill files, which only
+# need to be smaller than the raw text and are read back once.
+_OUTPUT_LEVELS = {"gzip": 6, "zstd": 3, "lz4": 0}
+_SPILL_LEVELS = {"gzip": 1, "zstd": 1, "lz4": 0}
+
+# Amount of uncompressed text per independently compressed gzip member.
+_GZIP_MEMBER_BYTES = 4 * 1024 * 1024
+
+
+def codec_for_filename(filename):
+    """Returns the codec implied by a filename's extension, or None for plain text."""
+    return CODEC_EXTENSIONS.get(os.path.splitext(filename)[1].lower())
+
+def extension_for_filename(filename):
+    """Returns a filename's compression extension (e.g. '.zst'), or '' for plain text."""
+    extension = os.path.splitext(filename)[1].lower()
+    return extension if extension in CODEC_EXTENSIONS else ""
+
+def codec_unavailable_reason(codec):
+    """Returns why a codec cannot be used (its package is not installed), or None if it can."""
+    package = _CODEC_PACKAGES.get(codec)
+    if package is None:
+        return None
+    try:
+        __import__(package)
+    except ImportError:
+        return f"The '{package}' package is required for {codec} output. Install it with: pip install {package}"
+    return None
+
+
+class ParallelGzipWriter:
+    """
+    A write-only gzip stream that compresses on several threads. Text is cut into
+    fixed-size pieces and each piece becomes its own gzip member; concatenated members
+    are a valid gzip file that every gzip reader decompresses as one stream. zlib
+    releases the GIL while compressing, so the threads genuinely run in parallel.
+    """
+
+    def __init__(self, filename, level, threads):
+        self.level = level
+        self._file = open(filename, 'wb')
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=threads)
+        self._max_pending = threads * 2
+        self._pending = collections.deque()
+        self._buffer = []
+        self._buffered_size = 0
+
+    def write(self, data):
+        """Queues bytes for compression and returns how many were accepted."""
+        self._buffer.append(bytes(data))
+        self._buffered_size += len(data)
+        if self._buffered_size >= _GZIP_MEMBER_BYTES:
+            self._submit()
+        return len(data)
+
+    def _submit(self):
+        piece = b"".join(self._buffer)
+        self._buffer = []
+        self._buffered_size = 0
+        for start in range(0, len(piece), _GZIP_MEMBER_BYTES):
+            member = piece[start:start + _GZIP_MEMBER_BYTES]
+            self._pending.append(self._pool.submit(gzip.compress, member, self.level, mtime=0))
+            # Write finished members in order, keeping a bounded number in flight.
+            while len(self._pending) > self._max_pending or (self._pending and self._pending[0].done()):
+                self._file.write(self._pending.popleft().result())
+
+    def close(self):
+        """Compresses and writes anything pending, then closes the file."""
+        if self._file.closed:
+            return
+        try:
+            self._submit()
+            while self._pending:
+                self._file.write(self._pending.popleft().result())
+        finally:
+            self._pool.shutdown()
+            self._file.close()
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def open_compressed(filename, mode, spill=False, threads=0):
+    """
+    Opens a file for binary reading ('rb') or writing ('wb'), compressing or
+    decompressing on the fly when its extension names a codec. `spill` picks the
+    fastest compression level for temporary files; `threads` above 1 compresses
+    gzip and zstd output on that many threads.
+    Raises ImportError if the codec's optional package is not installed.
+    """
+    codec = codec_for_filename(filename)
+    if codec is None:
+        return open(filename, mode)
+    level = (_SPILL_LEVELS if spill else _OUTPUT_LEVELS)[codec]
+
+    if codec == "gzip":
+        if mode == 'wb' and threads > 1:
+            return ParallelGzipWriter(filename, level, threads)
+        return gzip.open(filename, mode, compresslevel=level)
+
+    if codec == "zstd":
+        import zstandard # Optional dependency, only needed for .zst files.
+        if mode == 'wb':
+            compressor = zstandard.ZstdCompressor(level=level, threads=threads if threads > 1 else 0)
+            return compressor.stream_writer(open(filename, 'wb'), closefd=True)
+        return zstandard.ZstdDecompressor().stream_reader(open(filename, 'rb'), read_across_frames=True, closefd=True)
+
+    import lz4.frame # Optional dependency, only needed for .lz4 files.
+    return lz4.frame.open(filename, mode, compression_level=level)
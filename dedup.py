@@ -0,0 +1,335 @@
+import bisect
+import collections
+import itertools
+import operator
+import os
+import shutil
+import tempfile
+import compression
+import metrics
+
+# Default amount of memory the sort may use, in megabytes.
+DEFAULT_MEMORY_BUDGET_MB = 256
+
+# Python keeps every line as its own bytes object plus list entries while a run is
+# sorted, on top of the raw text it was split from, so a run holds several times its
+# raw size in memory. Raw bytes per run are therefore capped at this fraction of the
+# memory budget.
+_RUN_MEMORY_OVERHEAD_FACTOR = 16
+
+# Maximum number of files merged at once; larger merges are done in several passes.
+MAX_MERGE_FAN_IN = 64
+
+
+def _budget_to_run_bytes(memory_budget_mb):
+    """Converts a memory budget into the number of raw bytes that may be held at once."""
+    return max(1, int(memory_budget_mb * 1024 * 1024) // _RUN_MEMORY_OVERHEAD_FACTOR)
+
+
+def _join_unique_sorted(lines, previous_line=None):
+    """
+    Sorts a list of lines (without line endings) in place and joins it into one
+    newline-terminated chunk, dropping adjacent duplicates and a leading repeat of
+    `previous_line`. Timsort takes advantage of already sorted stretches (each word's
+    affix block is one, as is every run being merged), and the duplicate check runs
+    entirely in C via `itertools.compress`.
+    Returns the chunk and the number of lines in it.
+    """
+    lines.sort()
+    if not lines:
+        return b"", 0
+    keep_first = () if lines[0] == previous_line else lines[:1]
+    following = itertools.islice(lines, 1, None)
+    unique = itertools.chain(keep_first, itertools.compress(following, map(operator.ne, itertools.islice(lines, 1, None), lines)))
+    chunk = b"\n".join(unique)
+    if not chunk and not keep_first:
+        return b"", 0
+    return chunk + b"\n", chunk.count(b"\n") + 1
+
+
+def _write_sorted_run(lines, run_filename):
+    """
+    Sorts one in-memory run of lines and writes it to a run file. Duplicates are left
+    in place here; the merge drops them anyway, so removing them twice is wasted work.
+    The run is compressed if its filename ends in a codec extension.
+    """
+    lines.sort()
+    with compression.open_compressed(run_filename, 'wb', spill=True) as run_f:
+        run_f.write(b"\n".join(lines))
+        run_f.write(b"\n")
+
+
+class _BlockReader:
+    """Reads a newline-separated file as successive blocks of lines without line endings."""
+
+    def __init__(self, input_file, block_bytes):
+        self.input_file = input_file
+        self.block_bytes = block_bytes
+        self._partial_line = b""
+
+    def read_block(self):
+        """Returns the next list of complete lines, or an empty list at the end of the file."""
+        while True:
+            data = self.input_file.read(self.block_bytes)
+            if not data:
+                # A final line without a line ending is still a line.
+                lines = [self._partial_line] if self._partial_line else []
+                self._partial_line = b""
+                return lines
+            data = self._partial_line + data
+            last_newline = data.rfind(b"\n")
+            if last_newline < 0:
+                self._partial_line = data
+                continue
+            self._partial_line = data[last_newline + 1:]
+            return data[:last_newline].split(b"\n")
+
+
+def _merge_into(input_filenames, output_f, block_bytes):
+    """
+    K-way merges sorted files into an open binary file, dropping repeated lines.
+    Rather than pushing every line through a heap, each input is read a block at a
+    time: everything up to the smallest block-final line is guaranteed to come before
+    any unread line, so that stretch of every block is merged with one C-level sort
+    and written out together. Returns the number of unique lines written.
+    """
+    input_files = [compression.open_compressed(filename, 'rb') for filename in input_filenames]
+    try:
+        unique_count = 0
+        # Each entry is [block reader, current block of lines, position in the block].
+        active = []
+        for input_file in input_files:
+            reader = _BlockReader(input_file, block_bytes)
+            active.append([reader, reader.read_block(), 0])
+        active = [entry for entry in active if entry[1]]
+        previous_line = None
+        while active:
+            cutoff = min(block[-1] for _, block, _ in active)
+            merged = []
+            for entry in active:
+                reader, block, position = entry
+                split = bisect.bisect_right(block, cutoff, position)
+                merged += block[position:split] if position or split < len(block) else block
+                if split == len(block):
+                    entry[1], entry[2] = reader.read_block(), 0
+                else:
+                    entry[2] = split
+            active = [entry for entry in active if entry[1]]
+            # Lines equal to the cutoff were taken from every input at once, so apart from
+            # the boundary with the previous batch, duplicates only occur within this batch.
+            chunk, line_count = _join_unique_sorted(merged, previous_line)
+            output_f.write(chunk)
+            unique_count += line_count
+            metrics.count("merge", len(merged), line_count, len(chunk))
+            previous_line = merged[-1]
+        return unique_count
+    finally:
+        for input_file in input_files:
+            input_file.close()
+
+
+def merge_sorted_unique(input_filenames, output_filename, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB,
+                        temp_dir=None, max_fan_in=MAX_MERGE_FAN_IN, spill=False, compression_threads=0):
+    """
+    Merges bytewise-sorted, newline-separated files into one sorted file without
+    duplicates, using a block-wise k-way merge within the memory budget. When there are
+    more inputs than `max_fan_in`, they are merged in groups over several passes so the
+    number of open files stays bounded. Files are (de)compressed according to their
+    extensions; `spill` marks the output as temporary, and `compression_threads`
+    compresses the output on several threads. Returns the number of unique lines written.
+    """
+    input_filenames = list(input_filenames)
+    spill_extension = compression.extension_for_filename(input_filenames[0]) if input_filenames else ""
+    block_bytes = max(1, _budget_to_run_bytes(memory_budget_mb) // min(max(len(input_filenames), 1), max_fan_in))
+    work_dir = None
+    try:
+        pass_number = 0
+        while len(input_filenames) > max_fan_in:
+            if work_dir is None:
+                work_dir = tempfile.mkdtemp(prefix="seedspinner_merge_", dir=temp_dir)
+            merged_filenames = []
+            for group_start in range(0, len(input_filenames), max_fan_in):
+                merged_filename = os.path.join(work_dir, f"pass{pass_number}_{group_start:08d}.txt{spill_extension}")
+                with metrics.stage("merge"), compression.open_compressed(merged_filename, 'wb', spill=True) as merged_f:
+                    _merge_into(input_filenames[group_start:group_start + max_fan_in], merged_f, block_bytes)
+                merged_filenames.append(merged_filename)
+            # Intermediate files from the previous pass are no longer needed.
+            if pass_number > 0:
+                for filename in input_filenames:
+                    os.remove(filename)
+            input_filenames = merged_filenames
+            pass_number += 1
+
+        with metrics.stage("merge"), \
+                compression.open_compressed(output_filename, 'wb', spill=spill, threads=compression_threads) as output_f:
+            return _merge_into(input_filenames, output_f, block_bytes)
+    finally:
+        if work_dir is not None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+class SortedRunWriter:
+    """
+    A write-only text sink that deduplicates everything written to it with an external
+    merge sort. Written text is buffered until it reaches the run size allowed by the
+    memory budget; each full buffer is split into lines, sorted as bytes and spilled to
+    a run file. `finish` merges the runs into the output file; if nothing was spilled,
+    the buffer is sorted straight into the output instead.
+    Run files are compressed when `spill_extension` names a codec (e.g. '.gz').
+    Text written must consist of whole, newline-terminated lines.
+    """
+
+    def __init__(self, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB, temp_dir=None, spill_extension="",
+                 compression_threads=0):
+        self.memory_budget_mb = memory_budget_mb
+        self.temp_dir = temp_dir
+        self.spill_extension = spill_extension
+        self.compression_threads = compression_threads
+        self.run_bytes = _budget_to_run_bytes(memory_budget_mb)
+        self.run_filenames = []
+        self.run_dir = None
+        self._buffer = []
+        self._buffered_size = 0
+
+    def write(self, text):
+        """Buffers newline-terminated text (str or UTF-8 bytes), spilling a run when full."""
+        data = text if isinstance(text, bytes) else text.encode('utf-8')
+        self._buffer.append(data)
+        # The run size is a byte budget, so count the encoded length, not characters.
+        self._buffered_size += len(data)
+        if self._buffered_size >= self.run_bytes:
+            self._spill_run()
+
+    def _take_buffered_lines(self):
+        """Empties the buffer and returns its content as a list of lines without endings."""
+        data = b"".join(self._buffer)
+        self._buffer = []
+        self._buffered_size = 0
+        if not data:
+            return []
+        return data[:-1].split(b"\n") if data.endswith(b"\n") else data.split(b"\n")
+
+    def _spill_run(self):
+        if self.run_dir is None:
+            self.run_dir = tempfile.mkdtemp(prefix="seedspinner_sort_", dir=self.temp_dir)
+        run_filename = os.path.join(self.run_dir, f"run_{len(self.run_filenames):08d}.txt{self.spill_extension}")
+        with metrics.stage("sort"):
+            run_bytes = self._buffered_size
+            lines = self._take_buffered_lines()
+            _write_sorted_run(lines, run_filename)
+        metrics.count("sort", len(lines), len(lines), run_bytes)
+        self.run_filenames.append(run_filename)
+
+    def finish(self, output_filename, spill=False):
+        """
+        Writes the sorted, deduplicated result, compressed if the output filename names a
+        codec (at the fast spill level if `spill` is set), and returns the number of unique lines.
+        """
+        try:
+            if not self.run_filenames:
+                with metrics.stage("sort"):
+                    lines = self._take_buffered_lines()
+                    line_count = len(lines)
+                    chunk, unique_count = _join_unique_sorted(lines)
+                    with compression.open_compressed(output_filename, 'wb', spill=spill,
+                                                     threads=self.compression_threads) as output_f:
+                        output_f.write(chunk)
+                metrics.count("sort", line_count, unique_count, len(chunk))
+                return unique_count
+            if self._buffer:
+                self._spill_run()
+            return merge_sorted_unique(self.run_filenames, output_filename, self.memory_budget_mb, temp_dir=self.run_dir,
+                                       spill=spill, compression_threads=self.compression_threads)
+        finally:
+            self.close()
+
+    def close(self):
+        """Discards any buffered text and removes the run files."""
+        self._buffer = []
+        self._buffered_size = 0
+        if self.run_dir is not None:
+            shutil.rmtree(self.run_dir, ignore_errors=True)
+            self.run_dir = None
+        self.run_filenames = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class BloomFilter:
+    """
+    A fixed-size Bloom filter over strings. Membership answers are "definitely new" or
+    "probably seen"; the false-positive rate grows as more items are added than the
+    filter was sized for.
+    """
+
+    def __init__(self, memory_bytes, expected_items):
+        self.bit_count = max(8, int(memory_bytes) * 8)
+        self.bits = bytearray(self.bit_count // 8)
+        self.bit_count = len(self.bits) * 8
+        # The optimal number of hash functions for this size and load: (m / n) * ln 2.
+        self.hash_count = max(1, min(16, round(self.bit_count / max(1, expected_items) * 0.693)))
+
+    def check_and_add(self, item):
+        """Adds an item and returns True if it was (probably) already present."""
+        item_hash = hash(item) & 0xFFFFFFFFFFFFFFFF
+        # Double hashing: derive every bit position from two halves of one 64-bit hash.
+        first, step = item_hash & 0xFFFFFFFF, (item_hash >> 32) | 1
+        bits, bit_count = self.bits, self.bit_count
+        present = True
+        for i in range(self.hash_count):
+            position = (first + i * step) % bit_count
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                bits[position >> 3] |= mask
+                present = False
+        return present
+
+
+class RepeatFilter:
+    """
+    A bounded-memory filter that drops repeated strings from a stream before they reach
+    the sort. An exact LRU set of recently seen strings always runs and never drops
+    anything new. In "approximate" mode a Bloom filter also catches repeats that have
+    left the LRU window, at the cost of occasionally dropping a new string (a
+    false positive), so that mode trades completeness for a smaller spill.
+    """
+
+    # Rough per-entry cost of the LRU (dict slot, linked-list node and the string itself).
+    _RECENT_ENTRY_BYTES = 160
+
+    def __init__(self, mode="exact", memory_budget_mb=64):
+        if mode not in ("exact", "approximate"):
+            raise ValueError(f"Unknown pre-dedup filter mode: {mode}")
+        self.mode = mode
+        memory_bytes = int(memory_budget_mb * 1024 * 1024)
+        recent_bytes = memory_bytes if mode == "exact" else memory_bytes // 4
+        self.recent_capacity = max(1, recent_bytes // self._RECENT_ENTRY_BYTES)
+        self._recent = collections.OrderedDict()
+        self.bloom = None
+        if mode == "approximate":
+            bloom_bytes = memory_bytes - recent_bytes
+            # Sized for about 1% false positives: roughly 9.6 bits per expected item.
+            self.bloom = BloomFilter(bloom_bytes, expected_items=bloom_bytes * 8 // 10)
+        self.seen_count = 0
+        self.passed_count = 0
+
+    def filter(self, strings):
+        """Lazily yields the strings from an iterable that are not judged to be repeats."""
+        recent = self._recent
+        bloom = self.bloom
+        for string in strings:
+            self.seen_count += 1
+            if string in recent:
+                recent.move_to_end(string)
+                continue
+            if bloom is not None and bloom.check_and_add(string):
+                continue
+            recent[string] = None
+            if len(recent) > self.recent_capacity:
+                recent.popitem(last=False)
+            self.passed_count += 1
+            yield string
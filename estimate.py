@@ -1,8 +1,7 @@
 import math
 from collections import Counter
-import os
-import datetime # Make sure this is imported
 import tui
+import compression
 
 # --- Helper Functions ---
 
@@ -41,7 +40,7 @@ def _generate_simple_preview(base_words, mutation_config, max_preview=20):
     # 4. Add Affix samples if enabled
     if mutation_config.get("affixes", False):
         if len(preview_list) < max_preview: preview_list.add(first_word + "123")
-        if len(preview_list) < max_preview: preview_list.add("!" + first_word)
+        if len(preview_list) < max_preview: preview_list.add(first_word + "!")
         if len(preview_list) < max_preview: preview_list.add(second_word.title() + "24")
 
     # 5. Add Concatenation samples if enabled
@@ -77,87 +76,11 @@ def _calculate_string_list_char_entropy(string_list):
     entropy = -sum((count/total_chars) * math.log2(count/total_chars) for count in char_counts.values())
     return entropy
 
-def _estimate_leet_outputs(word, mutation_config):
+def estimate_list_size(state, lines, size_bytes, exact=False):
     """
-    Analyzes a word to estimate the combinatorial explosion from enabled leet speak rules.
-    This provides a more accurate factor than a static guess.
-    """
-    if not mutation_config.get("leet_speak", False):
-        return 1 # No leet speak, so 1 form (the original) is produced.
-
-    # This rule set should ideally be shared with the main generation engine
-    leet_rules = {
-        'a': ['@', '4'], 'e': ['3'], 'i': ['1', '!'], 'o': ['0'], 's': ['$', '5'], 't': ['7']
-    }
-    
-    # Calculate the product of possibilities for each character
-    total_combinations = 1
-    for char in word:
-        lower_char = char.lower()
-        if lower_char in leet_rules:
-            # Number of options for this char is 1 (original) + number of substitutes
-            num_options = 1 + len(leet_rules[lower_char])
-            total_combinations *= num_options
-            
-    return total_combinations
-
-def _calculate_upper_bound_estimate(base_words, mutation_config):
-    """
-    Calculates a pessimistic upper bound for lines and file size by mirroring
-    the main generation engine's multiplicative logic.
-    """
-    num_base_words = len(base_words)
-    if num_base_words == 0:
-        return {'lines': 0, 'size_bytes': 0}
-
-    # --- Factors and Affix Lists ---
-    # These counts should mirror the lists inside the main _apply_affixes function.
-    num_common_numbers = len([str(i) for i in range(10)] + ["0" + str(i) for i in range(10)] + ["123", "007", "12345"])
-    current_year = datetime.datetime.now().year
-    num_years = len([str(y) for y in range(current_year, current_year - 51, -1)]) * 2 # 4-digit and 2-digit
-    num_common_symbols = 11
-    total_affix_count = num_common_numbers + num_years + num_common_symbols
-    affix_application_factor = 1 + total_affix_count * 2 if mutation_config.get("affixes", False) else 1
-
-    # --- Estimate Core Variations for EACH word ---
-    # This word-aware estimation is key to accuracy.
-    estimated_core_variations_map = {}
-    for word in base_words:
-        caps_factor = 3 if mutation_config.get("capitalisation", False) else 1
-        # Use our combinatorial leet estimator for a much more accurate factor
-        leet_factor = _estimate_leet_outputs(word.lower(), mutation_config)
-        estimated_core_variations_map[word] = caps_factor * leet_factor
-
-    # --- Calculate Total Lines (before deduplication) ---
-    # 1. From single words
-    estimated_lines_single_raw = 0
-    for word in base_words:
-        estimated_lines_single_raw += estimated_core_variations_map[word] * affix_application_factor
-    # 2. From concatenation
-    estimated_lines_concat_raw = 0
-    if mutation_config.get("concatenation", False):
-        for word1 in base_words:
-            for word2 in base_words:
-                num_pairs = estimated_core_variations_map[word1] * estimated_core_variations_map[word2]
-                estimated_lines_concat_raw += num_pairs * affix_application_factor
-    estimated_total_lines_raw = estimated_lines_single_raw + estimated_lines_concat_raw
-
-    # --- Estimate File Size ---
-    avg_word_length = sum(len(w) for w in base_words) / num_base_words
-    avg_len_factor_concat = 2.0 if mutation_config.get("concatenation", False) else 1.0
-    avg_affix_len = 3.0 if mutation_config.get("affixes", False) else 0.0
-    estimated_avg_pass_len = (avg_word_length * avg_len_factor_concat) + avg_affix_len
-    estimated_file_size_bytes = estimated_total_lines_raw * (estimated_avg_pass_len + 1)
-
-    return {
-        'lines': estimated_total_lines_raw,
-        'size_bytes': estimated_file_size_bytes
-    }
-
-def estimate_list_size(state):
-    """
-    Main TUI function for Option 8. It orchestrates the preview generation,
-    calls the accurate estimation engine, and formats the output for the user.
+    Shows the generation preview and the resource estimate before generating. The number
+    of passwords and the file size are counted by the generation engine beforehand: exactly
+    when `exact` is set, otherwise as a maximum that still includes repeated candidates.
     """
     base_words = state.get('words_for_engine', [])
     mutation_config = state.get('mutation_config', {})
@@ -171,7 +94,7 @@ def estimate_list_size(state):
     enabled_mutations_display = []
     for key, display_name in [
         ("capitalisation", "Capitalisation"), ("leet_speak", "Leet Speak"),
-        ("concatenation", "Concatenation"), ("affixes", "Suffixes/Prefixes")
+        ("concatenation", "Concatenation"), ("affixes", "Suffixes")
     ]:
         if mutation_config.get(key, False):
             enabled_mutations_display.append(display_name)
@@ -192,17 +115,22 @@ def estimate_list_size(state):
         print("Preview: No example passwords generated.")
     print("\n-------------------------------------")
     
-    # --- Get and Display Final Estimates ---
-    estimates = _calculate_upper_bound_estimate(base_words, mutation_config)
-
-    print(f"\n~ Max Passwords (upper bound): ~{int(estimates['lines']):,}")
+    # --- Display Final Estimates ---
+    if exact: print(f"\nUnique Passwords (exact): {lines:,}")
+    else: print(f"\nPasswords (at most, repeats included): {lines:,}")
     
     # Format file size for readability
-    size_bytes = estimates['size_bytes']
     if size_bytes < 1024: size_display = f"{size_bytes:.0f} Bytes"
     elif size_bytes < 1024**2: size_display = f"{size_bytes / 1024:.2f} KB"
     elif size_bytes < 1024**3: size_display = f"{size_bytes / (1024**2):.2f} MB"
     else: size_display = f"{size_bytes / (1024**3):.2f} GB"
-    print(f"~ Max File Size (upper bound): ~{size_display}")
+    print(f"File Size ({'exact' if exact else 'at most'}): {size_display}")
+    if not exact: print("  (repeated candidates are not taken out; start without --fast-estimate for exact figures)")
+    codec = compression.codec_for_filename(state.get('output_filename', ''))
+    if codec: print(f"  (before {codec} compression; the file on disk will be smaller)")
+    budget = state.get('engine_config', {}).get('candidate_budget')
+    if budget and budget < lines:
+        share = f"{budget / lines:.2%}" if exact else f"at least {budget / lines:.2%}"
+        print(f"Candidate Budget: only the {budget:,} likeliest passwords will be written ({share} of the list).")
     print("\n-------------------------------------")
     tui.pause()
\ No newline at end of file
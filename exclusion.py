@@ -0,0 +1,400 @@
+import array
+import bisect
+import hashlib
+import heapq
+import json
+import mmap
+import os
+import shutil
+import sys
+import tempfile
+import zlib
+import compression
+import fileIO
+import metrics
+
+# --- Exclusion Index ---
+# Candidates a campaign has already tried -- rockyou-style lists, earlier SeedSpinner outputs --
+# can be left out of a new wordlist. The lists are compiled once into a memory-mapped index of
+# sorted 64-bit hashes of their lines, which the engine consults before writing each candidate.
+# A line's hash is its CRC-32 (high half) and 32 bits of BLAKE2b (low half). Most candidates
+# are not in the lists, so a lookup first tests a Bloom bit array addressed by the cheap CRC
+# alone (one probe, about 32 bits per hash, ~3% false positives); only candidates that pass
+# are hashed in full and binary-searched, within a bucket table over the hash's top bits.
+# The index records which lists it holds and how much of each; when a list has only grown
+# (new lines appended), just the new part is hashed and merged in, and other changes rebuild it.
+#
+# File layout: a header (magic, byte order, hash count, bucket bits, Bloom bits, manifest
+# length), the JSON manifest padded to 8 bytes, the Bloom bit array (2**bits bits), the bucket
+# table (2**bits + 1 unsigned 64-bit offsets), then the sorted, unique unsigned 64-bit hashes.
+
+INDEX_MAGIC = b"SSEXCL01"
+_HEADER_SIZE = 48
+_ITEM_SIZE = 8
+DEFAULT_INDEX_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "seedspinner")
+
+_RUN_ITEMS = 1 << 20         # Hashes sorted in memory at a time while building
+_READ_BYTES = 1 << 20        # List bytes read at a time
+_FINGERPRINT_BYTES = 1 << 16 # Bytes hashed at the start and end of a list's indexed part
+_MAX_BUCKET_BITS = 24
+_MIN_BLOOM_BITS = 6          # At least 8 bytes of Bloom bits
+_BLOOM_BITS_PER_HASH = 32
+_WRITE_ITEMS = 1 << 16
+
+
+def candidate_hash(line):
+    """Returns the 64-bit hash of a candidate (bytes without the line ending) used by the index."""
+    return zlib.crc32(line) << 32 | int.from_bytes(hashlib.blake2b(line, digest_size=4).digest(), "little")
+
+def default_index_path(list_paths):
+    """Returns the cache location of the index for a set of lists, so each set keeps its own index."""
+    key = hashlib.sha256(json.dumps(sorted(os.path.abspath(path) for path in list_paths)).encode("utf-8"))
+    return os.path.join(DEFAULT_INDEX_DIR, f"exclusions_{key.hexdigest()[:16]}.idx")
+
+
+def _fingerprint(path, end):
+    """Hashes the first and last bytes of a list's first `end` bytes, to tell appends from rewrites."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as list_f:
+        digest.update(list_f.read(min(end, _FINGERPRINT_BYTES)))
+        list_f.seek(max(0, end - _FINGERPRINT_BYTES))
+        digest.update(list_f.read(min(end, _FINGERPRINT_BYTES)))
+    return digest.hexdigest()
+
+def _read_lines(path, start=0, end=None):
+    """
+    Yields the non-empty lines of a list, as bytes without line endings, from byte offset `start`
+    up to `end` (the end of the file if None). Compressed lists (.gz, .zst, .lz4) are always read whole.
+    """
+    with compression.open_compressed(path, "rb") as list_f:
+        if start:
+            list_f.seek(start)
+        remaining = end - start if end is not None else None
+        rest = b""
+        while True:
+            chunk = list_f.read(_READ_BYTES if remaining is None else min(_READ_BYTES, remaining))
+            if remaining is not None:
+                remaining -= len(chunk)
+            if not chunk:
+                break
+            lines = (rest + chunk).split(b"\n")
+            rest = lines.pop()
+            for line in lines:
+                line = line.rstrip(b"\r")
+                if line:
+                    yield line
+        if rest.rstrip(b"\r"):
+            yield rest.rstrip(b"\r")
+
+def _resume_offset(path, size):
+    """
+    Returns where to continue reading a plain list of `size` bytes once it grows: its end, or
+    the start of its last line if that has no newline yet (it is indexed now and read again).
+    """
+    with open(path, "rb") as list_f:
+        position = size
+        while position > 0:
+            start = max(0, position - _READ_BYTES)
+            list_f.seek(start)
+            chunk = list_f.read(position - start)
+            newline = chunk.rfind(b"\n")
+            if newline >= 0:
+                return start + newline + 1
+            position = start
+        return 0
+
+def _write_sorted_runs(lines, run_dir, run_filenames):
+    """Hashes lines into sorted runs of at most `_RUN_ITEMS` hashes in `run_dir`. Returns the number hashed."""
+    hashed = 0
+    run = []
+    def spill():
+        run_filename = os.path.join(run_dir, f"run_{len(run_filenames):06d}.bin")
+        with open(run_filename, "wb") as run_f:
+            array.array("Q", sorted(run)).tofile(run_f)
+        run_filenames.append(run_filename)
+        run.clear()
+    for line in lines:
+        run.append(candidate_hash(line))
+        if len(run) >= _RUN_ITEMS:
+            hashed += len(run)
+            spill()
+    if run:
+        hashed += len(run)
+        spill()
+    return hashed
+
+def _read_run(run_filename):
+    with open(run_filename, "rb") as run_f:
+        while True:
+            items = array.array("Q")
+            items.frombytes(run_f.read(_READ_BYTES))
+            if not items:
+                return
+            yield from items
+
+
+def read_manifest(index_path):
+    """Returns the manifest (the indexed lists) of an index file, or None if it is missing or unreadable."""
+    try:
+        index = ExclusionIndex(index_path)
+    except (OSError, ValueError):
+        return None
+    try:
+        return index.manifest
+    finally:
+        index.close()
+
+def update_index(index_path, list_paths):
+    """
+    Brings the exclusion index at `index_path` up to date with the given lists, building it if
+    needed. Lists that only grew are hashed from where the index stopped and merged into it;
+    a list that was rewritten, shrunk or dropped from the set rebuilds the index.
+    Returns (number of hashes in the index, number of lines hashed by this update).
+    Raises OSError if a list or the index cannot be read or written.
+    """
+    manifest = read_manifest(index_path)
+    indexed = {source["path"]: source for source in manifest["sources"]} if manifest else {}
+    paths = list(dict.fromkeys(os.path.abspath(path) for path in list_paths))
+    rebuild = manifest is None or bool(set(indexed) - set(paths))
+    reads = [] # (path, start offset)
+    for path in paths:
+        status = os.stat(path)
+        source = indexed.get(path)
+        if source is None:
+            reads.append((path, 0))
+        elif status.st_size == source["size"] and status.st_mtime_ns == source["mtime_ns"]:
+            continue
+        elif (not compression.codec_for_filename(path) and status.st_size > source["size"]
+              and _fingerprint(path, source["size"]) == source["fingerprint"]):
+            reads.append((path, source["resume"]))
+        else:
+            rebuild = True
+    if rebuild:
+        reads = [(path, 0) for path in paths]
+    elif not reads:
+        return manifest["hash_count"], 0
+
+    sources = {} if rebuild else dict(indexed)
+    directory = os.path.dirname(os.path.abspath(index_path))
+    os.makedirs(directory, exist_ok=True)
+    run_dir = tempfile.mkdtemp(prefix="seedspinner_exclusions_", dir=directory)
+    try:
+        run_filenames = []
+        hashed = 0
+        for path, start in reads:
+            # Only the part present now is recorded, even if the list keeps growing while it is read.
+            status = os.stat(path)
+            size, mtime_ns = status.st_size, status.st_mtime_ns
+            compressed = compression.codec_for_filename(path) is not None
+            lines = _read_lines(path, start, None if compressed else size)
+            hashed += _write_sorted_runs(lines, run_dir, run_filenames)
+            sources[path] = {"path": path, "size": size, "mtime_ns": mtime_ns,
+                             "resume": 0 if compressed else _resume_offset(path, size),
+                             "fingerprint": None if compressed else _fingerprint(path, size)}
+        inputs = [_read_run(run_filename) for run_filename in run_filenames]
+        existing = None if rebuild else ExclusionIndex(index_path)
+        if existing is not None:
+            inputs.append(iter(existing._hashes))
+        hashes_filename = os.path.join(run_dir, "hashes.bin")
+        try:
+            hash_count, bucket_counts, bloom = _write_unique_hashes(
+                heapq.merge(*inputs), hashed + (existing.hash_count if existing else 0), hashes_filename)
+        finally:
+            if existing is not None:
+                existing.close()
+        _write_index(index_path, hashes_filename, hash_count, bucket_counts, bloom,
+                     {"version": 1, "hash_count": hash_count, "sources": [sources[path] for path in paths]})
+    finally:
+        for entry in os.listdir(run_dir):
+            os.remove(os.path.join(run_dir, entry))
+        os.rmdir(run_dir)
+    return hash_count, hashed
+
+def _write_unique_hashes(sorted_hashes, upper_bound, hashes_filename):
+    """
+    Writes the unique values of a sorted hash stream to a file, counting them per bucket and
+    setting their Bloom bits; both sizes are chosen from `upper_bound` hashes.
+    Returns (hash count, bucket counts, Bloom bit array).
+    """
+    bucket_bits = min(_MAX_BUCKET_BITS, (upper_bound // 8).bit_length())
+    shift = 64 - bucket_bits
+    bucket_counts = array.array("Q", bytes(_ITEM_SIZE << bucket_bits))
+    bloom_bits = min(32, max(_MIN_BLOOM_BITS, (upper_bound * _BLOOM_BITS_PER_HASH - 1).bit_length()))
+    bloom_shift = 64 - bloom_bits
+    bloom = bytearray(1 << (bloom_bits - 3))
+    hash_count = 0
+    with open(hashes_filename, "wb") as hashes_f:
+        batch = array.array("Q")
+        previous = None
+        for value in sorted_hashes:
+            if value == previous:
+                continue
+            previous = value
+            batch.append(value)
+            bucket_counts[value >> shift] += 1
+            bit = value >> bloom_shift
+            bloom[bit >> 3] |= 1 << (bit & 7)
+            if len(batch) >= _WRITE_ITEMS:
+                batch.tofile(hashes_f)
+                hash_count += len(batch)
+                batch = array.array("Q")
+        batch.tofile(hashes_f)
+        hash_count += len(batch)
+    return hash_count, bucket_counts, bloom
+
+def _write_index(index_path, hashes_filename, hash_count, bucket_counts, bloom, manifest):
+    """Writes an index file from a file of sorted unique hashes, their bucket counts and Bloom bits, atomically."""
+    offsets = array.array("Q", [0])
+    for count in bucket_counts:
+        offsets.append(offsets[-1] + count)
+    manifest_bytes = json.dumps(manifest).encode("utf-8")
+    manifest_bytes += b" " * (-len(manifest_bytes) % _ITEM_SIZE)
+
+    with fileIO.atomic_output(index_path) as index_f:
+        index_f.write(INDEX_MAGIC)
+        index_f.write(sys.byteorder[:1].encode("ascii").ljust(8, b"\0"))
+        index_f.write(array.array("Q", [hash_count, len(bucket_counts).bit_length() - 1, len(bloom).bit_length() + 2,
+                                        len(manifest_bytes)]).tobytes())
+        index_f.write(manifest_bytes)
+        index_f.write(bloom)
+        offsets.tofile(index_f)
+        with open(hashes_filename, "rb") as hashes_f:
+            shutil.copyfileobj(hashes_f, index_f, _READ_BYTES)
+
+
+class ExclusionIndex:
+    """A read-only, memory-mapped exclusion index produced by update_index()."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as index_f:
+            self._map = mmap.mmap(index_f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        if len(view) < _HEADER_SIZE or view[:8] != INDEX_MAGIC:
+            view.release()
+            self._map.close()
+            raise ValueError(f"Not a SeedSpinner exclusion index: {path}")
+        if view[8:9] != sys.byteorder[:1].encode("ascii"):
+            view.release()
+            self._map.close()
+            raise ValueError(f"Exclusion index was built on a machine with a different byte order: {path}")
+        self.hash_count, bucket_bits, bloom_bits, manifest_length = view[16:_HEADER_SIZE].cast("Q")
+        position = _HEADER_SIZE + manifest_length
+        self.manifest = json.loads(bytes(view[_HEADER_SIZE:position]))
+        self._shift = 64 - bucket_bits
+        self._bloom_shift = 32 - bloom_bits
+        self._bloom = view[position:position + (1 << (bloom_bits - 3))]
+        position += len(self._bloom)
+        bucket_end = position + ((1 << bucket_bits) + 1) * _ITEM_SIZE
+        self._offsets = view[position:bucket_end].cast("Q")
+        self._hashes = view[bucket_end:bucket_end + self.hash_count * _ITEM_SIZE].cast("Q")
+
+    def _contains_hash(self, value):
+        bucket = value >> self._shift
+        end = self._offsets[bucket + 1]
+        position = bisect.bisect_left(self._hashes, value, self._offsets[bucket], end)
+        return position < end and self._hashes[position] == value
+
+    def _contains(self, line):
+        # The Bloom bits rule out most lines from their CRC alone, before the full hash is computed.
+        crc = zlib.crc32(line)
+        bit = crc >> self._bloom_shift
+        if not self._bloom[bit >> 3] >> (bit & 7) & 1:
+            return False
+        return self._contains_hash(crc << 32 | int.from_bytes(hashlib.blake2b(line, digest_size=4).digest(), "little"))
+
+    def __contains__(self, candidate):
+        return self._contains(candidate.encode("utf-8") if isinstance(candidate, str) else candidate)
+
+    def filter_text(self, text):
+        """Drops the excluded lines from newline-terminated candidate text. Returns (kept text, kept count, excluded count)."""
+        lines = text.encode("utf-8").split(b"\n")
+        lines.pop()
+        contains = self._contains
+        kept = [line for line in lines if not contains(line)]
+        return (b"\n".join(kept) + b"\n" if kept else b"").decode("utf-8"), len(kept), len(lines) - len(kept)
+
+    def close(self):
+        self._bloom.release()
+        self._offsets.release()
+        self._hashes.release()
+        self._map.close()
+
+
+class CandidateLimitReached(Exception):
+    """Raised by an ExcludingWriter once it has passed on its limit of candidates."""
+
+
+class ExcludingWriter:
+    """
+    A write-only text sink that passes candidates on to another writer, leaving out those found
+    in the exclusion index at `index_path` and counting them. Without an index, text goes
+    straight through. With a `limit`, the writer passes on exactly that many candidates and
+    then raises CandidateLimitReached to stop the generation feeding it.
+    """
+
+    def __init__(self, out_f, index_path=None, limit=None):
+        self.out_f = out_f
+        self.limit = limit
+        self.passed_count = 0
+        self.excluded_count = 0
+        self.index = ExclusionIndex(index_path) if index_path else None
+        if self.index is None:
+            self.write = out_f.write
+
+    @property
+    def filtering(self):
+        return self.index is not None
+
+    def write(self, text):
+        """Filters and forwards a string of newline-terminated candidates."""
+        with metrics.stage("exclude"):
+            kept, kept_count, excluded_count = self.index.filter_text(text)
+        metrics.count("exclude", kept_count + excluded_count, kept_count)
+        self.excluded_count += excluded_count
+        if self.limit is not None and self.passed_count + kept_count >= self.limit:
+            remaining = self.limit - self.passed_count
+            if remaining:
+                self.out_f.write("\n".join(kept.split("\n", remaining)[:remaining]) + "\n")
+            self.passed_count = self.limit
+            raise CandidateLimitReached()
+        if kept:
+            self.out_f.write(kept)
+        self.passed_count += kept_count
+        return len(text)
+
+    def close(self):
+        """Closes the index; the writer it feeds stays open."""
+        if self.index is not None:
+            self.index.close()
+            self.index = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Build or update the exclusion index SeedSpinner uses to leave "
+                                                 "already-tried candidates out of a wordlist.")
+    parser.add_argument("lists", nargs="+", help="wordlists whose lines are excluded (.gz/.zst/.lz4 allowed)")
+    parser.add_argument("-o", "--output", help="index file (default: a file in the SeedSpinner cache, "
+                                               "named after the set of lists)")
+    parser.add_argument("--query", help="comma-separated candidates to look up in the finished index")
+    args = parser.parse_args()
+
+    index_path = args.output or default_index_path(args.lists)
+    start_time = time.perf_counter()
+    hash_count, hashed = update_index(index_path, args.lists)
+    print(f"Exclusion index {index_path}: {hash_count:,} candidates ({os.path.getsize(index_path) / 2**20:.1f} MB); "
+          f"hashed {hashed:,} new line(s) in {time.perf_counter() - start_time:.1f}s.")
+    if args.query:
+        index = ExclusionIndex(index_path)
+        for candidate in args.query.split(","):
+            print(f"{candidate}: {'excluded' if candidate in index else 'not excluded'}")
+        index.close()
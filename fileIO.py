@@ -1,5 +1,10 @@
 import tui
+import contextlib
 import os
+import stat
+import sys
+import time
+import compression
 
 # --- UI Interaction Functions ---
 # These functions are called from the TUI menu to handle file-related settings.
@@ -51,10 +56,174 @@ def set_output_filename(state):
     tui.clear_screen()
     print("--- Set Output Filename ---\n")
     current_name = state['output_filename']
+    print("End the name in .gz, .zst or .lz4 to write a compressed wordlist.")
     new_name = input(f"Enter filename [Current: {current_name}]: ").strip()
     if new_name:
+        codec = compression.codec_for_filename(new_name)
+        reason = compression.codec_unavailable_reason(codec)
+        if reason:
+            print(f"[Error] {reason}")
+            tui.pause()
+            return
         state['output_filename'] = new_name
         print(f"Output filename set to: {state['output_filename']}")
+        if codec:
+            print(f"The wordlist and its temporary files will be compressed with {codec}.")
     else:
         print("No changes made.")
-    tui.pause()
\ No newline at end of file
+    tui.pause()
+
+
+# --- Atomic File Output ---
+
+@contextlib.contextmanager
+def atomic_output(path):
+    """
+    Opens `path` for binary writing under a temporary name and renames it into place when the
+    block completes, so a reader never sees a half-written file. On error the partial file is removed.
+    """
+    partial_path = path + ".partial"
+    try:
+        with open(partial_path, "wb") as partial_f:
+            yield partial_f
+        os.replace(partial_path, path)
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+
+
+# --- Candidate Output ---
+# The generation engine hands its candidates to a writer in newline-terminated blocks.
+
+DEFAULT_WRITE_BLOCK_KB = 1024
+# The output filename that stands for standard output.
+STDOUT_FILENAME = "-"
+
+def is_pipe_output(filename):
+    """Tells whether an output filename is standard output ('-') or a named pipe (FIFO)."""
+    if filename == STDOUT_FILENAME:
+        return True
+    try:
+        return stat.S_ISFIFO(os.stat(filename).st_mode)
+    except OSError:
+        return False
+
+class CandidateWriter:
+    """
+    A file-like sink that batches candidate text into large byte blocks before writing.
+    Pending text is joined and encoded once per block and written with a single unbuffered
+    call, or, with `use_writev`, encoded piece by piece and handed to one `os.writev` call
+    without joining. It counts the lines and (uncompressed) bytes written, so the
+    throughput of a generation run (`lines_per_second`) can be reported, and the lines
+    handed to it (`lines_queued`), written or still pending.
+    A filename ending in .gz, .zst or .lz4 is stream-compressed; `spill` marks a
+    temporary file, which gets the fastest compression level. The filename '-' writes to
+    standard output (which is left open on close).
+    """
+
+    def __init__(self, filename, block_size_kb=DEFAULT_WRITE_BLOCK_KB, use_writev=False, spill=False,
+                 compression_threads=0):
+        self.block_size = max(1, int(block_size_kb * 1024))
+        self.compressed = compression.codec_for_filename(filename) is not None
+        # `os.writev` is only available on POSIX systems and only for uncompressed files;
+        # fall back to plain writes elsewhere.
+        self.use_writev = use_writev and not self.compressed and hasattr(os, "writev")
+        self.lines_written = 0
+        self.bytes_written = 0
+        self.lines_queued = 0
+        self._pending = []
+        self._pending_size = 0
+        self._pending_lines = 0
+        if self.compressed:
+            self._file = compression.open_compressed(filename, 'wb', spill=spill, threads=compression_threads)
+        elif filename == STDOUT_FILENAME:
+            # Text already printed to standard output goes out before the candidates.
+            sys.__stdout__.flush()
+            self._file = open(sys.__stdout__.fileno(), 'wb', buffering=0, closefd=False)
+        else:
+            self._file = open(filename, 'wb', buffering=0)
+        self._started = time.perf_counter()
+        self._elapsed = None
+
+    def write(self, text):
+        """Queues a string of newline-terminated candidates, writing a block once enough is pending."""
+        self._pending.append(text)
+        self._pending_size += len(text)
+        line_count = text.count("\n")
+        self._pending_lines += line_count
+        self.lines_queued += line_count
+        if self._pending_size >= self.block_size:
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        """Writes out everything that is pending."""
+        if not self._pending:
+            return
+        if self.use_writev:
+            buffers = [text.encode('utf-8') for text in self._pending]
+            self._write_vectors(buffers)
+            self.bytes_written += sum(map(len, buffers))
+        else:
+            data = "".join(self._pending).encode('utf-8')
+            self._write_all(memoryview(data))
+            self.bytes_written += len(data)
+        self.lines_written += self._pending_lines
+        self._pending = []
+        self._pending_size = 0
+        self._pending_lines = 0
+
+    def _write_all(self, view):
+        """Writes a whole buffer, retrying after partial writes."""
+        if self.compressed:
+            # Compressed streams always take the whole buffer.
+            self._file.write(view)
+            return
+        while view:
+            view = view[self._file.write(view):]
+
+    def _write_vectors(self, buffers):
+        """Writes a list of buffers with as few `os.writev` calls as the system allows."""
+        try:
+            max_vectors = os.sysconf("SC_IOV_MAX")
+        except (ValueError, OSError):
+            max_vectors = 1024
+        fd = self._file.fileno()
+        for start in range(0, len(buffers), max_vectors):
+            batch = buffers[start:start + max_vectors]
+            written = os.writev(fd, batch)
+            # A partial write leaves the rest of the batch to be written the plain way.
+            for buffer in batch:
+                if written >= len(buffer):
+                    written -= len(buffer)
+                    continue
+                self._write_all(memoryview(buffer)[written:])
+                written = 0
+
+    @property
+    def elapsed(self):
+        """Seconds since the writer was opened, up to when it was closed."""
+        return self._elapsed if self._elapsed is not None else time.perf_counter() - self._started
+
+    @property
+    def lines_per_second(self):
+        """The number of lines written per second so far."""
+        elapsed = self.elapsed
+        return self.lines_written / elapsed if elapsed > 0 else 0.0
+
+    def close(self):
+        """Writes anything pending and closes the file."""
+        if self._file.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._file.close()
+            self._elapsed = time.perf_counter() - self._started
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
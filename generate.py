@@ -1,224 +1,1735 @@
 import itertools
+import heapq
+import math
+import concurrent.futures
+from operator import contains, methodcaller
 import tui
 from datetime import datetime
 import tempfile
-import subprocess
+import shutil
 import os
+import sys
+import time
+import contextlib
+import json
+import hashlib
 import estimate
+import dedup
+import fileIO
+import compression
+import exclusion
+import metrics
 
 # --- Helper Mutation Functions ---
 # These functions perform a single type of mutation on a given word.
 
 def _apply_capitalisation(word):
-    """Generates a set of common capitalisation variations for a single word."""
-    variations = {word.lower(), word.title(), word.upper()}
-    variations.add(word) # Ensure the original form is included
-    return list(variations)
-
-def _apply_leet_speak(word):
-    """Generates leet speak variations using a recursive approach for combinatorial substitutions."""
-    subs = {
-        'a': ['@', '4'], 'A': ['@', '4'],
-        'e': ['3'],      'E': ['3'],
-        'i': ['1', '!'], 'I': ['1', '!'],
-        'o': ['0'],      'O': ['0'],
-        's': ['$', '5'], 'S': ['$', '5'],
-        't': ['7'],      'T': ['7'],
-    }
-    forms = {word} # Always include the original, un-leeted word
-
-    # This recursive function explores all combinations of enabled substitutions.
-    def generate_leets_recursive(current_word_list, index):
-        if index == len(current_word_list):
-            forms.add("".join(current_word_list))
-            return
-
-        original_char = current_word_list[index]
-        # Explore paths without substituting the current character
-        generate_leets_recursive(list(current_word_list), index + 1)
+    """Yields the distinct common capitalisation variations of a single word."""
+    # At most four forms, so a throwaway dict is the cheapest way to drop repeats.
+    yield from dict.fromkeys((word, word.lower(), word.title(), word.upper()))
 
-        # Explore paths WITH substitutions for the current character
-        if original_char in subs:
-            for sub_char in subs[original_char]:
-                current_word_list[index] = sub_char
-                generate_leets_recursive(list(current_word_list), index + 1)
-                current_word_list[index] = original_char # Backtrack for other possibilities
-    
-    # Start the recursion only if there are characters in the word that can be substituted.
-    if any(c in subs for c in word):
-        generate_leets_recursive(list(word), 0)
+# Leet speak substitution rules, keyed by the character they replace.
+LEET_SUBSTITUTIONS = {
+    'a': ('@', '4'), 'A': ('@', '4'),
+    'e': ('3',),     'E': ('3',),
+    'i': ('1', '!'), 'I': ('1', '!'),
+    'o': ('0',),     'O': ('0',),
+    's': ('$', '5'), 'S': ('$', '5'),
+    't': ('7',),     'T': ('7',),
+}
 
-    return list(forms)
+def _compile_leet_options(word):
+    """
+    Compiles a word into one tuple of candidate characters per position: the original
+    character first, followed by any leet substitutes for it.
+    """
+    return tuple((char,) + LEET_SUBSTITUTIONS.get(char, ()) for char in word)
 
 
-def _apply_affixes(word):
+def build_affix_table(current_year=None, years_to_generate=50):
     """
-    Applies a comprehensive set of hardcoded affixes, including dynamically generated years
-    and chained (number/symbol) combinations.
+    Builds the ordered, duplicate-free tuple of suffix strings used by the affix stage,
+    including dynamically generated years and chained (number/symbol) combinations.
+    The empty string comes first so the unmodified word is always part of the expansion.
+    This is built once per generation run and shared by every word and concatenation.
     """
+    if current_year is None:
+        current_year = datetime.now().year
+
     # --- Define Affix Groups ---
-    current_year = datetime.now().year
-    years_to_generate = 50
-    
-    full_years = [str(year) for year in range(current_year, current_year - years_to_generate - 1, -1)]
-    two_digit_years = [datetime(year, 1, 1).strftime('%y') for year in range(current_year, current_year - years_to_generate - 1, -1)]
+    years = range(current_year, current_year - years_to_generate - 1, -1)
+    full_years = [str(year) for year in years]
+    two_digit_years = [f"{year % 100:02d}" for year in years]
     simple_numbers = [str(i) for i in range(10)] + ["0" + str(i) for i in range(10)] + ["123", "12345"]
-    
+
     numeric_affixes = full_years + two_digit_years + simple_numbers
     symbol_affixes = ["!", "@", "#", "$", "%", "^", "&", "*", "?", "_", "-"]
 
-    final_variations = {word} # Start with the base word
+    suffixes = [""] # The base word itself
 
-    # 1. Apply SINGLE suffixes from all groups
-    all_simple_affixes = numeric_affixes + symbol_affixes
-    for affix in all_simple_affixes:
-        final_variations.add(word + affix)
+    # 1. SINGLE suffixes from all groups
+    suffixes.extend(numeric_affixes + symbol_affixes)
+    # 2. CHAINED SUFFIXES (Pattern: wordNUMBERsymbol)
+    suffixes.extend(num + sym for num in numeric_affixes for sym in symbol_affixes)
+    # 3. CHAINED SUFFIXES (Pattern: wordSYMBOLnumber)
+    suffixes.extend(sym + num for sym in symbol_affixes for num in numeric_affixes)
 
-    # 2. Apply CHAINED SUFFIXES (Pattern: wordNUMBERsymbol)
-    for num in numeric_affixes:
-        word_with_num = word + num
-        for sym in symbol_affixes:
-            final_variations.add(word_with_num + sym)
+    # The groups overlap (e.g. "05" is both a simple number and a two-digit year), so the
+    # table is deduplicated once here instead of deduplicating every expanded word.
+    return tuple(dict.fromkeys(suffixes))
 
-    # 3. Apply CHAINED SUFFIXES (Pattern: wordSYMBOLnumber)
-    for sym in symbol_affixes:
-        word_with_sym = word + sym
-        for num in numeric_affixes:
-            final_variations.add(word_with_sym + num)
+def _affix_table_for(mutation_config):
+    """The affix table a run uses: the full table with affixes enabled, otherwise only the empty suffix."""
+    return build_affix_table() if mutation_config.get("affixes", False) else ("",)
 
-    return list(final_variations)
+def _build_line_join_table(affix_table):
+    """
+    Prepares an affix table for `_apply_affix_blocks`. Each suffix gets its line ending,
+    and a leading empty element lets `str.join` place the word in front of every suffix.
+    The lines are put in byte order, so every expanded word is already a sorted run for
+    the deduplication step.
+    """
+    return ("",) + tuple(sorted((suffix + "\n" for suffix in affix_table), key=lambda line: line.encode('utf-8')))
 
-def _generate_single_word_core_variations(base_word, mutation_config):
+def _apply_affix_blocks(forms, line_join_table):
     """
-    Creates the "core" variations of a word by handling Capitalisation and Leet Speak.
-    If both are enabled, their effects are implicitly combined. Affixes are NOT handled here.
+    The streaming affix stage: lazily expands each incoming form into one block of
+    newline-terminated candidates with a single join, ready to be written out.
     """
-    # Initialize the set with the base word and its lowercase to ensure it always exists.
-    forms_after_caps = {base_word.lower(), base_word}
-    
-    # If capitalisation is on, update the set with more variations.
+    return map(methodcaller("join", line_join_table), forms)
+
+def _exclude_earlier_forms(options, earlier_options):
+    """
+    Splits one capitalisation's leet options into option blocks whose products skip every
+    string an earlier capitalisation already produces. Two forms can only collide at the
+    positions where they differ (e.g. 's' and 'S' both become '$'), so only those
+    positions are enumerated and checked; the rest stay as plain option tuples.
+    """
+    overlaps = [] # (differing positions, shared characters at each) per earlier form
+    for earlier in earlier_options:
+        if len(earlier) != len(options):
+            continue # Strings of different lengths can never collide.
+        differing = [i for i in range(len(options)) if options[i] != earlier[i]]
+        shared = [set(options[i]).intersection(earlier[i]) for i in differing]
+        if all(shared):
+            overlaps.append((differing, shared))
+
+    if not overlaps:
+        return [options]
+
+    positions = sorted({i for differing, _ in overlaps for i in differing})
+    blocks = []
+    for assignment in itertools.product(*(options[i] for i in positions)):
+        chosen = dict(zip(positions, assignment))
+        # This assignment repeats an earlier form if every differing position is shared.
+        if any(all(chosen[i] in chars for i, chars in zip(differing, shared))
+               for differing, shared in overlaps):
+            continue
+        block = list(options)
+        for i, char in chosen.items():
+            block[i] = (char,)
+        blocks.append(tuple(block))
+    return blocks
+
+def _compile_caps_patterns(base_word, mutation_config):
+    """
+    Compiles each distinct capitalisation of a word into a pattern: a tuple of
+    per-position character options (the character plus any enabled leet substitutes).
+    A word's core forms are exactly the strings matching at least one of its patterns.
+    """
+    with metrics.stage("caps"):
+        caps_forms = _distinct_capitalisations(base_word, mutation_config)
+        if not mutation_config.get("leet_speak", False):
+            return [tuple((char,) for char in form) for form in caps_forms]
+    with metrics.stage("leet"):
+        return [_compile_leet_options(form) for form in caps_forms]
+
+def _distinct_capitalisations(base_word, mutation_config):
+    """Returns the distinct capitalisations of a word, starting with its lowercase and given forms."""
+    caps_forms = [base_word.lower(), base_word]
     if mutation_config.get("capitalisation", False):
-        forms_after_caps.update(_apply_capitalisation(base_word))
+        caps_forms.extend(_apply_capitalisation(base_word))
+    # Drop repeated capitalisations so the same form is never expanded twice.
+    return list(dict.fromkeys(caps_forms))
+
+def _compile_caps_option_blocks(base_word, mutation_config):
+    """
+    Compiles each distinct capitalisation of a word into its pattern and the option blocks
+    left after carving out the strings an earlier capitalisation already produces.
+    Returns (pattern, blocks) pairs in capitalisation order.
+    """
+    # Leet forms of different capitalisations overlap, so carve the repeats out up front.
+    # Without leet speak each capitalisation is a single, fixed block and nothing overlaps.
+    compiled = []
+    compiled_patterns = []
+    stage = "leet" if mutation_config.get("leet_speak", False) else "caps"
+    for pattern in _compile_caps_patterns(base_word, mutation_config):
+        with metrics.stage(stage):
+            compiled.append((pattern, _exclude_earlier_forms(pattern, compiled_patterns)))
+        compiled_patterns.append(pattern)
+    return compiled
+
+def _compile_core_option_blocks(base_word, mutation_config):
+    """
+    Compiles a word into option blocks: tuples of per-position character options whose
+    Cartesian products together give the word's "core" Caps/Leet variations, each exactly
+    once. The blocks are tiny compared to the variations they describe, so they can be
+    kept for the whole run and expanded lazily wherever a word's forms are needed.
+    """
+    return [block for _, blocks in _compile_caps_option_blocks(base_word, mutation_config) for block in blocks]
+
+def _expand_option_blocks(blocks):
+    """Lazily yields every string described by a list of option blocks."""
+    join = "".join
+    for block in blocks:
+        for combination in itertools.product(*block):
+            yield join(combination)
+
+def _apply_concatenation(blocks1, blocks2, chunk_size=4096):
+    """
+    Yields every combination of the core variations of two words, given their compiled
+    option blocks. The second word's forms are expanded in bounded chunks and the first
+    word's forms are regenerated per chunk, so memory stays flat however many
+    variations either word has.
+    """
+    second_forms = _expand_option_blocks(blocks2)
+    while True:
+        chunk = list(itertools.islice(second_forms, chunk_size))
+        if not chunk:
+            return
+        for v1 in _expand_option_blocks(blocks1):
+            yield from map(v1.__add__, chunk)
+
+def _count_option_block_bytes(blocks):
+    """Sums the UTF-8 byte lengths of all strings described by a list of option blocks."""
+    total_bytes = 0
+    for block in blocks:
+        form_count = math.prod(len(options) for options in block)
+        # Each option appears in form_count / len(options) of the block's strings.
+        total_bytes += sum(sum(len(option.encode('utf-8')) for option in options) * form_count // len(options)
+                           for options in block)
+    return total_bytes
 
-    # Apply leet speak to all forms generated so far (base word and/or capitalized versions).
-    final_core_forms = set()
+# Roughly how many characters of candidate blocks are joined into one write call.
+_WRITE_BATCH_CHARS = 1 << 16
+
+def _write_blocks(out_f, blocks):
+    """
+    Writes a stream of candidate blocks to a file and returns how many blocks it held.
+    Blocks are joined into batches of about `_WRITE_BATCH_CHARS` first, so small blocks
+    (a single line each when affixes are off) do not cost one write call per line.
+    """
+    block_count = 0
+    batch_size = 1
+    write = out_f.write
+    recording = metrics.recording()
+    while True:
+        # Pulling a batch runs the lazy stages feeding it; each charges its own time.
+        with metrics.stage("affix"):
+            batch = list(itertools.islice(blocks, batch_size))
+            text = "".join(batch)
+        if not batch:
+            return block_count
+        block_count += len(batch)
+        with metrics.stage("write"):
+            write(text)
+        if recording:
+            _record_written_batch(len(batch), text)
+        # Size the next batch from the average block length seen in this one.
+        batch_size = max(1, _WRITE_BATCH_CHARS * len(batch) // max(1, len(text)))
+
+
+def _record_written_batch(block_count, text):
+    """Counts one batch of `_write_blocks` into the affix and write stage metrics."""
+    line_count = text.count("\n")
+    metrics.count("affix", block_count, line_count)
+    metrics.count("write", line_count, line_count, len(text) if text.isascii() else len(text.encode('utf-8')))
+
+def _record_core_counts(base_word, mutation_config, blocks):
+    """Counts a word's capitalisations and core forms into the caps, leet and forms stage metrics."""
+    caps_count = len(_distinct_capitalisations(base_word, mutation_config))
+    form_count = _count_option_block_forms(blocks)
+    metrics.count("caps", 1, caps_count)
     if mutation_config.get("leet_speak", False):
-        for form_cap in forms_after_caps:
-            final_core_forms.update(_apply_leet_speak(form_cap))
+        metrics.count("leet", caps_count, form_count)
+    metrics.count("forms", form_count)
+
+def _count_option_block_forms(blocks):
+    """Counts the strings described by a list of option blocks without expanding them."""
+    return sum(math.prod(len(options) for options in block) for block in blocks)
+
+def _plan_generation_units(base_words, mutation_config):
+    """
+    Splits a generation run into independent units of work: one per single word and,
+    when concatenation is enabled, one per first word of the concatenation loop.
+    """
+    units = [("single", i_idx) for i_idx in range(len(base_words))]
+    if mutation_config.get("concatenation", False) and len(base_words) > 1:
+        units.extend(("concat", i_idx) for i_idx in range(len(base_words)))
+    return units
+
+def _generate_units(out_f, units, base_words, mutation_config, line_join_table, show_progress=True, form_filter=None):
+    """
+    Streams every candidate of the given units into an open text file. Every stage is
+    a generator (caps -> leet -> concat -> affix), so memory use does not grow with the
+    number of variations a single word produces. An optional `dedup.RepeatFilter` sits
+    in front of the affix stage: a repeated form would only repeat its whole affix block.
+    Returns the raw number of candidates generated and the number actually written.
+    """
+    candidates_per_form = len(line_join_table) - 1
+    written_candidate_count = 0
+    # Compiled option blocks are reused as the components for concatenation.
+    core_blocks = [_compile_core_option_blocks(word, mutation_config) for word in base_words]
+    seen_before = form_filter.seen_count - form_filter.passed_count if form_filter else 0
+    seen_count_before = form_filter.seen_count if form_filter else 0
+    recording = metrics.recording()
+
+    for kind, i_idx in units:
+        word1_base = base_words[i_idx]
+        if kind == "single":
+            if show_progress: print(f"\rProcessing single-word forms for: '{word1_base}'...", end="")
+            if recording: _record_core_counts(word1_base, mutation_config, core_blocks[i_idx])
+            forms = metrics.timed("forms", _expand_option_blocks(core_blocks[i_idx]))
+            if form_filter: forms = metrics.timed("prefilter", form_filter.filter(forms))
+            written_candidate_count += _write_blocks(out_f, _apply_affix_blocks(forms, line_join_table)) * candidates_per_form
+        else:
+            if show_progress: print(f"\rConcatenating with '{word1_base}' as first word...", end="")
+            for j_idx in range(len(base_words)):
+                if i_idx == j_idx: continue
+                metrics.count("concat", 1)
+                forms = metrics.timed("concat", _apply_concatenation(core_blocks[i_idx], core_blocks[j_idx]))
+                if form_filter: forms = metrics.timed("prefilter", form_filter.filter(forms))
+                written_candidate_count += _write_blocks(out_f, _apply_affix_blocks(forms, line_join_table)) * candidates_per_form
+    if show_progress and units: print() # Add a newline to finalize the progress bar.
+
+    dropped_forms = (form_filter.seen_count - form_filter.passed_count - seen_before) if form_filter else 0
+    if form_filter: metrics.count("prefilter", form_filter.seen_count - seen_count_before)
+    return written_candidate_count + dropped_forms * candidates_per_form, written_candidate_count
+
+# --- Duplicate-Free Construction ---
+# Instead of sorting candidates to remove repeats, the "construct" dedup mode works out up
+# front which stems (single words or concatenations) can collide with an earlier stem and
+# only checks those, so every candidate is written exactly once and straight to the output.
+
+# Maps each leet substitute back to the letter it replaces, e.g. '$' and '5' to 's'.
+_LEET_LETTERS = {sub: char.lower() for char, subs in LEET_SUBSTITUTIONS.items() for sub in subs}
+
+def _skeleton(text):
+    """
+    Reduces a string to a caseless, leet-free skeleton of the same length. Every string a
+    caps pattern matches shares one skeleton, so stems with unrelated skeletons never collide.
+    """
+    def fold(char):
+        lowered = char.lower()
+        return _LEET_LETTERS.get(char) or (lowered if len(lowered) == 1 else char)
+    return "".join(map(fold, text))
+
+def _matches(text, pattern):
+    """Checks a string against a pattern of per-position option strings, up to the shorter of the two."""
+    return all(map(contains, pattern, text))
+
+def _compile_suffix_splits(affix_table):
+    """
+    Indexes how the affix table's suffixes split into two parts where the second part is
+    a suffix of its own. Returns a dict with "after", mapping a leading part to the
+    suffixes that complete it, "heads", mapping a length to {leading part: whole suffixes},
+    and "prefixes", every prefix of every suffix (to prune searches for leading parts).
+    """
+    suffix_set = set(affix_table)
+    suffixes_after = {}
+    heads = {}
+    prefixes = set()
+    for suffix in affix_table:
+        for split in range(1, len(suffix) + 1):
+            head, rest = suffix[:split], suffix[split:]
+            prefixes.add(head)
+            if rest in suffix_set:
+                suffixes_after.setdefault(head, set()).add(rest)
+                heads.setdefault(split, {}).setdefault(head, set()).add(suffix)
+    return {"after": suffixes_after, "heads": heads, "prefixes": prefixes}
+
+def _spelled_heads(pattern, suffix_splits):
+    """
+    Lists the leading suffix parts (see `_compile_suffix_splits`) a pattern of option
+    strings can spell. The pattern is walked one position at a time, keeping only
+    partial strings that still start some suffix, so letters are ruled out at once.
+    """
+    heads_of_length = suffix_splits["heads"].get(len(pattern))
+    if not heads_of_length:
+        return []
+    prefixes = suffix_splits["prefixes"]
+    partials = [""]
+    for options in pattern:
+        partials = [partial + char for partial in partials for char in options if partial + char in prefixes]
+        if not partials:
+            return []
+    return [partial for partial in partials if partial in heads_of_length]
+
+def _plan_duplicate_free_sources(base_words, mutation_config, affix_table):
+    """
+    Finds the stem sources that can repeat candidates of an earlier source. Sources are
+    the single words followed by every ordered pair, in generation order. Two stems can
+    only produce the same candidate if one skeleton is a prefix of the other, at most the
+    longest suffix apart, and the longer stem's extra characters can spell the start of a
+    suffix. Returns the risky sources mapped to (pattern, is the source itself) checks,
+    and the words whose forms have differing lengths (their concatenations can repeat
+    stems and need a stem set).
+    """
+    word_count = len(base_words)
+    max_suffix_length = max(map(len, affix_table))
+    suffix_splits = _compile_suffix_splits(affix_table)
+    word_patterns = [[tuple(map("".join, pattern)) for pattern in _compile_caps_patterns(word, mutation_config)]
+                     for word in base_words]
+    word_skeletons = [{_skeleton(pattern_options[0] for pattern_options in pattern) for pattern in patterns}
+                      for patterns in word_patterns]
+    varying_words = {i_idx for i_idx, patterns in enumerate(word_patterns) if len(set(map(len, patterns))) > 1}
+    concatenating = mutation_config.get("concatenation", False) and word_count > 1
+
+    def source_patterns(source_id):
+        if source_id < word_count:
+            return word_patterns[source_id]
+        i_idx, j_idx = divmod(source_id - word_count, word_count)
+        return list(dict.fromkeys(first + second for first in word_patterns[i_idx] for second in word_patterns[j_idx]))
+
+    skeleton_index = {}
+    for i_idx, skeletons in enumerate(word_skeletons):
+        for skeleton in skeletons:
+            skeleton_index.setdefault(skeleton, []).append(i_idx)
+    if concatenating:
+        for i_idx, j_idx in itertools.permutations(range(word_count), 2):
+            source_id = word_count + i_idx * word_count + j_idx
+            for skeleton in {first + second for first in word_skeletons[i_idx] for second in word_skeletons[j_idx]}:
+                skeleton_index.setdefault(skeleton, []).append(source_id)
+
+    spelling_cache = {}
+    def can_spell_suffix_start(source_id, start, length):
+        # Whether the source's stems of this length can spell a suffix's start from `start` on.
+        key = (source_id, start, length)
+        if key not in spelling_cache:
+            spelling_cache[key] = any(len(pattern) == length and _spelled_heads(pattern[start:], suffix_splits)
+                                      for pattern in source_patterns(source_id))
+        return spelling_cache[key]
+
+    risky_pairs = set()
+    for skeleton, source_ids in skeleton_index.items():
+        for length in range(max(0, len(skeleton) - max_suffix_length), len(skeleton) + 1):
+            for shorter_id in skeleton_index.get(skeleton[:length], ()):
+                for longer_id in source_ids:
+                    if shorter_id == longer_id:
+                        continue
+                    if length < len(skeleton) and not can_spell_suffix_start(longer_id, length, len(skeleton)):
+                        continue
+                    risky_pairs.add((min(shorter_id, longer_id), max(shorter_id, longer_id)))
+
+    source_risks = {}
+    for earlier_id, later_id in sorted(risky_pairs):
+        source_risks.setdefault(later_id, []).extend((pattern, False) for pattern in source_patterns(earlier_id))
+    # A source whose stems differ in length (e.g. 'ß' and its upper case 'SS') can also repeat
+    # its own candidates, so it is checked against its own shorter stems as well.
+    if max_suffix_length and varying_words:
+        varying_sources = list(varying_words)
+        if concatenating:
+            varying_sources += [word_count + i_idx * word_count + j_idx
+                                for i_idx, j_idx in itertools.permutations(range(word_count), 2)
+                                if i_idx in varying_words or j_idx in varying_words]
+        for source_id in varying_sources:
+            source_risks.setdefault(source_id, []).extend((pattern, True) for pattern in source_patterns(source_id))
+    return source_risks, varying_words
+
+# The most recent collision plan, reused while a process works through several units of one run.
+_last_duplicate_free_plan = {}
+
+def _cached_duplicate_free_plan(base_words, mutation_config, affix_table):
+    """Returns `_plan_duplicate_free_sources` for these inputs, planning only once per run."""
+    key = (tuple(base_words), tuple(sorted(mutation_config.items())), affix_table)
+    if key not in _last_duplicate_free_plan:
+        _last_duplicate_free_plan.clear()
+        _last_duplicate_free_plan[key] = _plan_duplicate_free_sources(base_words, mutation_config, affix_table)
+    return _last_duplicate_free_plan[key]
+
+def _stem_exclusions(stem, risks, suffix_splits):
+    """
+    Works out which suffixes of a stem repeat a candidate an earlier stem already produced.
+    Returns None when the whole stem was produced before, otherwise the set of suffixes to skip.
+    """
+    excluded = set()
+    stem_length = len(stem)
+    suffixes_after = suffix_splits["after"]
+    for pattern, own_source in risks:
+        pattern_length = len(pattern)
+        if pattern_length == stem_length:
+            if not own_source and _matches(stem, pattern):
+                return None
+        elif pattern_length < stem_length:
+            # A shorter stem whose suffix spells out the rest of this stem plus a suffix.
+            completions = suffixes_after.get(stem[pattern_length:])
+            if completions and _matches(stem, pattern):
+                excluded.update(completions)
+        elif not own_source:
+            # A longer stem: this stem's suffix spells out the rest of it plus a suffix.
+            heads_of_length = suffix_splits["heads"].get(pattern_length - stem_length)
+            if heads_of_length and _matches(stem, pattern):
+                for head in _spelled_heads(pattern[stem_length:], suffix_splits):
+                    excluded.update(heads_of_length[head])
+    return excluded
+
+def _checked_stems(forms, risks, repeats_stems, suffix_splits):
+    """
+    Yields each stem of a risky source that still produces new candidates, together with
+    the set of suffixes it must skip. `repeats_stems` drops stems the source repeats itself.
+    """
+    seen_stems = set() if repeats_stems else None
+    for stem in forms:
+        if seen_stems is not None:
+            if stem in seen_stems: continue
+            seen_stems.add(stem)
+        excluded = _stem_exclusions(stem, risks, suffix_splits) if risks else set()
+        if excluded is not None:
+            yield stem, excluded
+
+def _collect_affected_stems(blocks, risks, suffix_splits):
+    """
+    Collects the stems of a source, given as option blocks, that one of its risk checks
+    could apply to. Each check only touches stems whose characters fall within the
+    checked pattern (and, for a shorter pattern, whose extra characters spell the start
+    of a suffix), so these are enumerated directly instead of walking every stem.
+    """
+    affected = set()
+    join = "".join
+    max_suffix_length = max(suffix_splits["heads"], default=0)
+    for block in blocks:
+        block_length = len(block)
+        for pattern, own_source in risks:
+            pattern_length = len(pattern)
+            if (own_source and pattern_length >= block_length) or abs(pattern_length - block_length) > max_suffix_length:
+                continue
+            # The stems matching the pattern over the positions both share.
+            shared = [tuple(char for char in options if char in pattern_options)
+                      for options, pattern_options in zip(block, pattern)]
+            if not all(shared):
+                continue
+            if pattern_length < block_length:
+                for head in _spelled_heads(block[pattern_length:], suffix_splits):
+                    affected.update(map(join, itertools.product(*shared, *head)))
+            elif pattern_length == block_length or _spelled_heads(pattern[block_length:], suffix_splits):
+                affected.update(map(join, itertools.product(*shared)))
+    return affected
+
+def _construct_units(out_f, units, base_words, mutation_config, affix_table, show_progress=True):
+    """
+    Writes every candidate of the given units exactly once, without sorting or a temporary
+    file. Sources that cannot collide with an earlier one take the plain streaming path;
+    the risky ones are checked stem by stem and skip the suffixes (or whole stems) an
+    earlier source already covered. Returns the number of candidates written.
+    """
+    line_join_table = _build_line_join_table(affix_table)
+    candidates_per_form = len(line_join_table) - 1
+    source_risks, varying_words = _cached_duplicate_free_plan(base_words, mutation_config, affix_table)
+    suffix_splits = _compile_suffix_splits(affix_table)
+    filtered_tables = {}
+    core_blocks = [_compile_core_option_blocks(word, mutation_config) for word in base_words]
+    word_count = len(base_words)
+    written_candidate_count = 0
+
+    def checked_blocks(forms, risks, repeats_stems):
+        # The slow path for risky sources: each stem is checked before it is affixed.
+        nonlocal written_candidate_count
+        for stem, excluded in _checked_stems(forms, risks, repeats_stems, suffix_splits):
+            table = line_join_table
+            if excluded:
+                key = frozenset(excluded)
+                table = filtered_tables.get(key)
+                if table is None:
+                    table = filtered_tables[key] = ("",) + tuple(line for line in line_join_table[1:] if line[:-1] not in key)
+            written_candidate_count += len(table) - 1
+            yield stem.join(table)
+
+    def write_source(source_id, forms, repeats_stems=False):
+        nonlocal written_candidate_count
+        risks = source_risks.get(source_id)
+        if not risks and not repeats_stems:
+            written_candidate_count += _write_blocks(out_f, _apply_affix_blocks(forms, line_join_table)) * candidates_per_form
+        else:
+            _write_blocks(out_f, checked_blocks(forms, risks, repeats_stems))
+
+    for kind, i_idx in units:
+        word1_base = base_words[i_idx]
+        if kind == "single":
+            if show_progress: print(f"\rProcessing single-word forms for: '{word1_base}'...", end="")
+            if metrics.recording(): _record_core_counts(word1_base, mutation_config, core_blocks[i_idx])
+            write_source(i_idx, metrics.timed("forms", _expand_option_blocks(core_blocks[i_idx])))
+        else:
+            if show_progress: print(f"\rConcatenating with '{word1_base}' as first word...", end="")
+            for j_idx in range(word_count):
+                if i_idx == j_idx: continue
+                metrics.count("concat", 1)
+                write_source(word_count + i_idx * word_count + j_idx,
+                             metrics.timed("concat", _apply_concatenation(core_blocks[i_idx], core_blocks[j_idx])),
+                             repeats_stems=i_idx in varying_words)
+    if show_progress and units: print() # Add a newline to finalize the progress bar.
+    return written_candidate_count
+
+def estimate_candidate_count(base_words, mutation_config):
+    """
+    Works out how many candidates a generation run produces before duplicates are removed,
+    and their size in bytes, from each word's option-block counts alone. This is an upper
+    bound on the wordlist (exact when no two candidates collide) that costs a few
+    operations per word, for when count_unique_candidates() is too slow. Returns (candidate count, size in bytes).
+    """
+    if not base_words:
+        return 0, 0
+    affix_table = _affix_table_for(mutation_config)
+    suffix_count = len(affix_table)
+    all_suffix_bytes = sum(len(suffix.encode('utf-8')) for suffix in affix_table) + suffix_count
+    core_blocks = [_compile_core_option_blocks(word, mutation_config) for word in base_words]
+    form_counts = [_count_option_block_forms(blocks) for blocks in core_blocks]
+    form_bytes = [_count_option_block_bytes(blocks) for blocks in core_blocks]
+    total_forms, total_bytes = sum(form_counts), sum(form_bytes)
+    stem_count, stem_bytes = total_forms, total_bytes
+    if mutation_config.get("concatenation", False) and len(base_words) > 1:
+        # Every ordered pair of two different words: all pairs of forms, minus a word paired with itself.
+        stem_count += total_forms * total_forms - sum(count * count for count in form_counts)
+        stem_bytes += 2 * (total_bytes * total_forms - sum(map(math.prod, zip(form_bytes, form_counts))))
+    return stem_count * suffix_count, stem_bytes * suffix_count + stem_count * all_suffix_bytes
+
+def count_unique_candidates(base_words, mutation_config):
+    """
+    Counts exactly how many distinct candidates a generation run produces, and the size
+    in bytes of the resulting wordlist, without generating it. Uses the same rule tables
+    and collision plan as the duplicate-free construct mode: every source is counted from
+    its option blocks, and for risky sources only the stems a collision check can apply
+    to are enumerated and taken back out. Returns (candidate count, size in bytes).
+    """
+    if not base_words:
+        return 0, 0
+    affix_table = _affix_table_for(mutation_config)
+    suffix_bytes = {suffix: len(suffix.encode('utf-8')) for suffix in affix_table}
+    suffix_count = len(affix_table)
+    # Every line is stem + suffix + "\n", so a stem's block adds this much beyond its own length.
+    all_suffix_bytes = sum(suffix_bytes.values()) + suffix_count
+    source_risks, varying_words = _plan_duplicate_free_sources(base_words, mutation_config, affix_table)
+    suffix_splits = _compile_suffix_splits(affix_table)
+    core_blocks = [_compile_core_option_blocks(word, mutation_config) for word in base_words]
+    form_counts = [_count_option_block_forms(blocks) for blocks in core_blocks]
+    form_bytes = [_count_option_block_bytes(blocks) for blocks in core_blocks]
+    word_count = len(base_words)
+    excluded_bytes = {}
+
+    candidate_count = total_bytes = 0
+    def remove_stem(stem, excluded):
+        # Takes back the candidates of one stem that are skipped (all of them if `excluded` is None).
+        nonlocal candidate_count, total_bytes
+        stem_bytes = len(stem.encode('utf-8'))
+        if excluded is None:
+            candidate_count -= suffix_count
+            total_bytes -= stem_bytes * suffix_count + all_suffix_bytes
+        elif excluded:
+            key = frozenset(excluded)
+            if key not in excluded_bytes:
+                excluded_bytes[key] = sum(suffix_bytes[suffix] + 1 for suffix in key)
+            candidate_count -= len(key)
+            total_bytes -= stem_bytes * len(key) + excluded_bytes[key]
+
+    def count_source(source_id, blocks, stem_count, stem_bytes, repeats_stems=False):
+        nonlocal candidate_count, total_bytes
+        risks = source_risks.get(source_id)
+        if repeats_stems:
+            # Irregular sources are enumerated in full, like the construct mode writes them.
+            for stem, excluded in _checked_stems(_expand_option_blocks(blocks), risks, True, suffix_splits):
+                candidate_count += suffix_count
+                total_bytes += len(stem.encode('utf-8')) * suffix_count + all_suffix_bytes
+                remove_stem(stem, excluded)
+            return
+        candidate_count += stem_count * suffix_count
+        total_bytes += stem_bytes * suffix_count + stem_count * all_suffix_bytes
+        if risks:
+            for stem in _collect_affected_stems(blocks, risks, suffix_splits):
+                remove_stem(stem, _stem_exclusions(stem, risks, suffix_splits))
+
+    for i_idx in range(word_count):
+        count_source(i_idx, core_blocks[i_idx], form_counts[i_idx], form_bytes[i_idx])
+    if mutation_config.get("concatenation", False) and word_count > 1:
+        for i_idx, j_idx in itertools.permutations(range(word_count), 2):
+            count_source(word_count + i_idx * word_count + j_idx,
+                         [first + second for first in core_blocks[i_idx] for second in core_blocks[j_idx]],
+                         form_counts[i_idx] * form_counts[j_idx],
+                         form_bytes[i_idx] * form_counts[j_idx] + form_counts[i_idx] * form_bytes[j_idx],
+                         repeats_stems=i_idx in varying_words)
+    return candidate_count, total_bytes
+
+def _create_form_filter(engine_config, share=1):
+    """Builds the optional pre-dedup filter described by the engine config, or None."""
+    mode = engine_config.get("prefilter")
+    if not mode:
+        return None
+    return dedup.RepeatFilter(mode, engine_config.get("prefilter_memory_mb", 64) / share)
+
+def _report_filter_counts(raw_candidate_count, written_candidate_count, engine_config):
+    """
+    Prints how many raw candidates the pre-dedup filter kept away from the sort. The
+    approximate filter's drops are not all repeats: a Bloom false positive drops a new
+    form, and with it the form's whole affix block.
+    """
+    print(f"\nGenerated {raw_candidate_count:,} raw password candidates.")
+    mode = engine_config.get("prefilter")
+    if mode:
+        dropped = raw_candidate_count - written_candidate_count
+        share = dropped / raw_candidate_count if raw_candidate_count else 0
+        if mode == "approximate":
+            print(f"Pre-dedup filter (approximate) dropped {dropped:,} candidates ({share:.1%}) as likely repeats; "
+                  f"{written_candidate_count:,} candidates passed to the sort.")
+            print("  Some of the dropped candidates may be new ones lost to Bloom filter false positives, each "
+                  "taking a form's whole affix block; use --prefilter exact to keep every candidate.")
+        else:
+            print(f"Pre-dedup filter (exact) dropped {dropped:,} repeats ({share:.1%}); "
+                  f"{written_candidate_count:,} candidates passed to the sort.")
+
+def _assign_units_to_workers(units, base_words, mutation_config, workers):
+    """
+    Balances the units across workers by their expected number of core forms, always
+    giving the next largest unit to the least loaded worker.
+    """
+    form_counts = [_count_option_block_forms(_compile_core_option_blocks(word, mutation_config)) for word in base_words]
+    total_forms = sum(form_counts)
+
+    def unit_cost(unit):
+        kind, i_idx = unit
+        if kind == "single":
+            return form_counts[i_idx]
+        return form_counts[i_idx] * (total_forms - form_counts[i_idx])
+
+    assignments = [[] for _ in range(workers)]
+    loads = [0] * workers
+    for unit in sorted(units, key=unit_cost, reverse=True):
+        target = loads.index(min(loads))
+        assignments[target].append(unit)
+        loads[target] += unit_cost(unit)
+    return [assigned for assigned in assignments if assigned]
+
+def _generate_shard(base_words, mutation_config, units, shard_filename, memory_budget_mb, engine_config):
+    """
+    Worker entry point for parallel generation: streams the candidates of its units into
+    its own external sort and leaves a sorted, deduplicated shard behind.
+    Returns the raw and written candidate counts.
+    """
+    affix_table = _affix_table_for(mutation_config)
+    form_filter = _create_form_filter(engine_config, share=max(1, int(engine_config.get("workers", 1))))
+    with dedup.SortedRunWriter(memory_budget_mb, temp_dir=os.path.dirname(shard_filename),
+                               spill_extension=compression.extension_for_filename(shard_filename)) as run_writer, \
+            _open_exclusion_filter(run_writer, engine_config) as sink:
+        raw_count, written_count = _generate_units(sink, units, base_words, mutation_config,
+                                                   _build_line_join_table(affix_table), show_progress=False,
+                                                   form_filter=form_filter)
+        run_writer.finish(shard_filename, spill=True)
+    return raw_count - sink.excluded_count, written_count - sink.excluded_count
+
+def _generate_with_workers(base_words, mutation_config, units, output_filename, workers, memory_budget_mb, engine_config):
+    """
+    Spreads the units over a pool of worker processes, each producing its own sorted shard,
+    then k-way merges the shards into the output file. The memory budget is shared
+    between the workers. Returns the raw and unique candidate counts.
+    """
+    started = time.perf_counter()
+    shard_dir = tempfile.mkdtemp(prefix="seedspinner_shards_")
+    try:
+        assignments = _assign_units_to_workers(units, base_words, mutation_config, workers)
+        spill_extension = compression.extension_for_filename(output_filename)
+        shard_filenames = [os.path.join(shard_dir, f"shard_{i:04d}.txt{spill_extension}") for i in range(len(assignments))]
+        worker_budget_mb = memory_budget_mb / workers
+        print(f"\nGenerating {len(assignments)} sorted shard(s) with {workers} worker process(es) in: {shard_dir}")
+
+        raw_candidate_count = written_candidate_count = 0
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [metrics.submit(pool, _generate_shard, base_words, mutation_config, assigned, shard_filename,
+                                      worker_budget_mb, engine_config)
+                       for assigned, shard_filename in zip(assignments, shard_filenames)]
+            for finished, future in enumerate(concurrent.futures.as_completed(futures), 1):
+                raw_count, written_count = future.result()
+                raw_candidate_count += raw_count
+                written_candidate_count += written_count
+                print(f"\rFinished shard {finished}/{len(futures)}...", end="")
+        print()
+
+        _report_filter_counts(raw_candidate_count, written_candidate_count, engine_config)
+        print("Merging sorted shards and removing duplicates...")
+        unique_count = dedup.merge_sorted_unique(shard_filenames, output_filename, memory_budget_mb, temp_dir=shard_dir,
+                                                 compression_threads=_compression_threads(engine_config))
+        # Generation, sort and merge together: the sorted output is only complete at the end.
+        _report_throughput(unique_count, time.perf_counter() - started)
+        return raw_candidate_count, unique_count
+    finally:
+        shutil.rmtree(shard_dir, ignore_errors=True)
+
+def _generate_serial(base_words, mutation_config, units, output_filename, memory_budget_mb, engine_config):
+    """
+    Streams every candidate into an in-process external merge sort, which spills sorted
+    runs to temporary files and merges them, deduplicated, into the output file.
+    Returns the raw and unique candidate counts.
+    """
+    # The affix table is identical for every word, so build it once for the whole run.
+    # With affixes disabled the table holds only the empty suffix (the word itself).
+    affix_table = _affix_table_for(mutation_config)
+    started = time.perf_counter()
+
+    with dedup.SortedRunWriter(memory_budget_mb, spill_extension=compression.extension_for_filename(output_filename),
+                               compression_threads=_compression_threads(engine_config)) as run_writer, \
+            _open_exclusion_filter(run_writer, engine_config) as sink:
+        print(f"\nGenerating raw candidates into sorted runs (memory budget: {memory_budget_mb:g} MB)...")
+        raw_candidate_count, written_candidate_count = _generate_units(
+            sink, units, base_words, mutation_config, _build_line_join_table(affix_table),
+            form_filter=_create_form_filter(engine_config))
+
+        _report_exclusion_count(sink)
+        raw_candidate_count -= sink.excluded_count
+        written_candidate_count -= sink.excluded_count
+        _report_filter_counts(raw_candidate_count, written_candidate_count, engine_config)
+        print(f"Merging {max(len(run_writer.run_filenames), 1)} sorted run(s) and removing duplicates...")
+        unique_count = run_writer.finish(output_filename)
+    # Generation, sort and merge together: the sorted output is only complete at the end.
+    _report_throughput(unique_count, time.perf_counter() - started)
+    print("Cleaned up temporary files.")
+    return raw_candidate_count, unique_count
+
+
+def _report_throughput(line_count, elapsed, byte_count=None):
+    """Prints how many lines the output got (and their size, if known) and the lines written per second."""
+    size = f" ({byte_count / 2**20:,.1f} MB)" if byte_count is not None else ""
+    lines_per_second = line_count / elapsed if elapsed > 0 else 0.0
+    print(f"Wrote {line_count:,} lines{size} in {elapsed:.2f}s: {lines_per_second:,.0f} lines/s.")
+
+def _compression_threads(engine_config):
+    """The number of threads used to compress the final output (all CPUs unless configured)."""
+    return max(1, int(engine_config.get("compression_threads") or os.cpu_count() or 1))
+
+def _open_candidate_writer(filename, engine_config, spill=False):
+    """Opens the buffered bulk writer for candidate output, as configured by the engine config."""
+    return fileIO.CandidateWriter(filename, engine_config.get("write_block_kb", fileIO.DEFAULT_WRITE_BLOCK_KB),
+                                  use_writev=engine_config.get("use_writev", False), spill=spill,
+                                  compression_threads=0 if spill else _compression_threads(engine_config))
+
+def _open_exclusion_filter(out_f, engine_config, limit=None):
+    """
+    Wraps a candidate sink so the candidates in the configured exclusion index are left out
+    (see exclusion.py); without an "exclusion_index" the sink is written to directly.
+    """
+    return exclusion.ExcludingWriter(out_f, engine_config.get("exclusion_index"), limit)
+
+def _report_exclusion_count(sink):
+    """Prints how many candidates the exclusion index kept out of the output."""
+    if sink.filtering:
+        print(f"\nExclusion index left out {sink.excluded_count:,} already-tried candidate(s).")
+
+def _construct_shard(base_words, mutation_config, units, shard_filename, engine_config):
+    """Worker entry point for duplicate-free construction: writes its units to an unsorted shard."""
+    affix_table = _affix_table_for(mutation_config)
+    with _open_candidate_writer(shard_filename, engine_config, spill=True) as shard_writer, \
+            _open_exclusion_filter(shard_writer, engine_config) as sink:
+        written_count = _construct_units(sink, units, base_words, mutation_config, affix_table, show_progress=False)
+    return written_count - sink.excluded_count
+
+def _concatenate_shards(shard_filenames, output_filename):
+    """Writes unsorted shards one after another into the output file."""
+    # Gzip members and zstd/lz4 frames can be concatenated, so compressed shards are copied as they are.
+    with open(output_filename, 'wb') as output_f:
+        for shard_filename in shard_filenames:
+            with open(shard_filename, 'rb') as shard_f:
+                shutil.copyfileobj(shard_f, output_f)
+
+def _generate_constructed(base_words, mutation_config, units, output_filename, workers, engine_config):
+    """
+    Writes every candidate exactly once without a sort: serially straight into the output
+    file, or with several workers into unsorted shards that are simply concatenated.
+    The output is not sorted. Returns the number of unique candidates.
+    """
+    if workers <= 1 or len(units) <= 1:
+        affix_table = _affix_table_for(mutation_config)
+        print("\nWriting duplicate-free candidates directly to the output file (no sort)...")
+        with _open_candidate_writer(output_filename, engine_config) as output_writer, \
+                _open_exclusion_filter(output_writer, engine_config) as sink:
+            unique_count = _construct_units(sink, units, base_words, mutation_config, affix_table) - sink.excluded_count
+        _report_exclusion_count(sink)
+        _report_throughput(output_writer.lines_written, output_writer.elapsed, output_writer.bytes_written)
+        return unique_count
+
+    shard_dir = tempfile.mkdtemp(prefix="seedspinner_shards_")
+    try:
+        assignments = _assign_units_to_workers(units, base_words, mutation_config, workers)
+        spill_extension = compression.extension_for_filename(output_filename)
+        shard_filenames = [os.path.join(shard_dir, f"shard_{i:04d}.txt{spill_extension}") for i in range(len(assignments))]
+        print(f"\nGenerating {len(assignments)} duplicate-free shard(s) with {workers} worker process(es) in: {shard_dir}")
+
+        unique_count = 0
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [metrics.submit(pool, _construct_shard, base_words, mutation_config, assigned, shard_filename,
+                                      engine_config)
+                       for assigned, shard_filename in zip(assignments, shard_filenames)]
+            for finished, future in enumerate(concurrent.futures.as_completed(futures), 1):
+                unique_count += future.result()
+                print(f"\rFinished shard {finished}/{len(futures)}...", end="")
+        print()
+
+        print("Concatenating shards into the output file...")
+        _concatenate_shards(shard_filenames, output_filename)
+        return unique_count
+    finally:
+        shutil.rmtree(shard_dir, ignore_errors=True)
+
+
+# --- Probability-Ordered Output ---
+# The "probability" output order writes the likeliest candidates first. Each candidate is
+# scored from per-rule weights (its capitalisation, how many leet substitutions it makes,
+# whether it is a concatenation, and the kind of suffix it ends in). Candidates sharing all
+# of those have the same score, so they are enumerated as groups: a source's stems are split
+# into groups by capitalisation and substitution count, the affix table into classes by
+# suffix kind, and a priority merge pops (group, suffix class) combinations in descending
+# score. The heap holds one entry per group in play, not one per candidate, so memory stays
+# bounded and nothing is sorted. Repeats are skipped with the construct mode's collision plan.
+
+# Relative likelihoods of each rule's outcomes; a candidate's weight is the product of the
+# weights of every rule it went through. Override any of them with a JSON file of the same shape.
+DEFAULT_RANK_WEIGHTS = {
+    "caps": {"lower": 1.0, "title": 0.5, "original": 0.3, "upper": 0.1},
+    "leet_substitution": 0.2, # Per substituted character
+    "concatenation": 0.3,
+    "suffix": {"none": 1.0, "number": 0.6, "year": 0.5, "two_digit": 0.5,
+               "symbol": 0.3, "number_symbol": 0.15, "symbol_number": 0.05},
+}
+
+# Scores are kept as integer costs (negative log-weights, in thousandths) so that sums are exact.
+_RANK_COST_SCALE = 1000
+
+def load_rank_weights(filename=None):
+    """
+    Returns the rank weights: the defaults, updated from a JSON file with any subset of the
+    same keys if one is given. Raises OSError or ValueError if the file cannot be used.
+    """
+    weights = {rule: dict(value) if isinstance(value, dict) else value for rule, value in DEFAULT_RANK_WEIGHTS.items()}
+    if not filename:
+        return weights
+    with open(filename, "r", encoding="utf-8") as weights_f:
+        overrides = json.load(weights_f)
+    if not isinstance(overrides, dict):
+        raise ValueError(f"{filename} must contain a JSON object.")
+    for rule, value in overrides.items():
+        if rule not in weights:
+            raise ValueError(f"Unknown rank weight '{rule}' in {filename}.")
+        if isinstance(weights[rule], dict):
+            unknown = set(value) - set(weights[rule]) if isinstance(value, dict) else None
+            if unknown is None or unknown:
+                raise ValueError(f"'{rule}' in {filename} must map {', '.join(weights[rule])} to weights.")
+            weights[rule].update(value)
+        else:
+            weights[rule] = value
+    for value in [weight for rule_weights in weights.values()
+                  for weight in (rule_weights.values() if isinstance(rule_weights, dict) else [rule_weights])]:
+        if not isinstance(value, (int, float)) or value <= 0:
+            raise ValueError(f"Rank weights must be positive numbers, got {value!r} in {filename}.")
+    return weights
+
+def _rank_cost(weight):
+    return round(-math.log(weight) * _RANK_COST_SCALE)
+
+def _caps_kind(form):
+    """Classifies a capitalisation for ranking: 'lower', 'title', 'upper' or 'original' (as entered)."""
+    if form == form.lower(): return "lower"
+    if form == form.title(): return "title"
+    if form == form.upper(): return "upper"
+    return "original"
+
+def _suffix_kind(suffix):
+    """Classifies an affix table suffix for ranking (see the "suffix" rank weights)."""
+    if not suffix: return "none"
+    if suffix.isdigit():
+        return "year" if len(suffix) == 4 else "two_digit" if len(suffix) == 2 else "number"
+    if suffix[0].isdigit(): return "number_symbol"
+    if suffix[-1].isdigit(): return "symbol_number"
+    return "symbol"
+
+def _compile_suffix_classes(affix_table, weights):
+    """
+    Groups the affix table into classes of equally weighted suffixes. Returns (cost, line join
+    table) pairs, likeliest first; within a class the suffixes keep their table order.
+    """
+    classes = {}
+    for suffix in affix_table:
+        classes.setdefault(_rank_cost(weights["suffix"][_suffix_kind(suffix)]), []).append(suffix + "\n")
+    return [(cost, ("",) + tuple(lines)) for cost, lines in sorted(classes.items())]
+
+def _split_blocks_by_substitutions(pattern, blocks):
+    """
+    Splits a capitalisation's option blocks by the number of leet substitutions their strings
+    make. Returns {substitution count: option blocks}; together they describe exactly the
+    strings of `blocks`, each once.
+    """
+    levels = {}
+    for block in blocks:
+        # Per position: the unsubstituted character if the block allows it, and the substitutes it allows.
+        originals = [(pattern_options[0],) if pattern_options[0] in options else ()
+                     for pattern_options, options in zip(pattern, block)]
+        substitutes = [tuple(char for char in options if char != pattern_options[0])
+                       for pattern_options, options in zip(pattern, block)]
+        required = sum(1 for kept in originals if not kept)
+        optional = [i for i, (kept, subs) in enumerate(zip(originals, substitutes)) if kept and subs]
+        for count in range(len(optional) + 1):
+            for substituted in itertools.combinations(optional, count):
+                chosen = set(substituted)
+                levels.setdefault(required + count, []).append(tuple(
+                    substitutes[i] if i in chosen or not originals[i] else originals[i] for i in range(len(block))))
+    return levels
+
+def _compile_rank_groups(base_word, mutation_config, weights):
+    """
+    Splits a word's core forms into groups of equal score: one per capitalisation and number of
+    leet substitutions. Returns (cost, option blocks) pairs, cheapest (likeliest) first.
+    """
+    leet_cost = _rank_cost(weights["leet_substitution"])
+    groups = []
+    for pattern, blocks in _compile_caps_option_blocks(base_word, mutation_config):
+        caps_cost = _rank_cost(weights["caps"][_caps_kind("".join(options[0] for options in pattern))])
+        for count, level_blocks in _split_blocks_by_substitutions(pattern, blocks).items():
+            groups.append((caps_cost + count * leet_cost, level_blocks))
+    groups.sort(key=lambda group: group[0])
+    return groups
+
+def _rank_sources(out_f, base_words, mutation_config, affix_table, weights, budget=None):
+    """
+    Writes every candidate exactly once, in descending score. Each source (a single word or an
+    ordered pair) has its groups in ascending cost, and the suffix classes are in ascending cost,
+    so a source's (group, class) combinations are walked in order with the usual frontier for
+    sorted sums: popping (g, c) pushes (g, c + 1), and (g + 1, 0) when c is 0. One heap merges
+    the frontiers of all sources. With a `budget`, writing stops after that many candidates:
+    the groups and sources the merge has not reached by then are never expanded (or, for
+    pairs, even listed), so the work done grows with the budget, not with the full run.
+    Returns the number of candidates written.
+    """
+    suffix_classes = _compile_suffix_classes(affix_table, weights)
+    source_risks, varying_words = _cached_duplicate_free_plan(base_words, mutation_config, affix_table)
+    suffix_splits = _compile_suffix_splits(affix_table)
+    word_groups = [_compile_rank_groups(word, mutation_config, weights) for word in base_words]
+    concat_cost = _rank_cost(weights["concatenation"])
+    word_count = len(base_words)
+    filtered_tables = {}
+    written_candidate_count = 0
+
+    def open_source(source_id):
+        # A source's groups as (cost, first word blocks, second word blocks or None), and the
+        # exclusions of the stems its collision checks touch (every stem, for repeating sources).
+        if source_id < word_count:
+            groups = [(cost, blocks, None) for cost, blocks in word_groups[source_id]]
+            core_blocks = [block for _, blocks, _ in groups for block in blocks]
+        else:
+            i_idx, j_idx = divmod(source_id - word_count, word_count)
+            groups = sorted(((cost1 + cost2 + concat_cost, blocks1, blocks2)
+                             for cost1, blocks1 in word_groups[i_idx] for cost2, blocks2 in word_groups[j_idx]),
+                            key=lambda group: group[0])
+            core_blocks = [first + second for _, blocks1, blocks2 in groups for first in blocks1 for second in blocks2]
+        risks = source_risks.get(source_id)
+        repeats_stems = source_id >= word_count and divmod(source_id - word_count, word_count)[0] in varying_words
+        owners = affected = None
+        if repeats_stems:
+            # The stems this source repeats are kept in the first group that produces them.
+            owners = {}
+            for group_index, group in enumerate(groups):
+                for stem in _expand_option_blocks(group_stem_blocks(group)):
+                    if stem not in owners:
+                        owners[stem] = (group_index, _stem_exclusions(stem, risks, suffix_splits) if risks else set())
+        elif risks:
+            affected = {stem: _stem_exclusions(stem, risks, suffix_splits)
+                        for stem in _collect_affected_stems(core_blocks, risks, suffix_splits)}
+        return {"groups": groups, "owners": owners, "affected": affected, "entries": 0}
+
+    def group_stem_blocks(group):
+        _, blocks1, blocks2 = group
+        return blocks1 if blocks2 is None else [first + second for first in blocks1 for second in blocks2]
+
+    def checked_blocks(stems, source, group_index, class_index, table):
+        # The slow path for risky sources: each stem skips the suffixes an earlier source covered.
+        nonlocal written_candidate_count
+        owners, affected = source["owners"], source["affected"]
+        for stem in stems:
+            if owners is not None:
+                owner_index, excluded = owners[stem]
+                if owner_index != group_index: continue
+            else:
+                excluded = affected.get(stem, ())
+            if excluded is None: continue
+            stem_table = table
+            if excluded:
+                key = (class_index, frozenset(excluded))
+                stem_table = filtered_tables.get(key)
+                if stem_table is None:
+                    stem_table = filtered_tables[key] = ("",) + tuple(line for line in table[1:] if line[:-1] not in key[1])
+            if budget is not None and len(stem_table) - 1 >= budget - written_candidate_count:
+                # The last stem within the budget: keep only the lines that still fit.
+                stem_table = stem_table[:budget - written_candidate_count + 1]
+                written_candidate_count += len(stem_table) - 1
+                yield stem.join(stem_table)
+                return
+            written_candidate_count += len(stem_table) - 1
+            yield stem.join(stem_table)
+
+    def unchecked_blocks(stems, table):
+        # The fast path. Within a budget, only whole blocks that fit are joined, then part of one more.
+        nonlocal written_candidate_count
+        candidates_per_form = len(table) - 1
+        if budget is None:
+            written_candidate_count += _write_blocks(out_f, map(methodcaller("join", table), stems)) * candidates_per_form
+            return
+        whole_blocks = (budget - written_candidate_count) // candidates_per_form
+        written_candidate_count += _write_blocks(
+            out_f, map(methodcaller("join", table), itertools.islice(stems, whole_blocks))) * candidates_per_form
+        stem = next(stems, None) if written_candidate_count < budget else None
+        if stem is not None:
+            _write_blocks(out_f, iter((stem.join(table[:budget - written_candidate_count + 1]),)))
+            written_candidate_count = budget
+
+    # Every source starts with its cheapest group and class. A pair's groups are only listed
+    # when it is first popped, from the cost of its words' cheapest groups.
+    sources = {}
+    heap = []
+    source_ids = [i_idx for i_idx in range(word_count) if word_groups[i_idx]]
+    if mutation_config.get("concatenation", False) and word_count > 1:
+        source_ids += [word_count + i_idx * word_count + j_idx for i_idx, j_idx in itertools.permutations(range(word_count), 2)
+                       if word_groups[i_idx] and word_groups[j_idx]]
+    for source_id in source_ids:
+        if source_id < word_count:
+            cost = word_groups[source_id][0][0]
+        else:
+            i_idx, j_idx = divmod(source_id - word_count, word_count)
+            cost = word_groups[i_idx][0][0] + word_groups[j_idx][0][0] + concat_cost
+        heap.append((cost + suffix_classes[0][0], source_id, -1, 0))
+    heapq.heapify(heap)
+
+    while heap and (budget is None or written_candidate_count < budget):
+        cost, source_id, group_index, class_index = heapq.heappop(heap)
+        if group_index < 0:
+            source = sources[source_id] = open_source(source_id)
+            heapq.heappush(heap, (cost, source_id, 0, 0))
+            source["entries"] += 1
+            continue
+        source = sources[source_id]
+        source["entries"] -= 1
+        group = source["groups"][group_index]
+        table = suffix_classes[class_index][1]
+        stems = _expand_option_blocks(group_stem_blocks(group))
+        if source["owners"] is None and source["affected"] is None:
+            unchecked_blocks(stems, table)
+        else:
+            _write_blocks(out_f, checked_blocks(stems, source, group_index, class_index, table))
+
+        if class_index + 1 < len(suffix_classes):
+            heapq.heappush(heap, (group[0] + suffix_classes[class_index + 1][0], source_id, group_index, class_index + 1))
+            source["entries"] += 1
+        if class_index == 0 and group_index + 1 < len(source["groups"]):
+            next_group = source["groups"][group_index + 1]
+            heapq.heappush(heap, (next_group[0] + suffix_classes[0][0], source_id, group_index + 1, 0))
+            source["entries"] += 1
+        if not source["entries"]:
+            del sources[source_id] # Finished; drop its groups and stem exclusions.
+    return written_candidate_count
+
+def _write_ranked(output_writer, base_words, mutation_config, affix_table, weights, engine_config):
+    """
+    Writes the ranked candidates into an open writer, leaving out those in the exclusion index.
+    When candidates are excluded, the "candidate_budget" is enforced on what is actually
+    written, which stops the merge as soon as enough candidates got through.
+    Returns the number of candidates written.
+    """
+    budget = engine_config.get("candidate_budget") or None
+    with _open_exclusion_filter(output_writer, engine_config, limit=budget) as sink:
+        if not sink.filtering:
+            return _rank_sources(output_writer, base_words, mutation_config, affix_table, weights, budget)
+        try:
+            _rank_sources(sink, base_words, mutation_config, affix_table, weights)
+        except exclusion.CandidateLimitReached:
+            pass
+        _report_exclusion_count(sink)
+        return sink.passed_count
+
+def _generate_ranked(base_words, mutation_config, output_filename, engine_config):
+    """
+    Writes the wordlist in descending probability (see "Probability-Ordered Output"), serially
+    and straight to the output file; with a "candidate_budget", only that many of the likeliest
+    candidates. Returns the number of unique candidates, or None if the rank weights file
+    cannot be used.
+    """
+    try:
+        weights = load_rank_weights(engine_config.get("rank_weights_file"))
+    except (OSError, ValueError) as e:
+        print(f"[Error] Could not load rank weights: {e}")
+        return None
+    affix_table = _affix_table_for(mutation_config)
+    budget = engine_config.get("candidate_budget")
+    if max(1, int(engine_config.get("workers", 1))) > 1:
+        print("Note: probability-ordered output is written by a single process; --workers is ignored.")
+    if budget:
+        print(f"\nWriting the {budget:,} likeliest candidates directly to the output file (no sort)...")
     else:
-        # If no leet speak, the core forms are just the capitalized forms.
-        final_core_forms.update(forms_after_caps)
+        print("\nWriting candidates in descending probability directly to the output file (no sort)...")
+    with _open_candidate_writer(output_filename, engine_config) as output_writer:
+        unique_count = _write_ranked(output_writer, base_words, mutation_config, affix_table, weights, engine_config)
+    _report_throughput(output_writer.lines_written, output_writer.elapsed, output_writer.bytes_written)
+    return unique_count
 
-    return list(final_core_forms)
 
+# --- Pipe Output ---
+# Candidates can be streamed to standard output ('-') or a named pipe straight into a cracker,
+# without any temporary or output file. A stream cannot be sorted, so it is produced by the
+# duplicate-free construct mode (or in probability order), serially and block by block: the
+# reader gets the first candidates at once, a reader that falls behind simply blocks the next
+# write (and with it generation), and a reader that exits early ends the run cleanly.
 
-def generate_wordlist_logic(base_words, mutation_config, output_filename):
+def _stream_to_pipe(base_words, mutation_config, units, output_filename, engine_config):
     """
-    The main memory-safe generation engine. It orchestrates the entire mutation pipeline,
-    streams all candidates to a temporary file, and uses external system utilities
-    (sort/uniq) for safe, efficient deduplication and final output.
+    Writes every candidate to standard output or a named pipe as it is generated. Progress
+    messages go to stderr while the candidates go to stdout. Returns (count, message) for
+    generate_wordlist_logic; a reader closing the pipe early still counts as success.
+    """
+    to_stdout = output_filename == fileIO.STDOUT_FILENAME
+    with contextlib.redirect_stdout(sys.stderr) if to_stdout else contextlib.nullcontext():
+        if engine_config.get("job_dir"):
+            return 0, "Error: Pipe output cannot be written as a resumable job (job_dir)."
+        codec = compression.codec_for_filename(output_filename)
+        reason = compression.codec_unavailable_reason(codec) if codec else None
+        if reason: return 0, f"Error: {reason}"
+        ranked = engine_config.get("order", "default") == "probability" or engine_config.get("candidate_budget")
+        try:
+            weights = load_rank_weights(engine_config.get("rank_weights_file")) if ranked else None
+        except (OSError, ValueError) as e:
+            return 0, f"Error: Invalid rank weights file: {e}"
+        affix_table = _affix_table_for(mutation_config)
+
+        if max(1, int(engine_config.get("workers", 1))) > 1:
+            print("Note: pipe output is written by a single process; --workers is ignored.")
+        if engine_config.get("prefilter"):
+            print("Note: pipe output never repeats a candidate, so the pre-dedup filter is not needed.")
+        target = "standard output" if to_stdout else f"the named pipe {output_filename} (waiting for a reader)"
+        print(f"\nStreaming candidates for {len(base_words)} base word(s) to {target}...")
+        output_writer = None
+        try:
+            with _open_candidate_writer(output_filename, engine_config) as output_writer:
+                if ranked:
+                    unique_count = _write_ranked(output_writer, base_words, mutation_config, affix_table, weights,
+                                                 engine_config)
+                else:
+                    with _open_exclusion_filter(output_writer, engine_config) as sink:
+                        unique_count = (_construct_units(sink, units, base_words, mutation_config, affix_table)
+                                        - sink.excluded_count)
+                    _report_exclusion_count(sink)
+        except BrokenPipeError:
+            if to_stdout:
+                # Point stdout at /dev/null, or Python reports the broken pipe again when it exits.
+                devnull = os.open(os.devnull, os.O_WRONLY)
+                os.dup2(devnull, sys.__stdout__.fileno())
+                os.close(devnull)
+            # Lines of the block being written when the pipe closed may or may not have been read,
+            # so the count is of the candidates handed to the writer.
+            streamed = output_writer.lines_queued if output_writer else 0
+            print(f"\nThe reader closed the pipe after up to {streamed:,} candidates; generation stopped.")
+            return streamed, f"Successfully streamed up to {streamed:,} passwords before the reader stopped."
+        except OSError as e:
+            return 0, f"[FATAL ERROR] Streaming to '{output_filename}' failed:\n{e}"
+        _report_throughput(output_writer.lines_written, output_writer.elapsed, output_writer.bytes_written)
+        return unique_count, f"Successfully streamed {unique_count:,} unique passwords."
+
+
+# --- Hashcat Export ---
+# Instead of an expanded wordlist, the hashcat export writes what the expansion is made of:
+# every word's core (caps/leet) forms, and a rule file that appends each suffix of the affix
+# table. hashcat applies the rules on the GPU, and its combinator attack pairs the forms up
+# for the concatenations, so megabytes replace the gigabytes of the full list.
+
+HASHCAT_WORDS_FILENAME = "words.txt"
+HASHCAT_RULES_FILENAME = "suffixes.rule"
+HASHCAT_INSTRUCTIONS_FILENAME = "hashcat.txt"
+
+def _hashcat_suffix_rule(suffix):
+    """Encodes appending a suffix as a hashcat rule: '$c' per character, or ':' (no-op) for none."""
+    return " ".join("$" + char for char in suffix) if suffix else ":"
+
+def export_hashcat_attack(base_words, mutation_config, export_dir, rank_weights_file=None):
+    """
+    Writes a hashcat attack equivalent to the wordlist into `export_dir`: the core forms of
+    every word (likeliest first), a rule file with one rule per suffix (likeliest first), and
+    instructions with the hashcat commands. Returns (number of forms, number of rules).
+    Raises OSError or ValueError (bad rank weights file) on failure.
+    """
+    weights = load_rank_weights(rank_weights_file)
+    affix_table = _affix_table_for(mutation_config)
+    os.makedirs(export_dir, exist_ok=True)
+
+    # Core forms of all words, merged by score; forms shared by two words are written once.
+    groups = sorted(((cost, i_idx, group_index, blocks)
+                     for i_idx, word in enumerate(base_words)
+                     for group_index, (cost, blocks) in enumerate(_compile_rank_groups(word, mutation_config, weights))),
+                    key=lambda group: group[:3])
+    seen_forms = set()
+    with open(os.path.join(export_dir, HASHCAT_WORDS_FILENAME), "w", encoding="utf-8", newline="\n") as words_f:
+        for _, _, _, blocks in groups:
+            for form in _expand_option_blocks(blocks):
+                if form not in seen_forms:
+                    seen_forms.add(form)
+                    words_f.write(form + "\n")
+
+    suffixes = [line[:-1] for _, table in _compile_suffix_classes(affix_table, weights) for line in table[1:]]
+    with open(os.path.join(export_dir, HASHCAT_RULES_FILENAME), "w", encoding="utf-8", newline="\n") as rules_f:
+        rules_f.writelines(_hashcat_suffix_rule(suffix) + "\n" for suffix in suffixes)
+
+    words_path = os.path.join(export_dir, HASHCAT_WORDS_FILENAME)
+    rules_path = os.path.join(export_dir, HASHCAT_RULES_FILENAME)
+    lines = [
+        "SeedSpinner hashcat export",
+        f"Base words: {len(base_words)}; core forms: {len(seen_forms):,}; suffix rules: {len(suffixes):,}",
+        "",
+        "Replace <mode> with the hash type (e.g. 1000 for NTLM) and hashes.txt with your hash file.",
+        "",
+        "Single words with every suffix:",
+        f"  hashcat -a 0 -m <mode> hashes.txt {words_path} -r {rules_path}",
+    ]
+    if mutation_config.get("concatenation", False) and len(base_words) > 1:
+        lines += [
+            "",
+            "Concatenations of two words with every suffix (combinator.bin is part of hashcat-utils):",
+            f"  combinator.bin {words_path} {words_path} | hashcat -a 0 -m <mode> hashes.txt -r {rules_path}",
+            "",
+            "Concatenations without suffixes, combined on the GPU:",
+            f"  hashcat -a 1 -m <mode> hashes.txt {words_path} {words_path}",
+            "",
+            "The combinator also pairs each word's forms with each other, which the SeedSpinner",
+            "wordlist leaves out, so these attacks try a few more candidates than the wordlist holds.",
+        ]
+    with open(os.path.join(export_dir, HASHCAT_INSTRUCTIONS_FILENAME), "w", encoding="utf-8") as instructions_f:
+        instructions_f.write("\n".join(lines) + "\n")
+    return len(seen_forms), len(suffixes)
+
+
+# --- Resumable Jobs ---
+# With a job directory, every unit of work gets its own finished shard and the progress is
+# checkpointed after each one, so an interrupted run picks up where it stopped.
+
+JOB_STATE_FILENAME = "job.json"
+
+def _settings_fingerprint(mutation_config, output_filename, engine_config, **description):
     """
+    Hashes the settings that decide the content of saved shards or pieces (mutations, affix
+    table, pre-filter, spill compression and exclusion lists), plus any further `description`.
+    """
+    description.update({
+        "mutation_config": mutation_config, "affix_table": _affix_table_for(mutation_config),
+        "prefilter": engine_config.get("prefilter"),
+        "spill_extension": compression.extension_for_filename(output_filename),
+        "exclusions": (exclusion.read_manifest(engine_config["exclusion_index"]) or {}).get("sources")
+                      if engine_config.get("exclusion_index") else None,
+    })
+    return hashlib.sha256(json.dumps(description, sort_keys=True).encode('utf-8')).hexdigest()
+
+def _job_fingerprint(base_words, mutation_config, output_filename, engine_config):
+    """Identifies everything that decides a job's output, so a resume cannot mix two different jobs."""
+    return _settings_fingerprint(mutation_config, output_filename, engine_config,
+                                 base_words=list(base_words), dedup=engine_config.get("dedup", "sort"))
+
+def _save_job_state(job_dir, job_state, filename=JOB_STATE_FILENAME):
+    """Writes the job state atomically: a crash leaves either the old or the new checkpoint."""
+    state_filename = os.path.join(job_dir, filename)
+    with open(state_filename + ".tmp", 'w', encoding='utf-8') as state_f:
+        json.dump(job_state, state_f, indent=2)
+        state_f.flush()
+        os.fsync(state_f.fileno())
+    os.replace(state_filename + ".tmp", state_filename)
+
+def _load_job_state(job_dir, fingerprint, units):
+    """
+    Opens a job directory, creating it for a new job. Files left behind by an interrupted
+    unit are removed. Returns the job state, or None if the directory belongs to another job.
+    """
+    os.makedirs(job_dir, exist_ok=True)
+    state_filename = os.path.join(job_dir, JOB_STATE_FILENAME)
+    if os.path.exists(state_filename):
+        with open(state_filename, 'r', encoding='utf-8') as state_f:
+            job_state = json.load(state_f)
+        if job_state.get("fingerprint") != fingerprint:
+            return None
+    else:
+        job_state = {"fingerprint": fingerprint, "units": [list(unit) for unit in units], "completed": {},
+                     "created": datetime.now().isoformat(timespec="seconds")}
+        _save_job_state(job_dir, job_state)
+
+    _remove_job_files(job_dir, keep={unit["shard"] for unit in job_state["completed"].values()} | {JOB_STATE_FILENAME})
+    return job_state
+
+def _remove_job_files(job_dir, keep=()):
+    """
+    Removes the files a job creates in its directory, except those in `keep`. Anything
+    else the directory holds is left alone; an emptied directory is removed as well.
+    """
+    for entry in os.listdir(job_dir):
+        if entry.startswith(("unit_", "partial_", "seedspinner_", JOB_STATE_FILENAME)) and entry not in keep:
+            path = os.path.join(job_dir, entry)
+            if os.path.isdir(path): shutil.rmtree(path, ignore_errors=True)
+            else: os.remove(path)
+    if not keep and not os.listdir(job_dir):
+        os.rmdir(job_dir)
+
+def _generate_job_unit(base_words, mutation_config, unit, job_dir, shard_name, memory_budget_mb, engine_config):
+    """
+    Generates one unit into its own shard in the job directory. The shard is written under
+    a temporary name and only renamed once complete. Returns the raw and written counts.
+    """
+    shard_filename = os.path.join(job_dir, shard_name)
+    partial_filename = os.path.join(job_dir, "partial_" + shard_name)
+    if engine_config.get("dedup", "sort") == "construct":
+        written_count = _construct_shard(base_words, mutation_config, [unit], partial_filename, engine_config)
+        counts = (written_count, written_count)
+    else:
+        counts = _generate_shard(base_words, mutation_config, [unit], partial_filename, memory_budget_mb, engine_config)
+    os.replace(partial_filename, shard_filename)
+    return counts
+
+def _generate_job(base_words, mutation_config, units, output_filename, workers, memory_budget_mb, engine_config):
+    """
+    Runs the generation as a resumable job in engine_config["job_dir"]. Units that already
+    have a finished shard are skipped; the others are generated (on a worker pool when
+    "workers" is above 1) and checkpointed one by one. Once every unit is done the shards
+    are merged (or, in construct mode, concatenated) into the output and the job's files
+    are removed. Returns the number of unique candidates, or None for a mismatched job.
+    """
+    job_dir = engine_config["job_dir"]
+    job_state = _load_job_state(job_dir, _job_fingerprint(base_words, mutation_config, output_filename, engine_config), units)
+    if job_state is None:
+        return None
+    spill_extension = compression.extension_for_filename(output_filename)
+    shard_names = {str(index): f"unit_{index:06d}.txt{spill_extension}" for index in range(len(units))}
+    pending = [index for index in range(len(units)) if str(index) not in job_state["completed"]]
+    if len(pending) < len(units):
+        print(f"\nResuming job in {job_dir}: {len(units) - len(pending)} of {len(units)} unit(s) already done.")
+    else:
+        print(f"\nStarting resumable job in: {job_dir}")
+
+    def checkpoint(index, counts):
+        job_state["completed"][str(index)] = {"shard": shard_names[str(index)], "raw": counts[0], "written": counts[1]}
+        _save_job_state(job_dir, job_state)
+        print(f"\rCheckpointed {len(job_state['completed'])}/{len(units)} unit(s)...", end="")
+
+    unit_memory_mb = memory_budget_mb / workers
+    if workers > 1 and len(pending) > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {metrics.submit(pool, _generate_job_unit, base_words, mutation_config, units[index], job_dir,
+                                      shard_names[str(index)], unit_memory_mb, engine_config): index
+                       for index in pending}
+            for future in concurrent.futures.as_completed(futures):
+                checkpoint(futures[future], future.result())
+    else:
+        for index in pending:
+            checkpoint(index, _generate_job_unit(base_words, mutation_config, units[index], job_dir,
+                                                 shard_names[str(index)], memory_budget_mb, engine_config))
+    print()
+
+    shard_filenames = [os.path.join(job_dir, shard_names[str(index)]) for index in range(len(units))]
+    completed = job_state["completed"].values()
+    if engine_config.get("dedup", "sort") == "construct":
+        print("Concatenating job shards into the output file...")
+        _concatenate_shards(shard_filenames, output_filename)
+        unique_count = sum(unit["written"] for unit in completed)
+    else:
+        _report_filter_counts(sum(unit["raw"] for unit in completed), sum(unit["written"] for unit in completed), engine_config)
+        print("Merging job shards and removing duplicates...")
+        unique_count = dedup.merge_sorted_unique(shard_filenames, output_filename, memory_budget_mb, temp_dir=job_dir,
+                                                 compression_threads=_compression_threads(engine_config))
+    _remove_job_files(job_dir)
+    print("Job complete; removed its checkpoint files.")
+    return unique_count
+
+# --- Incremental Regeneration ---
+# With an incremental state directory, the sorted wordlist is kept as pieces: one sorted,
+# deduplicated shard per word (its single-word candidates) and one per pair of words (both
+# concatenation orders, or a word concatenated with itself when it is given more than once),
+# recorded in a manifest by their words. When the word list changes,
+# only the pieces involving added words are generated and those of removed words are deleted.
+# The output is then merged from the pieces or, when words were only added since the last
+# merge, by merging just the new pieces into the existing output. Changing the mutation or
+# engine settings starts over with fresh pieces. Piece files are named after their words and
+# renamed into place when complete, so pieces finished by an interrupted run are reused.
+
+INCREMENTAL_MANIFEST_FILENAME = "manifest.json"
+# Pieces are many and small, so they are merged with a wider fan-in than sort runs (each input
+# gets a smaller read block); this keeps merging a few hundred pieces to a single pass.
+_PIECE_MERGE_FAN_IN = 256
+
+def _incremental_fingerprint(mutation_config, output_filename, engine_config):
+    """Identifies the settings every piece depends on; the words themselves are tracked per piece."""
+    return _settings_fingerprint(mutation_config, output_filename, engine_config)
+
+def _piece_key(words):
+    """The manifest key of the piece for one word, or for a pair of words in either order."""
+    return json.dumps(sorted(words))
+
+def _generate_piece(words, mutation_config, piece_filename, memory_budget_mb, engine_config):
+    """
+    Generates one piece: the single-word candidates of one word, or both concatenation orders
+    of two words, sorted and deduplicated. The piece is renamed into place once complete.
+    Returns the raw and written counts.
+    """
+    if len(words) == 1:
+        units = [("single", 0)]
+    elif words[0] == words[1]:
+        # Both orders of a word paired with itself are the same candidates.
+        units = [("concat", 0)]
+    else:
+        units = [("concat", 0), ("concat", 1)]
+    partial_filename = os.path.join(os.path.dirname(piece_filename), "partial_" + os.path.basename(piece_filename))
+    counts = _generate_shard(list(words), mutation_config, units, partial_filename, memory_budget_mb, engine_config)
+    os.replace(partial_filename, piece_filename)
+    return counts
+
+def _generate_incremental(base_words, mutation_config, output_filename, workers, memory_budget_mb, engine_config):
+    """
+    Brings the output up to date with the current word list from the pieces in
+    engine_config["incremental_dir"] (see "Incremental Regeneration"), generating only the
+    missing pieces (on a worker pool when "workers" is above 1). Returns the number of unique
+    candidates in the output.
+    """
+    state_dir = engine_config["incremental_dir"]
+    os.makedirs(state_dir, exist_ok=True)
+    manifest_filename = os.path.join(state_dir, INCREMENTAL_MANIFEST_FILENAME)
+    fingerprint = _incremental_fingerprint(mutation_config, output_filename, engine_config)
+    manifest = None
+    if os.path.exists(manifest_filename):
+        with open(manifest_filename, 'r', encoding='utf-8') as manifest_f:
+            manifest = json.load(manifest_f)
+        if manifest.get("fingerprint") != fingerprint:
+            print("\nMutation or engine settings changed since the last run; regenerating every piece.")
+            manifest = None
+    if manifest is None:
+        manifest = {"fingerprint": fingerprint, "pieces": {}, "output": None}
+    # Leftovers of an interrupted run, and every piece when starting over.
+    for entry in os.listdir(state_dir):
+        if entry.startswith(("partial_", "seedspinner_")) or (entry.startswith("piece_") and not manifest["pieces"]):
+            path = os.path.join(state_dir, entry)
+            if os.path.isdir(path): shutil.rmtree(path, ignore_errors=True)
+            else: os.remove(path)
+
+    words = list(dict.fromkeys(base_words))
+    wanted = {_piece_key([word]): [word] for word in words}
+    if mutation_config.get("concatenation", False):
+        wanted.update((_piece_key(pair), list(pair)) for pair in itertools.combinations(words, 2))
+        # A word given more than once is also concatenated with itself, as in a full run.
+        wanted.update((_piece_key([word, word]), [word, word]) for word in words if base_words.count(word) > 1)
+    spill_extension = compression.extension_for_filename(output_filename)
+    piece_names = {key: f"piece_{hashlib.sha256(key.encode('utf-8')).hexdigest()[:20]}.txt{spill_extension}"
+                   for key in wanted}
+    for key, piece_name in piece_names.items():
+        if key not in manifest["pieces"] and os.path.exists(os.path.join(state_dir, piece_name)):
+            manifest["pieces"][key] = piece_name
+    removed = [key for key in manifest["pieces"] if key not in wanted]
+    added = [key for key in wanted if key not in manifest["pieces"]]
+    print(f"\nIncremental state in {state_dir}: reusing {len(wanted) - len(added)} piece(s), "
+          f"generating {len(added)}, removing {len(removed)}.")
+    for key in removed:
+        piece_filename = os.path.join(state_dir, manifest["pieces"].pop(key))
+        if os.path.exists(piece_filename):
+            os.remove(piece_filename)
+
+    if workers > 1 and len(added) > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [metrics.submit(pool, _generate_piece, wanted[key], mutation_config,
+                                      os.path.join(state_dir, piece_names[key]), memory_budget_mb / workers, engine_config)
+                       for key in added]
+            for finished, future in enumerate(concurrent.futures.as_completed(futures), 1):
+                future.result()
+                print(f"\rGenerated {finished}/{len(added)} piece(s)...", end="")
+    else:
+        for finished, key in enumerate(added, 1):
+            _generate_piece(wanted[key], mutation_config, os.path.join(state_dir, piece_names[key]),
+                            memory_budget_mb, engine_config)
+            print(f"\rGenerated {finished}/{len(added)} piece(s)...", end="")
+    if added: print()
+    manifest["pieces"] = {key: piece_names[key] for key in wanted}
+    _save_job_state(state_dir, manifest, INCREMENTAL_MANIFEST_FILENAME)
+
+    # Words only added since the last merge: the existing output needs just the new pieces.
+    previous = manifest["output"]
+    output_path = os.path.abspath(output_filename)
+    output_is_current = (previous is not None and previous["path"] == output_path and os.path.exists(output_path)
+                         and os.stat(output_path).st_size == previous["size"]
+                         and os.stat(output_path).st_mtime_ns == previous["mtime_ns"])
+    if output_is_current and set(previous["pieces"]) <= set(manifest["pieces"]):
+        new_keys = [key for key in manifest["pieces"] if key not in set(previous["pieces"])]
+        if not new_keys:
+            print("The output is already up to date.")
+            return previous["line_count"]
+        print(f"Merging {len(new_keys)} new piece(s) into the existing output...")
+        input_filenames = [os.path.join(state_dir, manifest["pieces"][key]) for key in new_keys]
+        if len(input_filenames) >= _PIECE_MERGE_FAN_IN:
+            # Combine the new pieces first, so the large existing output is read only once.
+            delta_filename = os.path.join(state_dir, "partial_delta.txt" + spill_extension)
+            dedup.merge_sorted_unique(input_filenames, delta_filename, memory_budget_mb, temp_dir=state_dir,
+                                      max_fan_in=_PIECE_MERGE_FAN_IN, spill=True)
+            input_filenames = [delta_filename]
+        input_filenames.insert(0, output_path)
+    else:
+        print(f"Merging {len(manifest['pieces'])} piece(s) into the output...")
+        input_filenames = [os.path.join(state_dir, piece_name) for piece_name in manifest["pieces"].values()]
+
+    partial_output = os.path.join(os.path.dirname(output_path), ".seedspinner_partial_" + os.path.basename(output_path))
+    unique_count = dedup.merge_sorted_unique(input_filenames, partial_output, memory_budget_mb, temp_dir=state_dir,
+                                             max_fan_in=_PIECE_MERGE_FAN_IN,
+                                             compression_threads=_compression_threads(engine_config))
+    for filename in input_filenames[1:]:
+        if os.path.basename(filename).startswith("partial_"):
+            os.remove(filename)
+    os.replace(partial_output, output_path)
+    output_status = os.stat(output_path)
+    manifest["output"] = {"path": output_path, "size": output_status.st_size, "mtime_ns": output_status.st_mtime_ns,
+                          "pieces": sorted(manifest["pieces"]), "line_count": unique_count}
+    _save_job_state(state_dir, manifest, INCREMENTAL_MANIFEST_FILENAME)
+    return unique_count
+
+
+def _prepare_exclusion_index(engine_config):
+    """
+    Builds or updates the exclusion index of the "exclusion_lists" (at "exclusion_index", or in
+    the cache). Returns (engine config pointing at the index, None) or (None, error message).
+    """
+    exclusion_lists = engine_config["exclusion_lists"]
+    index_path = engine_config.get("exclusion_index") or exclusion.default_index_path(exclusion_lists)
+    print(f"\nChecking the exclusion index for {len(exclusion_lists)} list(s): {index_path}")
+    try:
+        hash_count, hashed_count = exclusion.update_index(index_path, exclusion_lists)
+    except OSError as e:
+        return None, f"Error: Could not build the exclusion index: {e}"
+    status = f"added {hashed_count:,} line(s)" if hashed_count else "up to date"
+    print(f"Exclusion index holds {hash_count:,} candidates ({status}).")
+    return dict(engine_config, exclusion_index=index_path), None
+
+def _export_hashcat(base_words, mutation_config, engine_config):
+    """Runs the hashcat export for generate_wordlist_logic and reports the size saved."""
+    export_dir = engine_config["hashcat_export_dir"]
+    print(f"\nExporting a hashcat attack for {len(base_words)} base word(s) to: {export_dir}")
+    try:
+        form_count, rule_count = export_hashcat_attack(base_words, mutation_config, export_dir,
+                                                       engine_config.get("rank_weights_file"))
+    except (OSError, ValueError) as e:
+        return 0, f"Error: Hashcat export failed: {e}"
+    export_bytes = sum(os.path.getsize(os.path.join(export_dir, name))
+                       for name in (HASHCAT_WORDS_FILENAME, HASHCAT_RULES_FILENAME, HASHCAT_INSTRUCTIONS_FILENAME))
+    candidate_count, wordlist_bytes = count_unique_candidates(base_words, mutation_config)
+    print(f"Wrote {form_count:,} core forms and {rule_count:,} suffix rules ({export_bytes / 1024:,.1f} KB); "
+          f"the expanded wordlist would be {candidate_count:,} passwords ({wordlist_bytes / 2**20:,.1f} MB).")
+    print(f"See {os.path.join(export_dir, HASHCAT_INSTRUCTIONS_FILENAME)} for the hashcat commands.")
+    return form_count, f"Successfully exported {form_count:,} core forms and {rule_count:,} rules to {export_dir}."
+
+
+def generate_wordlist_logic(base_words, mutation_config, output_filename, engine_config=None):
+    """
+    The main memory-safe generation engine. It orchestrates the entire mutation pipeline
+    and streams all candidates into an in-process external merge sort, which spills
+    sorted runs to disk and merges them, deduplicated, into the final bytewise-sorted output.
+    `engine_config` tunes the engine: "workers" above 1 spreads the units of work over a
+    process pool that writes sorted shards, which are then k-way merged into the output,
+    "memory_budget_mb" bounds the memory used for sorting, and "prefilter" ("exact" or
+    "approximate", sized by "prefilter_memory_mb") drops repeats before they are sorted.
+    "dedup" set to "construct" skips the sort entirely: every candidate is written once,
+    straight to the output file, which is then left unsorted. An output filename ending
+    in .gz, .zst or .lz4 is stream-compressed, as are the temporary runs and shards, with
+    "compression_threads" threads where the codec supports it. "job_dir" makes the run
+    a resumable job: progress is checkpointed there and a rerun continues where it stopped.
+    "order" set to "probability" writes the likeliest candidates first instead, scored with
+    the rank weights (overridden from "rank_weights_file" if given); a "candidate_budget"
+    writes only that many of them, without generating the rest. "hashcat_export_dir" writes
+    a hashcat attack (core forms and suffix rules) into that directory instead of a wordlist.
+    An output filename of '-' (standard output) or a named pipe streams the candidates as they
+    are generated, duplicate-free and without any files. "exclusion_lists" names wordlists that
+    were already tried: they are compiled into (or update) the index at "exclusion_index", and
+    every candidate found there is left out of the output. "incremental_dir" keeps the sorted
+    output as per-word and per-pair pieces there, so a rerun after words were added or removed
+    only generates the pieces of the added words. "metrics_file" records the time, candidates,
+    bytes and peak memory of each pipeline stage and writes them there as JSON at the end of the
+    run ('-' for stderr); "profile_file" profiles the run with cProfile, saving the statistics
+    there and printing the functions that took the most time.
+    """
+    engine_config = engine_config or {}
+    if not (engine_config.get("metrics_file") or engine_config.get("profile_file")):
+        return _generate_wordlist(base_words, mutation_config, output_filename, engine_config)
+
+    (final_unique_count, message), report = metrics.record_run(
+        _generate_wordlist, base_words, mutation_config, output_filename, engine_config,
+        profile_file=engine_config.get("profile_file"))
+    if engine_config.get("metrics_file"):
+        output_bytes = (os.path.getsize(output_filename) if output_filename and os.path.isfile(output_filename)
+                        and not fileIO.is_pipe_output(output_filename) else None)
+        report.update(succeeded=message.startswith("Successfully"), base_word_count=len(base_words),
+                      mutation_config=mutation_config, engine_config=engine_config, output=output_filename,
+                      unique_candidates=final_unique_count, output_bytes=output_bytes)
+        try:
+            metrics.write_report(report, engine_config["metrics_file"])
+            if engine_config["metrics_file"] != "-":
+                print(f"Run metrics written to: {engine_config['metrics_file']}")
+        except OSError as e:
+            print(f"[Warning] Could not write the run metrics: {e}")
+    return final_unique_count, message
+
+def _generate_wordlist(base_words, mutation_config, output_filename, engine_config):
+    """Runs one generation for generate_wordlist_logic, dispatching to the configured mode."""
     if not base_words: return 0, "Error: No base words provided for generation."
+    if engine_config.get("hashcat_export_dir"):
+        return _export_hashcat(base_words, mutation_config, engine_config)
     if not output_filename: return 0, "Error: Output filename not set."
+    if engine_config.get("exclusion_lists"):
+        with contextlib.redirect_stdout(sys.stderr) if output_filename == fileIO.STDOUT_FILENAME else contextlib.nullcontext():
+            engine_config, error = _prepare_exclusion_index(engine_config)
+        if error: return 0, error
+    if fileIO.is_pipe_output(output_filename):
+        return _stream_to_pipe(base_words, mutation_config, _plan_generation_units(base_words, mutation_config),
+                               output_filename, engine_config)
+    workers = max(1, int(engine_config.get("workers", 1)))
+    memory_budget_mb = engine_config.get("memory_budget_mb", dedup.DEFAULT_MEMORY_BUDGET_MB)
 
     print(f"\nStarting wordlist generation for {len(base_words)} base word(s)...")
     print(f"Output will be saved to: {output_filename}")
     print("Mode: Memory-Safe (streaming to disk)")
-    
-    affixes_enabled = mutation_config.get("affixes", False)
-    
-    # Create a temporary file to store all generated candidates, avoiding memory overload.
-    with tempfile.NamedTemporaryFile(mode='w+', delete=False, encoding='utf-8') as temp_f:
-        temp_filename = temp_f.name
-        print(f"\nGenerating raw candidates to temporary file: {temp_filename}")
-        
-        raw_candidate_count = 0
-        core_forms_for_concatenation_map = {}
-
-        # --- Step 1: Process Single Words ---
-        for i, base_word in enumerate(base_words):
-            print(f"\rProcessing single-word forms for: '{base_word}'...", end="")
-
-            # Generate the core Caps/Leet variations for the current base word.
-            core_variations = _generate_single_word_core_variations(base_word, mutation_config)
-            # Store these core forms in a map to be used as components for concatenation later.
-            core_forms_for_concatenation_map[base_word] = core_variations
-
-            # Apply final transformations (affixes) and write to the temp file.
-            if affixes_enabled:
-                for core_form in core_variations:
-                    final_variations = _apply_affixes(core_form)
-                    for final_form in final_variations:
-                        temp_f.write(final_form + "\n")
-                        raw_candidate_count += 1
-            else:
-                for core_form in core_variations:
-                    temp_f.write(core_form + "\n")
-                    raw_candidate_count += 1
-        print() # Add a newline to finalize the progress bar.
-
-        # --- Step 2: Concatenation ---
-        if mutation_config.get("concatenation", False) and len(base_words) > 1:
-            print("\nProcessing concatenations...")
-            for i_idx in range(len(base_words)):
-                word1_base = base_words[i_idx]
-                print(f"\rConcatenating with '{word1_base}' as first word...", end="")
-                for j_idx in range(len(base_words)):
-                    if i_idx == j_idx and len(base_words) > 1: continue
-
-                    word2_base = base_words[j_idx]
-                    
-                    # Retrieve the pre-generated core variations for the pair of words.
-                    forms1 = core_forms_for_concatenation_map.get(word1_base, [word1_base])
-                    forms2 = core_forms_for_concatenation_map.get(word2_base, [word2_base])
-
-                    # Create all combinations of the component variations.
-                    for v1 in forms1:
-                        for v2 in forms2:
-                            concatenated_word = v1 + v2
-                            if affixes_enabled:
-                                final_concat_variations = _apply_affixes(concatenated_word)
-                                for final_form in final_concat_variations:
-                                    temp_f.write(final_form + "\n")
-                                    raw_candidate_count += 1
-                            else:
-                                temp_f.write(concatenated_word + "\n")
-                                raw_candidate_count += 1
-            print("\nFinished processing concatenations.")
-
-    # --- Step 3: Post-Processing the Temp File ---
-    # This step uses powerful system commands to handle massive files efficiently.
-    print(f"\nGenerated {raw_candidate_count:,} raw password candidates.")
-    print("Now sorting and removing duplicates using system utilities...")
+    codec = compression.codec_for_filename(output_filename)
+    if codec:
+        reason = compression.codec_unavailable_reason(codec)
+        if reason: return 0, f"Error: {reason}"
+        print(f"Compression: {codec} (output and temporary files)")
+
+    units = _plan_generation_units(base_words, mutation_config)
+    ranked = engine_config.get("order", "default") == "probability" or engine_config.get("candidate_budget")
+    if engine_config.get("incremental_dir") and (ranked or engine_config.get("job_dir")
+                                                 or engine_config.get("dedup", "sort") == "construct"):
+        return 0, ("Error: Incremental regeneration keeps a sorted wordlist; it cannot be combined with probability "
+                   "order, a candidate budget, a job directory or construct dedup.")
 
-    command = f'sort "{temp_filename}" | uniq > "{output_filename}"'
-    
     try:
-        # Execute the command. `shell=True` is needed for the pipe `|` to work.
-        subprocess.run(command, shell=True, check=True, capture_output=True, text=True)
-    except FileNotFoundError:
-        message = "[FATAL ERROR] `sort` or `uniq` command not found. Ensure these utilities are in your system's PATH."
+        if ranked:
+            if engine_config.get("job_dir"):
+                return 0, "Error: Probability-ordered or budgeted output cannot be written as a resumable job (job_dir)."
+            final_unique_count = _generate_ranked(base_words, mutation_config, output_filename, engine_config)
+            if final_unique_count is None:
+                return 0, "Error: Invalid rank weights file."
+        elif engine_config.get("job_dir"):
+            final_unique_count = _generate_job(base_words, mutation_config, units, output_filename,
+                                               workers, memory_budget_mb, engine_config)
+            if final_unique_count is None:
+                return 0, (f"Error: Job directory '{engine_config['job_dir']}' holds a different job "
+                           "(other words, settings or output format). Choose a new directory or remove it.")
+        elif engine_config.get("incremental_dir"):
+            final_unique_count = _generate_incremental(base_words, mutation_config, output_filename, workers,
+                                                       memory_budget_mb, engine_config)
+        elif engine_config.get("dedup", "sort") == "construct":
+            final_unique_count = _generate_constructed(base_words, mutation_config, units, output_filename,
+                                                       workers, engine_config)
+        elif workers > 1 and len(units) > 1:
+            _, final_unique_count = _generate_with_workers(base_words, mutation_config, units, output_filename,
+                                                           workers, memory_budget_mb, engine_config)
+        else:
+            _, final_unique_count = _generate_serial(base_words, mutation_config, units, output_filename,
+                                                     memory_budget_mb, engine_config)
+    except OSError as e:
+        message = f"[FATAL ERROR] Post-processing failed:\n{e}"
         return 0, message
-    except subprocess.CalledProcessError as e:
-        message = f"[FATAL ERROR] Post-processing failed:\n{e.stderr}"
-        return 0, message
-    finally:
-        # Clean up the large temporary file after processing is complete.
-        if os.path.exists(temp_filename):
-            try:
-                os.remove(temp_filename)
-                print(f"Cleaned up temporary file.")
-            except OSError as e:
-                print(f"[Warning] Could not delete temporary file '{temp_filename}': {e}")
-
-    # --- Step 4: Count lines in the final file to get the unique count ---
-    try:
-        with open(output_filename, 'r', encoding='utf-8') as f:
-            final_unique_count = sum(1 for line in f)
-        return final_unique_count, f"Successfully generated {final_unique_count:,} unique passwords."
-    except Exception as e:
-        message = f"Could not count lines in final file, but it was created successfully. Error: {e}"
-        return -1, message
+
+    return final_unique_count, f"Successfully generated {final_unique_count:,} unique passwords."
 
 
 def trigger_wordlist_generation(state):
@@ -237,12 +1748,15 @@ def trigger_wordlist_generation(state):
         print("No words selected for the engine. Cannot generate."); tui.pause(); return
     
     # Show the user a final, detailed estimate before they commit.
-    estimate.estimate_list_size(state)
+    exact = not state.get('engine_config', {}).get('fast_estimate', False)
+    count_candidates = count_unique_candidates if exact else estimate_candidate_count
+    estimate.estimate_list_size(state, *count_candidates(base_words, mutation_config), exact)
     
     confirm = input("\nProceed with generation? (yes/no): ").strip().lower()
     if confirm == 'yes':
         # Call the main logic function and display its return message.
-        count, message = generate_wordlist_logic(base_words, mutation_config, output_filename)
+        count, message = generate_wordlist_logic(base_words, mutation_config, output_filename,
+                                                 state.get('engine_config', {}))
         print(f"\n{message}")
     else:
         print("\nGeneration cancelled.")
@@ -0,0 +1,258 @@
+import concurrent.futures
+import contextlib
+import cProfile
+import itertools
+import json
+import os
+import pstats
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+try:
+    import resource
+except ImportError: # Not available on Windows; peak RSS is then left out of the metrics.
+    resource = None
+
+# --- Run Metrics ---
+# Per-stage instrumentation of a generation run: wall and CPU time, candidates in and out and
+# bytes written, for each stage of the pipeline (caps, leet, forms, concat, prefilter, affix,
+# exclude, write, sort, merge), and the peak RSS of the whole run. The engine calls stage(), timed()
+# and count() at batch granularity; while no run is being recorded they return at once, so
+# an uninstrumented run costs nothing extra.
+#
+# Stage times are exclusive: the stages are lazy generators feeding each other, so a running
+# stage is paused while a nested one (e.g. the sort a write triggers) runs. Worker processes
+# record their own stages, which are added to the parent's when each task finishes. Peak RSS
+# is a high-water mark of the process, so it is reported once per run rather than per stage.
+
+METRICS_FORMAT_VERSION = 2
+STAGE_ORDER = ("caps", "leet", "forms", "concat", "prefilter", "affix", "exclude", "write", "sort", "merge")
+_COUNTERS = ("wall_s", "cpu_s", "candidates_in", "candidates_out", "bytes_written")
+# Items a timed() stage produces between two clock readings.
+_TIMED_CHUNK = 4096
+# Functions listed by the profiling report.
+PROFILE_TOP_FUNCTIONS = 25
+
+_recorder = None
+_profiler = None
+
+
+def _children_cpu_s():
+    """The CPU time used by finished child processes (workers) so far."""
+    if resource is None:
+        return 0
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return children.ru_utime + children.ru_stime
+
+def _peak_rss_mb(who=None):
+    """The peak resident set size of this process (or of its largest child) so far, in MB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF if who is None else who).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+class RunRecorder:
+    """Collects the stage metrics of one run in this process (and, optionally, its profile)."""
+
+    def __init__(self, profile_dir=None):
+        self.stages = {}
+        self.profile_dir = profile_dir
+        self.profile_files = []
+        self._stack = []
+        self._lock = threading.Lock()
+        self._started = self._mark = (time.perf_counter(), time.process_time())
+        self._children_started = _children_cpu_s()
+
+    def _entry(self, name):
+        entry = self.stages.get(name)
+        if entry is None:
+            entry = self.stages[name] = dict.fromkeys(_COUNTERS, 0)
+        return entry
+
+    def _charge(self):
+        """Charges the time since the last reading to the innermost running stage."""
+        now = (time.perf_counter(), time.process_time())
+        if self._stack:
+            entry = self._entry(self._stack[-1])
+            entry["wall_s"] += now[0] - self._mark[0]
+            entry["cpu_s"] += now[1] - self._mark[1]
+        self._mark = now
+
+    def enter(self, name):
+        self._charge()
+        self._stack.append(name)
+
+    def leave(self):
+        self._charge()
+        self._stack.pop()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        self.enter(name)
+        try:
+            yield
+        finally:
+            self.leave()
+
+    def timed(self, name, iterable):
+        """Yields from `iterable`, charging the time spent producing its items to the stage `name`."""
+        iterator = iter(iterable)
+        while True:
+            self.enter(name)
+            try:
+                chunk = list(itertools.islice(iterator, _TIMED_CHUNK))
+            finally:
+                self.leave()
+            if not chunk:
+                return
+            self._entry(name)["candidates_out"] += len(chunk)
+            yield from chunk
+
+    def count(self, name, candidates_in=0, candidates_out=0, bytes_written=0):
+        entry = self._entry(name)
+        entry["candidates_in"] += candidates_in
+        entry["candidates_out"] += candidates_out
+        entry["bytes_written"] += bytes_written
+
+    def merge(self, stages, profile_file=None):
+        """Adds the stages recorded by a worker process."""
+        with self._lock:
+            for name, recorded in stages.items():
+                entry = self._entry(name)
+                for counter in _COUNTERS:
+                    entry[counter] += recorded[counter]
+            if profile_file:
+                self.profile_files.append(profile_file)
+
+    def report(self):
+        """Returns the recorded metrics as a JSON-ready dictionary."""
+        wall_s = time.perf_counter() - self._started[0]
+        cpu_s = time.process_time() - self._started[1]
+        ordered = [name for name in STAGE_ORDER if name in self.stages]
+        ordered += [name for name in self.stages if name not in STAGE_ORDER]
+        stages = {}
+        for name in ordered:
+            entry = dict(self.stages[name])
+            entry["wall_s"] = round(entry["wall_s"], 4)
+            entry["cpu_s"] = round(entry["cpu_s"], 4)
+            stages[name] = entry
+        report = {"format_version": METRICS_FORMAT_VERSION, "wall_s": round(wall_s, 4), "cpu_s": round(cpu_s, 4),
+                  "peak_rss_mb": _peak_rss_mb(), "stages": stages}
+        worker_cpu_s = _children_cpu_s() - self._children_started
+        if worker_cpu_s:
+            # Worker pools have shut down by now, so their processes count as finished children.
+            report["worker_cpu_s"] = round(worker_cpu_s, 4)
+            report["peak_worker_rss_mb"] = _peak_rss_mb(resource.RUSAGE_CHILDREN)
+        return report
+
+
+# --- Engine Hooks ---
+
+def recording():
+    """True while a run is being recorded in this process."""
+    return _recorder is not None
+
+def stage(name):
+    """A context manager charging the time spent inside it to the stage `name`."""
+    return contextlib.nullcontext() if _recorder is None else _recorder.stage(name)
+
+def timed(name, iterable):
+    """Wraps a lazy stage so the time spent producing its items (and their number) is recorded."""
+    return iterable if _recorder is None else _recorder.timed(name, iterable)
+
+def count(name, candidates_in=0, candidates_out=0, bytes_written=0):
+    """Adds to the candidate and byte counters of the stage `name`."""
+    if _recorder is not None:
+        _recorder.count(name, candidates_in, candidates_out, bytes_written)
+
+def _call_recorded(profile_dir, func, *args):
+    """Worker side of submit(): runs func under a fresh recorder and returns what it recorded."""
+    global _recorder, _profiler
+    if _profiler is not None:
+        # A forked worker inherits the parent's running profiler; only one can be active.
+        _profiler.disable()
+    _recorder = RunRecorder()
+    _profiler = profiler = cProfile.Profile() if profile_dir else None
+    try:
+        if profiler: profiler.enable()
+        result = func(*args)
+    finally:
+        if profiler: profiler.disable()
+        stages, _recorder, _profiler = _recorder.stages, None, None
+    profile_file = None
+    if profiler:
+        profile_fd, profile_file = tempfile.mkstemp(prefix="worker_", suffix=".prof", dir=profile_dir)
+        os.close(profile_fd)
+        profiler.dump_stats(profile_file)
+    return result, stages, profile_file
+
+def submit(pool, func, *args):
+    """
+    Submits func(*args) to a process pool like pool.submit(). While a run is being recorded,
+    the worker records its own stages (and profile), which are merged into this run when the
+    task finishes; the returned future still resolves to func's result.
+    """
+    if _recorder is None:
+        return pool.submit(func, *args)
+    recorder = _recorder
+    outer = concurrent.futures.Future()
+
+    def finished(inner):
+        try:
+            result, stages, profile_file = inner.result()
+        except BaseException as e:
+            outer.set_exception(e)
+            return
+        recorder.merge(stages, profile_file)
+        outer.set_result(result)
+
+    pool.submit(_call_recorded, recorder.profile_dir, func, *args).add_done_callback(finished)
+    return outer
+
+
+# --- Recording a Run ---
+
+def record_run(func, *args, profile_file=None):
+    """
+    Calls func(*args) while recording its stage metrics, and profiling it with cProfile if
+    `profile_file` is given: the combined profile of this process and its workers is saved
+    there (readable with pstats or snakeviz) and the top functions by own time are printed.
+    Returns func's result and the metrics report.
+    """
+    global _recorder, _profiler
+    profile_dir = tempfile.mkdtemp(prefix="seedspinner_profile_") if profile_file else None
+    _recorder = recorder = RunRecorder(profile_dir)
+    _profiler = profiler = cProfile.Profile() if profile_file else None
+    try:
+        try:
+            if profiler: profiler.enable()
+            result = func(*args)
+        finally:
+            if profiler: profiler.disable()
+            _recorder = _profiler = None
+        report = recorder.report()
+        if profiler:
+            stats = pstats.Stats(profiler, stream=sys.stdout)
+            for worker_profile in recorder.profile_files:
+                stats.add(worker_profile)
+            stats.dump_stats(profile_file)
+            print(f"\nProfile of the main process and {len(recorder.profile_files)} worker task(s) saved to: {profile_file}")
+            stats.sort_stats("tottime").print_stats(PROFILE_TOP_FUNCTIONS)
+    finally:
+        if profile_dir:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+    return result, report
+
+def write_report(report, filename):
+    """Writes a metrics report as JSON to a file, or to stderr for '-'."""
+    text = json.dumps(report, indent=2) + "\n"
+    if filename == "-":
+        sys.stderr.write(text)
+        return
+    with open(filename, "w", encoding="utf-8") as metrics_f:
+        metrics_f.write(text)
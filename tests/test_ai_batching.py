@@ -0,0 +1,131 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("openai")
+import agent
+import aicache
+import backends
+
+SEED_PROMPT_PREFIX = "Expand these seed words: "
+
+
+class MockChatServer(ThreadingHTTPServer):
+    """
+    A local OpenAI-compatible chat completions server. It answers each seed word with
+    '<seed>-related', sleeps `delays[first seed]` seconds before answering a batch, answers
+    the first request of a batch in `rate_limited` with 429 and its Retry-After, and every
+    request of a batch in `failing` with 500.
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), MockChatHandler)
+        self.requests = [] # (seed words, arrival time)
+        self.delays = {}
+        self.rate_limited = {}
+        self.failing = set()
+        self.in_flight = self.peak_in_flight = 0
+        self.lock = threading.Lock()
+
+
+class MockChatHandler(BaseHTTPRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        seeds = body["messages"][-1]["content"][len(SEED_PROMPT_PREFIX):].split(", ")
+        with server.lock:
+            server.requests.append((seeds, time.monotonic()))
+            retry_after = server.rate_limited.pop(seeds[0], None)
+            server.in_flight += 1
+            server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+        try:
+            if retry_after is not None:
+                self.reply(429, {"error": {"message": "Rate limit reached", "type": "rate_limit"}},
+                           {"Retry-After": str(retry_after)})
+                return
+            if seeds[0] in server.failing:
+                self.reply(500, {"error": {"message": "Internal server error", "type": "server_error"}})
+                return
+            time.sleep(server.delays.get(seeds[0], 0))
+            content = "\n".join(f"{seed}-related" for seed in seeds)
+            self.reply(200, {"id": "chatcmpl-mock", "object": "chat.completion", "created": 0, "model": body["model"],
+                             "choices": [{"index": 0, "finish_reason": "stop",
+                                          "message": {"role": "assistant", "content": content}}]})
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def reply(self, status, payload, headers=()):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in dict(headers).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def mock_server():
+    server = MockChatServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    success, message = agent.initialize_backend(backends.LocalBackend(f"http://127.0.0.1:{server.server_port}/v1"))
+    assert success, message
+    yield server
+    server.shutdown()
+    server.server_close()
+    agent._backend = agent._client = None
+
+
+def test_batches_run_concurrently_and_return_in_batch_order(mock_server):
+    seeds = [f"seed{i}" for i in range(10)]
+    # The first batch answers last, so batches finish out of order.
+    mock_server.delays = {"seed0": 0.3, "seed3": 0.1, "seed6": 0.1, "seed9": 0.1}
+    suggestions, failed = agent.get_ai_suggestions_batched("Suggest related words.", seeds, "mock-model",
+                                                           batch_size=3, concurrency=2)
+    assert suggestions == [f"{seed}-related" for seed in seeds]
+    assert failed == 0
+    assert sorted(requested for requested, _ in mock_server.requests) == \
+        [seeds[0:3], seeds[3:6], seeds[6:9], seeds[9:]]
+    assert mock_server.peak_in_flight == 2
+
+
+def test_rate_limited_batch_is_retried_after_retry_after(mock_server, monkeypatch):
+    # Backing off instead of honouring Retry-After would wait at least 5 seconds.
+    monkeypatch.setattr(agent, "_RETRY_BASE_DELAY", 10.0)
+    seeds = ["sun", "flower", "cat", "dog"]
+    mock_server.rate_limited = {"cat": 0.5}
+    suggestions, failed = agent.get_ai_suggestions_batched("Suggest related words.", seeds, "mock-model",
+                                                           batch_size=2, concurrency=2)
+    assert suggestions == [f"{seed}-related" for seed in seeds]
+    assert failed == 0
+    attempts = [arrived for requested, arrived in mock_server.requests if requested == ["cat", "dog"]]
+    assert len(attempts) == 2
+    assert 0.5 <= attempts[1] - attempts[0] < 5
+
+
+def test_partial_expansion_is_not_cached(mock_server, tmp_path, monkeypatch):
+    response_cache = aicache.ResponseCache(str(tmp_path / "ai_cache.sqlite3"))
+    monkeypatch.setattr(agent, "_response_cache", response_cache)
+    prompt_path = tmp_path / "prompt.txt"
+    prompt_path.write_text("Suggest related words.", encoding="utf-8")
+    seeds = ["sun", "flower", "cat", "dog"]
+    mock_server.failing = {"cat"}
+    expanded = agent.brainstorm_words(seeds, str(prompt_path), "mock-model", batch_size=2, concurrency=2)
+    assert expanded == seeds + ["sun-related", "flower-related"]
+    key = aicache.cache_key(agent._backend.cache_name("mock-model"), "Suggest related words.", seeds)
+    assert response_cache.get(key) is None
+    # Once every batch succeeds, the full expansion is cached.
+    mock_server.failing = set()
+    agent.brainstorm_words(seeds, str(prompt_path), "mock-model", batch_size=2, concurrency=2)
+    assert response_cache.get(key) == [f"{seed}-related" for seed in seeds]
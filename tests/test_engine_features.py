@@ -0,0 +1,240 @@
+import gzip
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+
+import pytest
+import compression
+import dedup
+import exclusion
+import generate
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MUTATIONS = {"capitalisation": True, "leet_speak": False, "concatenation": True, "affixes": True}
+
+
+def generate_lines(output_path, base_words, mutation_config=MUTATIONS, **engine_config):
+    """Runs the engine into output_path and returns the lines of the output."""
+    count, message = generate.generate_wordlist_logic(base_words, mutation_config, str(output_path), engine_config)
+    assert message.startswith("Successfully"), message
+    lines = output_path.read_bytes().splitlines()
+    assert count == len(lines)
+    return lines
+
+def run_cli(*args, **kwargs):
+    return subprocess.run([sys.executable, os.path.join(REPO_ROOT, "cli.py"), *args],
+                          capture_output=True, cwd=REPO_ROOT, **kwargs)
+
+
+# --- Pipe Output ---
+
+def test_stdout_output_holds_the_sort_output(tmp_path):
+    sorted_lines = generate_lines(tmp_path / "sort.txt", ["sun", "cat"])
+    result = run_cli("--seeds", "sun,cat", "-o", "-")
+    assert result.returncode == 0, result.stderr
+    assert sorted(result.stdout.splitlines()) == sorted_lines
+
+def test_reader_closing_the_pipe_early_stops_generation_with_a_count():
+    # Far more output than a pipe buffers, so the writer sees the reader go away.
+    process = subprocess.Popen([sys.executable, os.path.join(REPO_ROOT, "cli.py"), "--seeds", "sun,flower,cat",
+                                "-o", "-"], stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=REPO_ROOT)
+    assert process.stdout.readline() == b"sun\n"
+    process.stdout.close()
+    stderr = process.stderr.read().decode()
+    assert process.wait() == 0, stderr
+    streamed = int(re.search(r"after up to ([\d,]+) candidates", stderr).group(1).replace(",", ""))
+    assert streamed > 0
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="named pipes need POSIX")
+def test_named_pipe_output_holds_the_sort_output(tmp_path):
+    sorted_lines = generate_lines(tmp_path / "sort.txt", ["sun", "cat"])
+    fifo_path = tmp_path / "candidates.fifo"
+    os.mkfifo(fifo_path)
+    received = []
+    reader = threading.Thread(target=lambda: received.append(fifo_path.read_bytes()))
+    reader.start()
+    count, message = generate.generate_wordlist_logic(["sun", "cat"], MUTATIONS, str(fifo_path), {})
+    reader.join()
+    assert message.startswith("Successfully"), message
+    assert count == len(sorted_lines)
+    assert sorted(received[0].splitlines()) == sorted_lines
+
+
+# --- Exclusion Index ---
+
+def test_excluded_candidates_are_left_out(tmp_path):
+    sorted_lines = generate_lines(tmp_path / "sort.txt", ["sun", "cat"])
+    excluded = sorted_lines[::7]
+    list_path = tmp_path / "cracked.txt"
+    list_path.write_bytes(b"".join(line + b"\n" for line in excluded))
+    lines = generate_lines(tmp_path / "out.txt", ["sun", "cat"], exclusion_lists=[str(list_path)],
+                           exclusion_index=str(tmp_path / "cracked.idx"))
+    assert sorted(lines) == sorted(set(sorted_lines) - set(excluded))
+
+def test_growing_list_only_hashes_the_new_lines(tmp_path):
+    sorted_lines = generate_lines(tmp_path / "sort.txt", ["sun", "cat"])
+    list_path, index_path = tmp_path / "cracked.txt", str(tmp_path / "cracked.idx")
+    list_path.write_bytes(b"".join(line + b"\n" for line in sorted_lines[:10]))
+    assert exclusion.update_index(index_path, [str(list_path)]) == (10, 10)
+    with open(list_path, "ab") as list_f:
+        list_f.write(b"".join(line + b"\n" for line in sorted_lines[10:25]))
+    assert exclusion.update_index(index_path, [str(list_path)]) == (25, 15)
+    assert exclusion.update_index(index_path, [str(list_path)]) == (25, 0)
+    lines = generate_lines(tmp_path / "out.txt", ["sun", "cat"], exclusion_lists=[str(list_path)],
+                           exclusion_index=index_path)
+    assert sorted(lines) == sorted(sorted_lines[25:])
+
+def test_removed_words_and_lists_come_back(tmp_path):
+    sorted_lines = generate_lines(tmp_path / "sort.txt", ["sun", "cat"])
+    first_path, second_path = tmp_path / "first.txt", tmp_path / "second.txt"
+    index_path = str(tmp_path / "cracked.idx")
+    first_path.write_bytes(b"".join(line + b"\n" for line in sorted_lines[:10]))
+    second_path.write_bytes(b"".join(line + b"\n" for line in sorted_lines[10:20]))
+    assert exclusion.update_index(index_path, [str(first_path), str(second_path)]) == (20, 20)
+    # A rewritten list rebuilds the index, so the removed words are generated again.
+    first_path.write_bytes(b"".join(line + b"\n" for line in sorted_lines[5:10]))
+    assert exclusion.update_index(index_path, [str(first_path), str(second_path)]) == (15, 15)
+    lines = generate_lines(tmp_path / "out.txt", ["sun", "cat"], exclusion_lists=[str(first_path), str(second_path)],
+                           exclusion_index=index_path)
+    assert sorted(lines) == sorted(sorted_lines[:5] + sorted_lines[20:])
+    # So does a list dropped from the set.
+    lines = generate_lines(tmp_path / "out.txt", ["sun", "cat"], exclusion_lists=[str(second_path)],
+                           exclusion_index=index_path)
+    assert sorted(lines) == sorted(sorted_lines[:10] + sorted_lines[20:])
+
+
+# --- Resumable Jobs ---
+
+def interrupt_job(monkeypatch, output_path, job_dir, after_units):
+    """Starts a job, interrupts it once `after_units` units are checkpointed and returns those units."""
+    generate_unit = generate._generate_job_unit
+    calls = []
+    def interrupting_unit(*args):
+        if len(calls) == after_units:
+            raise KeyboardInterrupt
+        calls.append(args[2])
+        return generate_unit(*args)
+    monkeypatch.setattr(generate, "_generate_job_unit", interrupting_unit)
+    with pytest.raises(KeyboardInterrupt):
+        generate.generate_wordlist_logic(["sun", "cat", "dog"], MUTATIONS, str(output_path), {"job_dir": str(job_dir)})
+    monkeypatch.setattr(generate, "_generate_job_unit", generate_unit)
+    return calls
+
+def test_interrupted_job_resumes_with_the_remaining_units(tmp_path, monkeypatch):
+    sorted_lines = generate_lines(tmp_path / "sort.txt", ["sun", "cat", "dog"])
+    job_dir = tmp_path / "job"
+    done_units = interrupt_job(monkeypatch, tmp_path / "out.txt", job_dir, after_units=2)
+    job_state = json.loads((job_dir / generate.JOB_STATE_FILENAME).read_text())
+    generate_unit = generate._generate_job_unit
+    resumed_units = []
+    monkeypatch.setattr(generate, "_generate_job_unit", lambda *args: resumed_units.append(args[2]) or generate_unit(*args))
+    lines = generate_lines(tmp_path / "out.txt", ["sun", "cat", "dog"], job_dir=str(job_dir))
+    assert sorted(lines) == sorted(sorted_lines)
+    # Only the units not checkpointed before the interruption are generated again.
+    assert sorted(done_units + resumed_units) == sorted(tuple(unit) for unit in job_state["units"])
+    assert not job_dir.exists()
+
+def test_job_directory_of_another_job_is_rejected(tmp_path, monkeypatch):
+    job_dir = tmp_path / "job"
+    interrupt_job(monkeypatch, tmp_path / "out.txt", job_dir, after_units=2)
+    count, message = generate.generate_wordlist_logic(["sun", "cat", "bird"], MUTATIONS, str(tmp_path / "out.txt"),
+                                                      {"job_dir": str(job_dir)})
+    assert count == 0 and message.startswith("Error: Job directory"), message
+    # The other job's checkpoint is left for it to resume.
+    assert (job_dir / generate.JOB_STATE_FILENAME).exists()
+    assert len(list(job_dir.glob("unit_*"))) == 2
+
+
+# --- Compressed Output ---
+
+def decompress(path):
+    """Decompresses an output file with its codec's own library, independently of the engine."""
+    if path.suffix == ".gz":
+        return gzip.decompress(path.read_bytes())
+    if path.suffix == ".zst":
+        zstandard = pytest.importorskip("zstandard")
+        with zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), read_across_frames=True) as reader:
+            return reader.read()
+    return pytest.importorskip("lz4.frame").decompress(path.read_bytes())
+
+@pytest.mark.parametrize("extension", [".gz", ".zst", ".lz4"])
+@pytest.mark.parametrize("threads", [1, 4])
+def test_compressed_output_holds_the_sort_output(tmp_path, extension, threads):
+    if compression.codec_unavailable_reason(compression.CODEC_EXTENSIONS[extension]):
+        pytest.skip(compression.codec_unavailable_reason(compression.CODEC_EXTENSIONS[extension]))
+    sorted_lines = generate_lines(tmp_path / "sort.txt", ["sun", "cat", "dog"])
+    output_path = tmp_path / f"out.txt{extension}"
+    # A small memory budget spills compressed runs as well.
+    count, message = generate.generate_wordlist_logic(["sun", "cat", "dog"], MUTATIONS, str(output_path),
+                                                      {"compression_threads": threads, "memory_budget_mb": 0.5})
+    assert message.startswith("Successfully"), message
+    assert count == len(sorted_lines)
+    assert decompress(output_path).splitlines() == sorted_lines
+
+
+# --- Sorted Merges ---
+
+def test_worker_output_matches_the_serial_output(tmp_path):
+    serial_lines = generate_lines(tmp_path / "serial.txt", ["sun", "cat", "dog"])
+    assert generate_lines(tmp_path / "workers.txt", ["sun", "cat", "dog"], workers=2) == serial_lines
+
+def test_many_runs_are_merged_over_several_passes(tmp_path):
+    serial_lines = generate_lines(tmp_path / "serial.txt", ["sun", "cat", "dog"])
+    # Runs of a few KB: hundreds of them, more than one merge pass takes.
+    assert generate_lines(tmp_path / "spilled.txt", ["sun", "cat", "dog"], memory_budget_mb=0.05) == serial_lines
+
+@pytest.mark.parametrize("extension", ["", ".gz"])
+def test_merge_with_a_small_fan_in_keeps_every_line_once(tmp_path, extension):
+    input_filenames = []
+    for index in range(9):
+        # Overlapping ranges, so every pass has duplicates to drop.
+        lines = sorted(f"word{number:04d}".encode() for number in range(index * 50, index * 50 + 120))
+        filename = str(tmp_path / f"run{index}.txt{extension}")
+        with compression.open_compressed(filename, "wb") as run_f:
+            run_f.write(b"".join(line + b"\n" for line in lines))
+        input_filenames.append(filename)
+    work_dir = tmp_path / "work"
+    work_dir.mkdir()
+    output_path = tmp_path / "merged.txt"
+    count = dedup.merge_sorted_unique(input_filenames, str(output_path), memory_budget_mb=0.01,
+                                      temp_dir=str(work_dir), max_fan_in=2)
+    expected = [f"word{number:04d}".encode() for number in range(8 * 50 + 120)]
+    assert output_path.read_bytes().splitlines() == expected
+    assert count == len(expected)
+    assert not list(work_dir.iterdir())
+
+
+# --- Hashcat Export ---
+
+def expand_hashcat_attack(export_dir, combine):
+    """Applies the exported suffix rules to the core forms (or, with `combine`, to every pair of them)."""
+    forms = (export_dir / generate.HASHCAT_WORDS_FILENAME).read_bytes().splitlines()
+    rules = (export_dir / generate.HASHCAT_RULES_FILENAME).read_bytes().splitlines()
+    suffixes = [b"" if rule == b":" else b"".join(step[1:] for step in rule.split(b" ")) for rule in rules]
+    words = [first + second for first in forms for second in forms] if combine else forms
+    return {word + suffix for word in words for suffix in suffixes}
+
+def test_hashcat_export_of_one_word_expands_to_its_wordlist(tmp_path):
+    sorted_lines = generate_lines(tmp_path / "sort.txt", ["sun"])
+    export_dir = tmp_path / "attack"
+    count, message = generate.generate_wordlist_logic(["sun"], MUTATIONS, str(tmp_path / "unused.txt"),
+                                                      {"hashcat_export_dir": str(export_dir)})
+    assert message.startswith("Successfully"), message
+    assert count == len((export_dir / generate.HASHCAT_WORDS_FILENAME).read_bytes().splitlines())
+    assert (export_dir / generate.HASHCAT_INSTRUCTIONS_FILENAME).exists()
+    assert not (tmp_path / "unused.txt").exists()
+    assert expand_hashcat_attack(export_dir, combine=False) == set(sorted_lines)
+
+def test_hashcat_export_covers_the_concatenations(tmp_path):
+    sorted_lines = set(generate_lines(tmp_path / "sort.txt", ["sun", "cat"]))
+    export_dir = tmp_path / "attack"
+    _, message = generate.generate_wordlist_logic(["sun", "cat"], MUTATIONS, str(tmp_path / "unused.txt"),
+                                                  {"hashcat_export_dir": str(export_dir)})
+    assert message.startswith("Successfully"), message
+    single_words = expand_hashcat_attack(export_dir, combine=False)
+    # The combinator also pairs a word's forms with each other, so it tries a few more candidates.
+    assert single_words <= sorted_lines <= single_words | expand_hashcat_attack(export_dir, combine=True)
+    assert "combinator" in (export_dir / generate.HASHCAT_INSTRUCTIONS_FILENAME).read_text()
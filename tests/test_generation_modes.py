@@ -0,0 +1,97 @@
+import pytest
+import generate
+
+# The generation modes that skip the sort must produce the same candidates as the sort mode,
+# so they are checked against it on seed sets built to collide.
+
+ALL_MUTATIONS = {"capitalisation": True, "leet_speak": True, "concatenation": True, "affixes": True}
+NO_LEET = dict(ALL_MUTATIONS, leet_speak=False)
+
+# A short affix table in place of the full one (thousands of suffixes), made of suffixes
+# that extend each other, digits and symbols that are also leet substitutes, and a year.
+COLLIDING_SUFFIXES = ("", "1", "12", "!", "1!", "!1", "4", "5", "t5", "$", "2024", "24")
+
+CASES = [
+    pytest.param(["sun", "Sun", "SUN"], ALL_MUTATIONS, id="case-collisions"),
+    pytest.param(["cat", "c4t", "c@t5"], ALL_MUTATIONS, id="leet-overlaps"),
+    pytest.param(["sun", "flower", "sunflower"], ALL_MUTATIONS, id="concatenated-seeds"),
+    pytest.param(["cat", "cat1", "cat!"], ALL_MUTATIONS, id="suffix-lookalikes"),
+    pytest.param(["ab", "a", "b", "ba"], ALL_MUTATIONS, id="short-pieces"),
+    pytest.param(["sun", "dog", "sun"], ALL_MUTATIONS, id="repeated-seed"),
+    pytest.param(["Straße", "STRASSE", "strasse"], NO_LEET, id="length-changing-caps"),
+    pytest.param(["cat", "c4t", "cat1"], dict(ALL_MUTATIONS, capitalisation=False), id="leet-without-caps"),
+]
+
+
+@pytest.fixture(autouse=True)
+def colliding_affix_table(monkeypatch):
+    monkeypatch.setattr(generate, "build_affix_table", lambda *args, **kwargs: COLLIDING_SUFFIXES)
+
+
+def generate_lines(tmp_path, name, base_words, mutation_config, **engine_config):
+    """Runs the engine into a file in tmp_path and returns its lines, checking the reported count."""
+    output_path = tmp_path / name
+    count, message = generate.generate_wordlist_logic(base_words, mutation_config, str(output_path), engine_config)
+    assert message.startswith("Successfully"), message
+    lines = output_path.read_bytes().splitlines()
+    assert count == len(lines)
+    return lines
+
+
+@pytest.mark.parametrize("base_words, mutation_config", CASES)
+def test_construct_output_equals_sort_output(tmp_path, base_words, mutation_config):
+    sorted_lines = generate_lines(tmp_path, "sort.txt", base_words, mutation_config)
+    constructed = generate_lines(tmp_path, "construct.txt", base_words, mutation_config, dedup="construct")
+    assert len(set(constructed)) == len(constructed)
+    assert sorted(constructed) == sorted_lines
+
+
+@pytest.mark.parametrize("base_words, mutation_config", CASES)
+def test_probability_output_holds_the_sort_output(tmp_path, base_words, mutation_config):
+    sorted_lines = generate_lines(tmp_path, "sort.txt", base_words, mutation_config)
+    ranked = generate_lines(tmp_path, "ranked.txt", base_words, mutation_config, order="probability")
+    assert len(set(ranked)) == len(ranked)
+    assert set(ranked) == set(sorted_lines)
+
+
+@pytest.mark.parametrize("base_words, mutation_config", CASES)
+def test_budget_output_is_the_head_of_the_probability_output(tmp_path, base_words, mutation_config):
+    ranked = generate_lines(tmp_path, "ranked.txt", base_words, mutation_config, order="probability")
+    for budget in (1, 5, len(ranked) // 3, len(ranked) - 1, len(ranked), len(ranked) + 10):
+        budgeted = generate_lines(tmp_path, f"budget_{budget}.txt", base_words, mutation_config,
+                                  candidate_budget=budget)
+        assert budgeted == ranked[:budget]
+
+
+@pytest.mark.parametrize("base_words, mutation_config", CASES)
+def test_exact_count_matches_the_generated_wordlist(tmp_path, base_words, mutation_config):
+    sorted_lines = generate_lines(tmp_path, "sort.txt", base_words, mutation_config)
+    exact = (len(sorted_lines), sum(len(line) + 1 for line in sorted_lines))
+    assert generate.count_unique_candidates(base_words, mutation_config) == exact
+    estimated_count, estimated_bytes = generate.estimate_candidate_count(base_words, mutation_config)
+    assert estimated_count >= exact[0] and estimated_bytes >= exact[1]
+
+
+def test_estimate_is_exact_without_collisions():
+    base_words = ["sun", "flower", "cat"]
+    assert generate.estimate_candidate_count(base_words, ALL_MUTATIONS) == \
+        generate.count_unique_candidates(base_words, ALL_MUTATIONS)
+
+
+@pytest.mark.parametrize("base_words, mutation_config", CASES)
+def test_incremental_output_equals_sort_output(tmp_path, base_words, mutation_config):
+    sorted_lines = generate_lines(tmp_path, "sort.txt", base_words, mutation_config)
+    fresh = generate_lines(tmp_path, "fresh.txt", base_words, mutation_config, incremental_dir=str(tmp_path / "fresh"))
+    assert fresh == sorted_lines
+    # Adding the last word merges only its new pieces into the existing output.
+    generate_lines(tmp_path, "grown.txt", base_words[:-1], mutation_config, incremental_dir=str(tmp_path / "grown"))
+    grown = generate_lines(tmp_path, "grown.txt", base_words, mutation_config, incremental_dir=str(tmp_path / "grown"))
+    assert grown == sorted_lines
+
+
+def test_construct_output_equals_sort_output_with_the_full_affix_table(tmp_path, monkeypatch):
+    monkeypatch.undo()
+    base_words = ["cat", "cat1", "Sun"]
+    sorted_lines = generate_lines(tmp_path, "sort.txt", base_words, NO_LEET)
+    constructed = generate_lines(tmp_path, "construct.txt", base_words, NO_LEET, dedup="construct")
+    assert sorted(constructed) == sorted_lines
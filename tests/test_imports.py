@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = sorted(name[:-3] for name in os.listdir(REPO_ROOT) if name.endswith(".py"))
+# Cumulative import time allowed for the entry points. They take about 0.1s; the openai SDK
+# alone takes several times the budget, so loading it eagerly again fails the test.
+STARTUP_BUDGET_S = 0.4
+
+
+def import_times(statement):
+    """Runs an import statement in a fresh interpreter and returns {top-level module: cumulative seconds}."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                            cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        # Top-level imports are the unindented names; nested ones are indented under them.
+        if len(fields) == 3 and fields[1].strip().isdigit() and not fields[2].startswith("  "):
+            times[fields[2].strip()] = int(fields[1]) / 1e6
+    return times
+
+
+def test_no_module_loads_the_openai_sdk():
+    # A fresh interpreter, so modules imported by other tests do not count.
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c",
+         f"import sys, {', '.join(MODULES)}; print('openai' in sys.modules)"],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
+    imported = {line.split("|")[-1].strip().split(".")[0] for line in result.stderr.splitlines() if "|" in line}
+    assert "openai" not in imported
+
+def test_entry_points_start_within_the_import_budget():
+    # The best of a few runs, so a busy machine does not fail the test.
+    startup_s = min(sum(seconds for module, seconds in import_times("import cli, tui").items() if module in ("cli", "tui"))
+                    for _ in range(3))
+    assert startup_s < STARTUP_BUDGET_S, f"importing cli and tui took {startup_s:.3f}s"
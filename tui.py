@@ -1,11 +1,5 @@
 import os
 import sys 
-# Import all the other modules that contain the application's logic
-import agent
-import fileIO
-import review 
-import mutations 
-import generate 
 
 # --- Core TUI Utility Functions ---
 
@@ -28,8 +22,7 @@ def display_main_menu(state):
     print()   
     print(f" Status:")
     # Display the current state of all user-configurable options.
-    print(f"  - Azure Endpoint Set: {'Yes' if state['endpoint'] else 'No'}")
-    print(f"  - Azure Key Set:      {'Yes' if state['key'] else 'No'}")
+    print(f"  - AI Backend:         {state['ai_backend']}")
     print(f"  - AI Client Ready:    {'Yes' if state['client_ready'] else 'No'}") 
     print(f"  - System Prompt File: {state['system_prompt_path']}")
     print(f"  - AI Model:           {state['model_name']}")
@@ -40,11 +33,13 @@ def display_main_menu(state):
     enabled_muts = [key for key, enabled in config.items() if enabled]
     print(f"  - Enabled Mutations:  {len(enabled_muts)} ({', '.join(enabled_muts)})")
     print(f"  - Output File:        {state['output_filename']}")
+    print(f"  - Worker Processes:   {state.get('engine_config', {}).get('workers', 1)}")
+    print(f"  - Output Order:       {state.get('engine_config', {}).get('order', 'default')}")
     print()   
     print("---------------------------------------------")
     print()    
     print(" Main Menu:")
-    print("  1. Set Azure Endpoint & Key")
+    print("  1. Set AI Backend (Azure / Local / Offline)")
     print("  2. Set System Prompt File")
     print("  3. Set AI Model Name")
     print("  4. Enter/Edit Seed Words")
@@ -61,17 +56,35 @@ def display_main_menu(state):
 
 # This block runs only when the script is executed directly (e.g., `python tui.py`).
 if __name__ == "__main__":
+    # Import all the other modules that contain the application's logic. This happens here
+    # rather than at the top so that modules using the TUI helpers (and the headless `cli.py`)
+    # do not load the whole application, including the AI SDK, just by importing `tui`.
+    import argparse
+    import agent
+    import fileIO
+    import review
+    import mutations
+    import generate
+    import cli
+
+    # Engine tuning options can be given on the command line when launching the TUI.
+    parser = argparse.ArgumentParser(description="SeedSpinner - Password List Generator")
+    cli.add_engine_arguments(parser)
+    args = parser.parse_args()
+
     # `app_state` is a dictionary that holds the entire configuration of the application.
     # It is passed to every function so they can read and modify the current settings.
     app_state = {
-        "endpoint": None, "key": None, "client_ready": False, 
+        "ai_backend": "azure", "endpoint": None, "key": None, "local_url": None,
+        "association_file": None, "association_index": None, "client_ready": False, 
         "system_prompt_path": "CreativePrompt.txt", "model_name": "gpt-4o-mini", 
         "seed_words": [], "ai_suggestions": [], "words_for_engine": [],
         "mutation_config": {
             "capitalisation": True, "leet_speak": False,
             "concatenation": True, "affixes": True
             },
-        "output_filename": "wordlist.txt"
+        "output_filename": "wordlist.txt",
+        "engine_config": cli.engine_config_from_args(args)
     }
 
     # The main application loop. It continuously displays the menu and waits for user input.
@@ -82,7 +95,7 @@ if __name__ == "__main__":
         # Dispatch the user's choice to the appropriate function from the imported modules.
         # The `app_state` dictionary is passed to each function.
         if choice == '1':
-            agent.get_azure_details(app_state)
+            agent.set_ai_backend(app_state)
         elif choice == '2':
             fileIO.set_system_prompt(app_state)
         elif choice == '3':